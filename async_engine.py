@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步采集引擎 - async_engine.py
+基于 asyncio + asyncssh，在单个线程内同时维持数百个设备会话，
+并发上限由 asyncio.Semaphore 控制；未安装 asyncssh 时 is_available() 返回 False，
+调用方退回线程池方式。
+登录握手、分页、Y/N 应答与提示符检测与 DeviceSession 完全一致。
+"""
+
+import asyncio
+import codecs
+import importlib.util
+import time
+
+# 可选依赖，首次使用异步引擎时才导入（见 load_asyncssh），不拖慢程序启动
+asyncssh = None
+_available = None
+
+from channel_reader import build_prompt_regex
+from device_session import DeviceSession, NO_PAGING_COMMANDS, DEFAULT_NO_PAGING_COMMANDS, \
+    COMMAND_REJECTED_REGEX, vendor_key
+from output_cleaner import last_line
+from retry_policy import CommandTimeout, ConnectError, classify_error
+
+# 默认同时在线的会话上限
+DEFAULT_MAX_CONCURRENT = 500
+
+
+def is_available():
+    """是否可以使用异步引擎（需要安装 asyncssh；只查找是否安装，不导入）"""
+    global _available
+    if _available is None:
+        _available = asyncssh is not None or importlib.util.find_spec('asyncssh') is not None
+    return _available
+
+
+def load_asyncssh():
+    """导入并返回 asyncssh 模块"""
+    global asyncssh
+    if asyncssh is None:
+        import asyncssh as module
+        asyncssh = module
+    return asyncssh
+
+
+def timed_client(timing):
+    """
+    asyncssh 客户端回调类：TCP 连接建立 -> 开始认证（密钥交换完成）-> 认证完成，
+    把 asyncssh.connect 拆分为 tcp_connect / ssh_kex / ssh_auth 三个阶段计时
+    """
+    phases = {'tcp_connect': timing.begin('tcp_connect')}
+
+    class TimedClient(load_asyncssh().SSHClient):
+        def connection_made(self, conn):
+            timing.end(phases.get('tcp_connect'))
+            phases['ssh_kex'] = timing.begin('ssh_kex')
+
+        def begin_auth(self, username):
+            timing.end(phases.get('ssh_kex'))
+            phases['ssh_auth'] = timing.begin('ssh_auth')
+
+        def auth_completed(self):
+            timing.end(phases.get('ssh_auth'))
+    return TimedClient
+
+
+class AsyncChannelReader:
+    """
+    异步交互通道读取器，语义与 ChannelReader 相同
+    stdin 需提供 write()，stdout 需提供 async read(n)（asyncssh 的 SSHWriter/SSHReader 均满足）
+    """
+
+    def __init__(self, stdin, stdout, encoding='utf-8', chunk_size=65535):
+        self.stdin = stdin
+        self.stdout = stdout
+        self.chunk_size = chunk_size
+        self.closed = False
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+
+    def send(self, data):
+        """向设备发送数据（写入缓冲区后立即返回，可在数据块回调中调用）"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.stdin.write(data)
+
+    async def read_chunk(self, timeout):
+        """最多等待 timeout 秒读取一个数据块；超时或通道关闭返回 None"""
+        if self.closed:
+            return None
+        try:
+            data = await asyncio.wait_for(self.stdout.read(self.chunk_size), max(timeout, 0.001))
+        except asyncio.TimeoutError:
+            return None
+        if not data:
+            self.closed = True
+            return None
+        return self._decoder.decode(data)
+
+    async def read_until(self, on_chunk, idle_timeout, total_timeout, settle_timeout=0.0, keep=True):
+        """同 ChannelReader.read_until"""
+        parts = []
+        deadline = time.time() + total_timeout
+        prompt_seen = False
+        while not self.closed:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            if prompt_seen:
+                if settle_timeout <= 0:
+                    break
+                wait = settle_timeout
+            else:
+                wait = idle_timeout
+            data = await self.read_chunk(min(wait, remaining))
+            if data is None:
+                break
+            if data:
+                if keep:
+                    parts.append(data)
+                prompt_seen = bool(on_chunk(data))
+        return ''.join(parts), prompt_seen
+
+
+class AsyncDeviceSession(DeviceSession):
+    """
+    DeviceSession 的异步版本，数据块回调（分页、Y/N、提示符）直接复用父类实现
+    用法:
+        async with AsyncDeviceSession(device) as session:
+            raw = await session.run('display version')
+    """
+
+    def __init__(self, device, **kwargs):
+        super().__init__(device, **kwargs)
+        self.conn = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        await self.close()
+        return False
+
+    async def open(self):
+        """建立SSH连接，完成登录握手并记录设备提示符（失败时抛出 ConnectError）"""
+        try:
+            self.conn = await asyncio.wait_for(
+                load_asyncssh().connect(str(self.ip), port=self.port, username=self.username, password=self.password,
+                                        known_hosts=None, agent_path=None, client_keys=None,
+                                        client_factory=timed_client(self.timing)),
+                self.connect_timeout)
+            process = await self.conn.create_process(term_type='vt100', term_size=(1000, 200), encoding=None)
+            self.reader = AsyncChannelReader(process.stdin, process.stdout)
+            self._tail = ''
+            with self.timing.phase('login'):
+                self.login_output, _ = await self.reader.read_until(self._on_login_chunk, self.login_timeout,
+                                                                    self.login_timeout)
+        except Exception as e:
+            await self.close()
+            raise ConnectError(classify_error(e), str(e) or e.__class__.__name__) from e
+        if self.login_output.strip():
+            self.prompt = self.login_output.strip().splitlines()[-1].strip()
+        self.prompt_regex = build_prompt_regex(self.prompt)
+        if self.disable_paging:
+            await self.setup_terminal()
+        return self
+
+    async def setup_terminal(self):
+        """发送厂商对应的关闭分页命令，被拒绝时保持分页符检测作为兜底"""
+        cmds = NO_PAGING_COMMANDS.get(vendor_key(self.vendor), DEFAULT_NO_PAGING_COMMANDS)
+        for cmd in cmds:
+            output = await self.run(cmd, timeout=15, idle_timeout=5, phase='no_paging', check=False)
+            if output.strip() and not COMMAND_REJECTED_REGEX.search(output):
+                self.paging_disabled = True
+                self.no_paging_command = cmd
+                break
+        return self.paging_disabled
+
+    async def run(self, cmd, timeout=None, idle_timeout=None, on_data=None, phase='command', check=True):
+        """
+        执行单条命令，返回原始输出；指定 on_data 时数据块直接交给 on_data，返回空字符串
+        check 为 True 时未出现结束提示符抛出 CommandTimeout（同 DeviceSession.run）
+        """
+        timeout, idle_timeout, settle_timeout = self._prepare_run(cmd, timeout, idle_timeout, on_data, phase)
+        try:
+            self.reader.send(cmd.rstrip('\n') + '\n')
+            output, prompt_seen = await self.reader.read_until(self._on_command_chunk, idle_timeout, timeout,
+                                                               settle_timeout, keep=on_data is None)
+        finally:
+            self._finish_run()
+        if check and not prompt_seen:
+            raise CommandTimeout(cmd, self.reader.closed, timeout)
+        return output
+
+    async def run_many(self, cmds):
+        """顺序执行多条命令，返回 [(命令, 原始输出), ...]"""
+        return [(cmd, await self.run(cmd)) for cmd in cmds]
+
+    async def stream_many(self, cmds, writer):
+        """顺序执行多条命令，输出边接收边交给 writer 清理并写入磁盘"""
+        prompt = self.prompt
+        for idx, cmd in enumerate(cmds):
+            writer.start_command(idx, cmd, prompt)
+            await self.run(cmd, on_data=writer.feed)
+            writer.end_command()
+            prompt = last_line(self._content_tail)
+
+    async def close(self):
+        if self.conn is not None:
+            try:
+                with self.timing.phase('disconnect'):
+                    self.conn.close()
+                    await self.conn.wait_closed()
+            finally:
+                self.conn = None
+
+
+async def _collect_device(idx, device, cmds, open_log, semaphore, session_factory, session_kwargs, delay=0.0,
+                          attempt=1, on_timing=None):
+    """在并发上限内采集单台设备，返回 (序号, 设备, (ok, logfile, errmsg, 耗时))"""
+    if delay > 0:
+        # 重试退避在获取并发名额之前等待，不占用会话名额
+        await asyncio.sleep(delay)
+    queued_time = time.time()
+    async with semaphore:
+        start_time = time.time()
+        writer = None
+        session = session_factory(device, **session_kwargs)
+        try:
+            async with session:
+                # 登录成功后才创建日志文件；会话中途断开时已写入的部分保留在文件中（配置库/归档不提交）
+                with open_log(device) as writer:
+                    await session.stream_many(cmds, writer)
+            ok, logfile, errmsg = True, writer.path, ''
+        except Exception as e:
+            ok, logfile, errmsg = False, '', str(e) or e.__class__.__name__
+            if writer is not None and writer.path:
+                errmsg = f"{errmsg} (已保存部分输出: {writer.path})"
+        if on_timing is not None:
+            # queue_wait 为等待并发名额的秒数
+            on_timing(idx, device, session.timing_record(attempt, ok, errmsg,
+                                                         queue_wait=round(start_time - queued_time, 6)))
+        return idx, device, (ok, logfile, errmsg, time.time() - start_time)
+
+
+async def _run_batch(devices, commands_for, open_log, max_concurrent, on_done, retry_policy, on_retry,
+                     session_factory, session_kwargs, on_timing=None):
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+    cmds = [commands_for(device) for device in devices]
+    results = [None] * len(devices)
+    # 第一轮采集全部设备；之后每一轮只重试上一轮中可重试的失败设备
+    pending = [(idx, 0.0) for idx in range(len(devices))]
+    attempt = 1
+    while pending:
+        tasks = [
+            _collect_device(idx, devices[idx], cmds[idx], open_log, semaphore, session_factory, session_kwargs, delay,
+                            attempt, on_timing)
+            for idx, delay in pending
+        ]
+        pending = []
+        for future in asyncio.as_completed(tasks):
+            idx, device, result = await future
+            if retry_policy is not None and not result[0] and retry_policy.should_retry(result[2], attempt):
+                delay = retry_policy.backoff(attempt)
+                pending.append((idx, delay))
+                if on_retry:
+                    on_retry(idx, device, result, attempt, delay)
+                continue
+            results[idx] = result
+            if on_done:
+                on_done(idx, device, result)
+        attempt += 1
+    return results
+
+
+def run_batch(devices, commands_for, open_log, max_concurrent=DEFAULT_MAX_CONCURRENT, on_done=None,
+              retry_policy=None, on_retry=None, session_factory=None, on_timing=None, **session_kwargs):
+    """
+    并发采集一批设备（阻塞直到全部完成，应在后台线程中调用）
+    commands_for(device) -> 该设备要执行的命令列表
+    open_log(device) -> DeviceLogWriter，命令输出按数据块增量清理后写入该日志
+    on_done(序号, 设备, (ok, logfile, errmsg, 耗时)) 每台设备最终完成时在事件循环线程中回调
+    retry_policy 为 RetryPolicy 时，连接/登录阶段可重试的失败设备在本轮结束后按退避时间重试，
+    每次安排重试时回调 on_retry(序号, 设备, 本次结果, 第几次尝试, 等待秒数)
+    on_timing(序号, 设备, 耗时记录) 每次连接尝试结束时回调（见 DeviceSession.timing_record）
+    返回与 devices 顺序一致的结果列表
+    """
+    if session_factory is None:
+        if not is_available():
+            raise RuntimeError("未安装 asyncssh，无法使用异步采集引擎")
+        # 在事件循环启动前导入，避免首个会话建连时阻塞事件循环
+        load_asyncssh()
+        session_factory = AsyncDeviceSession
+    return asyncio.run(_run_batch(devices, commands_for, open_log, max_concurrent, on_done, retry_policy, on_retry,
+                                  session_factory, session_kwargs, on_timing))
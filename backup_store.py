@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置库模块 - backup_store.py
+按内容寻址、去重保存备份配置：以规范化配置（去除行尾空白与时间戳等易变行）的 SHA-256 为键，
+每份不同的配置只保存一份 objects/<前2位>/<摘要>.cfg，每次备份只写一个设备 -> 配置摘要的清单 runs/<任务>.json；
+配置未变化的设备不再写文件，磁盘占用与写入量只随配置发生变化的设备数增长。
+    <输出目录>/config_store/objects/3f/3fa4...e1.cfg
+    <输出目录>/config_store/runs/backup_20250702_100000.json
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+
+from device_log import WRITE_BUFFER_SIZE, SpooledLogWriter
+
+# 配置库目录名（位于备份输出目录下，同一输出目录的多次备份共用）
+STORE_DIRNAME = 'config_store'
+OBJECTS_DIR = 'objects'
+RUNS_DIR = 'runs'
+BLOB_SUFFIX = '.cfg'
+
+# 与配置内容无关、每次备份都可能变化的行（计算摘要与比较差异时忽略）
+VOLATILE_PATTERNS = [
+    r'!\s*Last configuration change at',  # 思科: ! Last configuration change at 10:00:00 UTC ...
+    r'!\s*NVRAM config last updated at',
+    r'!\s*No configuration change since last restart',
+    r'!\s*Time:',
+    r'Current configuration\s*:\s*\d+ bytes',
+    r'ntp clock-period\s+\d+',
+    r'!\s*Last configuration was (?:updated|saved) at',  # 华为: !Last configuration was updated at ...
+    r'#?\s*Last (?:configuration|config) (?:change|save) time',
+]
+VOLATILE_REGEX = re.compile(r'^\s*(?:' + '|'.join(VOLATILE_PATTERNS) + ')', re.IGNORECASE)
+
+
+def normalize_lines(lines):
+    """规范化配置行：去掉换行符与行尾空白，跳过易变行"""
+    for line in lines:
+        line = line.rstrip()
+        if VOLATILE_REGEX.match(line):
+            continue
+        yield line
+
+
+def config_digest(lines):
+    """规范化配置内容的 SHA-256（lines 为行的可迭代对象，如打开的文件）"""
+    sha = hashlib.sha256()
+    for line in normalize_lines(lines):
+        sha.update(line.encode('utf-8', errors='ignore'))
+        sha.update(b'\n')
+    return sha.hexdigest()
+
+
+class ConfigStore:
+    """
+    内容寻址的配置库（多线程安全）
+    用法:
+        store = ConfigStore(os.path.join(输出目录, STORE_DIRNAME))
+        with store.log_writer(device) as writer:   # 代替 DeviceLogWriter
+            session.stream_many(cmds, writer)
+        store.write_manifest('backup_20250702_100000', entries)
+    written / reused 统计本实例新写入与复用（内容已存在）的配置份数
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.written = 0
+        self.reused = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, OBJECTS_DIR), exist_ok=True)
+        os.makedirs(os.path.join(root, RUNS_DIR), exist_ok=True)
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, OBJECTS_DIR, digest[:2], digest + BLOB_SUFFIX)
+
+    def digest_of(self, path):
+        """配置库中的配置文件路径 -> 摘要；不是配置库文件时返回 None"""
+        if not path:
+            return None
+        name = os.path.basename(path)
+        if not name.endswith(BLOB_SUFFIX):
+            return None
+        digest = name[:-len(BLOB_SUFFIX)]
+        return digest if os.path.abspath(self.blob_path(digest)) == os.path.abspath(path) else None
+
+    def has(self, digest):
+        return os.path.exists(self.blob_path(digest))
+
+    def put(self, fileobj):
+        """
+        保存 fileobj（已定位到开头的文本文件对象）的内容，返回 (摘要, 配置文件路径, 是否新写入)
+        内容已存在时不再写入；先写临时文件再改名，并发写入同一内容时也不会产生半截文件
+        """
+        digest = config_digest(fileobj)
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            with self._lock:
+                self.reused += 1
+            return digest, path, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fileobj.seek(0)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8', errors='ignore', buffering=WRITE_BUFFER_SIZE) as f:
+            shutil.copyfileobj(fileobj, f, WRITE_BUFFER_SIZE)
+            size = f.tell()
+        os.replace(tmp, path)
+        with self._lock:
+            self.written += 1
+            self.bytes_written += size
+        return digest, path, True
+
+    def log_writer(self, device, headers=False):
+        """单台设备的日志写入对象（接口与 DeviceLogWriter 相同），关闭时存入配置库"""
+        return StoredLogWriter(self, device.get('name', 'unknown'), headers)
+
+    def write_manifest(self, run, entries):
+        """写入本次备份的清单 runs/<run>.json，entries 为 [{'name', 'ip', 'ok', 'blob', 'error'}, ...]"""
+        path = os.path.join(self.root, RUNS_DIR, f'{run}.json')
+        data = {'run': run, 'created': datetime.datetime.now().isoformat(timespec='seconds'), 'devices': entries}
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+        return path
+
+    def manifests(self):
+        """全部清单路径，按时间先后排序（文件名含时间戳）"""
+        folder = os.path.join(self.root, RUNS_DIR)
+        return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.json'))
+
+    def load_manifest(self, path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def read(self, digest):
+        with open(self.blob_path(digest), encoding='utf-8', errors='ignore') as f:
+            return f.read()
+
+
+class StoredLogWriter(SpooledLogWriter):
+    """写入配置库的设备日志：关闭时计算摘要，内容已存在则直接丢弃缓冲；path 在关闭后为配置库中的文件路径"""
+
+    def __init__(self, store, name, headers=False):
+        super().__init__(name, self._put, headers)
+        self.store = store
+        self.digest = None
+        self.new = False
+
+    def _put(self, spool):
+        self.digest, path, self.new = self.store.put(spool)
+        return path
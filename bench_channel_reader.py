@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通道读取性能测试 - 对比旧版 sleep 轮询与 ChannelReader 的单条命令耗时
+使用本地 socketpair 模拟设备：收到命令后按设定延迟分块回显输出并打印提示符
+
+用法: python3 bench_channel_reader.py [命令条数] [输出行数] [设备响应延迟秒]
+"""
+
+import os
+import select
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from channel_reader import ChannelReader, build_prompt_regex
+
+PROMPT = '<HUAWEI>'
+
+
+class SimulatedDevice(threading.Thread):
+    """模拟设备：每收到一行命令，延迟 latency 秒后分块输出 lines 行内容和提示符"""
+
+    def __init__(self, sock, lines=200, latency=0.05, chunk_lines=40):
+        super().__init__(daemon=True)
+        self.sock = sock
+        self.lines = lines
+        self.latency = latency
+        self.chunk_lines = chunk_lines
+
+    def run(self):
+        self.sock.sendall(f"Info: The max number of VTY users is 10.\r\n{PROMPT}".encode())
+        buf = b''
+        while True:
+            try:
+                data = self.sock.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buf += data
+            while b'\n' in buf:
+                line, buf = buf.split(b'\n', 1)
+                cmd = line.decode(errors='ignore').strip()
+                time.sleep(self.latency)
+                body = [f" interface GigabitEthernet0/0/{i}" for i in range(self.lines)]
+                chunks = [body[i:i + self.chunk_lines] for i in range(0, len(body), self.chunk_lines)]
+                self.sock.sendall(f"{cmd}\r\n".encode())
+                for chunk in chunks:
+                    self.sock.sendall(('\r\n'.join(chunk) + '\r\n').encode())
+                self.sock.sendall(f"{PROMPT}".encode())
+
+
+class PollingChannel:
+    """给 socket 补充 recv_ready()，用于复现旧版轮询逻辑"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def recv_ready(self):
+        return bool(select.select([self.sock], [], [], 0)[0])
+
+    def recv(self, n):
+        return self.sock.recv(n)
+
+    def send(self, data):
+        self.sock.sendall(data)
+
+
+def legacy_run_command(chan, cmd, max_no_growth=40):
+    """旧版 inspect_device 的命令读取循环（华为参数）"""
+    chan.send((cmd + '\n').encode('utf-8'))
+    time.sleep(1.0)
+    raw_output = ''
+    last_output_len = 0
+    no_growth_count = 0
+    start_time = time.time()
+    while True:
+        time.sleep(0.08)
+        if chan.recv_ready():
+            data = chan.recv(65535).decode(errors='ignore')
+            raw_output += data
+            if len(raw_output) == last_output_len:
+                no_growth_count += 1
+                if no_growth_count > max_no_growth:
+                    break
+            else:
+                no_growth_count = 0
+                last_output_len = len(raw_output)
+        else:
+            no_growth_count += 1
+            if no_growth_count > max_no_growth or (time.time() - start_time > 600):
+                break
+    return raw_output
+
+
+def bench_legacy(n_cmds, lines, latency):
+    a, b = socket.socketpair()
+    SimulatedDevice(b, lines, latency).start()
+    chan = PollingChannel(a)
+    # 旧版登录：固定等待2.5秒
+    time.sleep(2.5)
+    chan.recv(65535)
+    durations = []
+    for i in range(n_cmds):
+        start = time.perf_counter()
+        legacy_run_command(chan, f'display cmd{i}')
+        durations.append(time.perf_counter() - start)
+    a.close()
+    return durations
+
+
+def bench_reader(n_cmds, lines, latency):
+    a, b = socket.socketpair()
+    SimulatedDevice(b, lines, latency).start()
+    reader = ChannelReader(a)
+    login, _ = reader.read_until(lambda d: d.rstrip().endswith('>'), idle_timeout=30, total_timeout=30)
+    prompt_regex = build_prompt_regex(login.strip().splitlines()[-1])
+
+    def on_chunk(data):
+        lines_ = data.strip().splitlines()
+        return bool(lines_) and bool(prompt_regex.match(lines_[-1].strip()))
+
+    durations = []
+    for i in range(n_cmds):
+        start = time.perf_counter()
+        reader.send(f'display cmd{i}\n')
+        reader.read_until(on_chunk, idle_timeout=3.2, total_timeout=600)
+        durations.append(time.perf_counter() - start)
+    a.close()
+    return durations
+
+
+def report(title, durations):
+    print(f"{title}: 平均 {statistics.mean(durations) * 1000:.1f}ms, "
+          f"中位数 {statistics.median(durations) * 1000:.1f}ms, "
+          f"最大 {max(durations) * 1000:.1f}ms ({len(durations)} 条命令)")
+
+
+def main():
+    n_cmds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    print("通道读取性能测试")
+    print("=" * 50)
+    print(f"命令数: {n_cmds}，每条输出: {lines} 行，设备响应延迟: {latency * 1000:.0f}ms")
+    report("ChannelReader", bench_reader(n_cmds, lines, latency))
+    report("旧版sleep轮询", bench_legacy(n_cmds, lines, latency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出清理性能基准 - 对比旧版 clean_output_preserve_integrity 与 output_cleaner 的吞吐量(MB/s)
+同时负责生成黄金样本：golden_cleaner/*.raw 为原始输出，*.clean 为旧版清理结果
+
+用法:
+    python3 bench_cleaner.py [配置大小MB]      # 性能对比（默认 5MB）
+    python3 bench_cleaner.py --write-golden    # 用旧版实现重新生成黄金样本
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from output_cleaner import clean_output, StreamCleaner
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_cleaner')
+
+HUAWEI_PAGER = "  ---- More ----\x1b[42D                                          \x1b[42D"
+H3C_PAGER = "  ---- More ----\x1b[16D                \x1b[16D"
+CISCO_PAGER = " --More-- " + "\x08" * 10 + " " * 10 + "\x08" * 10
+
+
+def legacy_clean_output(text, command=None):
+    """
+    旧版 clean_output_preserve_integrity 原样保留，用于生成黄金样本与性能对比
+    """
+    if not text:
+        return text
+    # 第一步：移除ANSI转义序列，但绝对保留换行符
+    text = re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', text)
+    text = re.sub(r'\x1b\[[0-9]*[A-Za-z]', '', text)
+    # 第二步：处理锐捷设备的退格符问题
+    text = re.sub(r'(\x08)+', '', text)
+    text = re.sub(r'(\bBS\b\s*)+', '', text)
+    # 第三步：统一换行符，但保留所有换行
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    # 第四步：逐行精确处理分页符和空格遗留问题
+    lines = text.split('\n')
+    cleaned_lines = []
+    pagination_patterns = [
+        r'---- More ----', r'--More--', r'<--- More --->', r'--- More ---',
+        r'Press any key to continue', r'Press SPACE to continue', r'Press Q to quit',
+        r'More:', r'\(more\)', r'\[more\]', r'---- more ----', r'--more--', 
+        r'\(MORE\)', r'\[MORE\]', r'-- More --', r'---More---'
+    ]
+    for line in lines:
+        original_line = line
+        line_stripped = line.strip()
+        is_pure_pagination = False
+        for pattern in pagination_patterns:
+            if re.fullmatch(pattern, line_stripped, flags=re.IGNORECASE):
+                is_pure_pagination = True
+                break
+        if is_pure_pagination:
+            continue
+        cleaned_line = original_line
+        for pattern in pagination_patterns:
+            match = re.search(pattern, cleaned_line, re.IGNORECASE)
+            if match:
+                before = cleaned_line[:match.start()]
+                after = cleaned_line[match.end():]
+                before_clean = before.rstrip()
+                after_clean = after.lstrip()
+                if after_clean.strip():
+                    cleaned_line = after_clean
+                elif before_clean.strip():
+                    cleaned_line = before_clean
+                else:
+                    cleaned_line = ''
+                break
+        # 清理Y/N自动应答残留（仅清理明显的孤立应答字符）
+        if re.match(r'^\s*[nNyY]\s*$', cleaned_line):
+            continue
+        cleaned_line = re.sub(r'\(y/n\):\s*[nNyY]\s*$', '(y/n):', cleaned_line, flags=re.IGNORECASE)
+        cleaned_line = re.sub(r'\(yes/no\):\s*(yes|no)\s*$', '(yes/no):', cleaned_line, flags=re.IGNORECASE)
+        cleaned_line = re.sub(r'\[Y/N\]:\s*[nNyY]\s*$', '[Y/N]:', cleaned_line, flags=re.IGNORECASE)
+        # V13增强：智能处理行首异常空格（分页符遗留）
+        leading_match = re.match(r'^(\s+)', cleaned_line)
+        if leading_match:
+            leading_spaces = leading_match.group(1)
+            leading_count = len(leading_spaces)
+            content_after_spaces = cleaned_line[leading_count:]
+            is_abnormal_leading = False
+            # 超过8个空格且内容为命令/任务/表格，判定为异常
+            if leading_count >= 8:
+                if re.match(r'^[A-Z0-9]+\s+\d+%', content_after_spaces):
+                    is_abnormal_leading = True
+                elif re.match(r'^[A-Z][A-Z0-9_]+\s+', content_after_spaces):
+                    is_abnormal_leading = True
+                elif re.match(r'^\w+\s+\w+\s+:', content_after_spaces):
+                    is_abnormal_leading = True
+            if is_abnormal_leading:
+                cleaned_line = content_after_spaces
+        # V13增强：行内异常空格压缩（分页符遗留）
+        # 对于任务/表格类，超过8个连续空格压缩为2个空格
+        cleaned_line = re.sub(r' {8,}', '  ', cleaned_line)
+        # 只清理行尾过多的空格（超过10个连续空格的行尾）
+        if re.search(r'\s{10,}$', cleaned_line):
+            cleaned_line = cleaned_line.rstrip()
+        cleaned_lines.append(cleaned_line)
+    # 第五步：适度的空行合并（保留格式完整性）
+    final_lines = []
+    consecutive_empty = 0
+    for line in cleaned_lines:
+        if not line.strip():
+            consecutive_empty += 1
+            if consecutive_empty <= 2:
+                final_lines.append(line)
+        else:
+            consecutive_empty = 0
+            final_lines.append(line)
+    result = '\n'.join(final_lines)
+    if result and not result.endswith('\n'):
+        result += '\n'
+    return result
+
+
+def huawei_config(interfaces, rng):
+    """华为 display current-configuration，每 40 行一个分页符"""
+    lines = ["display current-configuration", "!Software Version V200R019C10SPC500", "#", " sysname HUAWEI-CORE", "#"]
+    for i in range(interfaces):
+        lines += [f"interface GigabitEthernet0/0/{i}",
+                  f" description to-access-{rng.randint(1, 999)}/uplink",
+                  " port link-type trunk",
+                  " port trunk allow-pass vlan 10 20 30 to 40",
+                  "#"]
+    lines += ["return", "<HUAWEI-CORE>"]
+    out = []
+    for idx, line in enumerate(lines):
+        if idx and idx % 40 == 0:
+            out.append(HUAWEI_PAGER + line)
+        else:
+            out.append(line)
+    return "\r\n".join(out)
+
+
+def make_corpus():
+    """黄金样本：覆盖各厂商分页符、控制符、Y/N 残留、表格空格与空行合并"""
+    rng = random.Random(20250702)
+    corpus = {}
+    corpus['huawei_config'] = huawei_config(60, rng)
+    h3c = ["display current-configuration", "#", " version 7.1.064", "#"]
+    for i in range(80):
+        h3c += [f"interface Ten-GigabitEthernet1/0/{i}", " port link-mode bridge", "#"]
+        if i % 12 == 11:
+            h3c.append(H3C_PAGER)
+    corpus['h3c_config'] = "\r\n".join(h3c + ["return", "<H3C>"])
+    cisco = ["show running-config", "Building configuration...", "", "Current configuration : 8812 bytes", "!"]
+    for i in range(60):
+        cisco += [f"interface GigabitEthernet1/0/{i}", " switchport mode access", "!"]
+        if i % 7 == 6:
+            cisco.append(CISCO_PAGER + cisco.pop())
+    corpus['cisco_running'] = "\r\n".join(cisco + ["end", "", "Switch#"])
+    corpus['ruijie_bs'] = (
+        "show running-config\r\nBS BS BS\r\nhostname Ruijie\r\n BS\r\n\r\nBS  interface GigabitEthernet 0/1\r\n"
+        " --More-- BSBS\r\n description BSuplink\r\nBS\r\n\r\n\r\nBS Ruijie#"
+    )
+    corpus['inspect_tables'] = "\r\n".join([
+        "display cpu-usage",
+        "CPU Usage Stat. Cycle: 60 (Second)",
+        "CPU Usage            : 12% Max: 35%",
+        "ServiceName  UseRate",
+        "          SOCK          3%",
+        "          VPR           1%",
+        "          TASK_MGR       0%",
+        "          ifm task  :  running",
+        "   FIB        5%          ",
+        "value" + " " * 14,
+        "Slot  Status         Temperature(C)                    Fan",
+        "\t\t\t\t\t\t\t\t  PWR1   Supply",
+        "<HUAWEI>",
+    ])
+    corpus['yn_prompts'] = "\r\n".join([
+        "reset counters interface",
+        "Warning: This will reset all counters. Continue? (y/n): n",
+        "n",
+        "  y  ",
+        "Save configuration? [Y/N]: y",
+        "Proceed (yes/no): no",
+        "Y",
+        "Info: Operation cancelled.",
+        "<HUAWEI>",
+    ])
+    corpus['blank_runs'] = "display version\n\n\n\n\n   \n\t\nVRP (R) software\r\n\r\n\r\n\r\n\r\nuptime\n \n\n\n<SW>\n\n\n"
+    corpus['mixed_eol'] = "line1\rline2\r\nline3\n\rline4\r\r\nline5 --More--\r        \rline6 Press any key to continue\r\n<SW>"
+    corpus['misc_unicode'] = (
+        "display interface brief\r\n接口          物理    协议\r\n"
+        "GE0/0/1       up      up  　　　\r\nGE0/0/2\xa0\xa0\xa0\xa0\xa0\xa0\xa0\xa0\xa0\xa0down\r\n"
+        "\x1b[1;31mERROR\x1b[0m: --- More --- (more) [MORE] More: test\r\n"
+        "\x0cpage\x0bbreak\x1c\x85\r\n<HUAWEI>"
+    )
+    atoms = ['a', 'B', 'S', 'BS', ' BS ', 'BS\n', '\n', '\r', '\r\n', ' ', '        ', '\x08', '\x1b[0m',
+             '\x1b[42D', '\x1b', '[', '1', ';', '---- More ----', HUAWEI_PAGER, '--More--', 'more',
+             'Press any key to continue', 'n', 'y', '(y/n): n', '(yes/no): yes', '[Y/N]: y', '/', '<SW>',
+             'TASK  10%', 'ABC_D ', 'x y :', '\t', '\x0c', '\xa0', '　', '中文']
+    for i in range(20):
+        corpus[f'fuzz_{i:02d}'] = ''.join(rng.choice(atoms) for _ in range(rng.randint(20, 400)))
+    return corpus
+
+
+def write_golden():
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name, raw in make_corpus().items():
+        with open(os.path.join(GOLDEN_DIR, name + '.raw'), 'w', encoding='utf-8', newline='') as f:
+            f.write(raw)
+        with open(os.path.join(GOLDEN_DIR, name + '.clean'), 'w', encoding='utf-8', newline='') as f:
+            f.write(legacy_clean_output(raw))
+    print(f"黄金样本已写入: {GOLDEN_DIR}")
+
+
+def throughput(func, text, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(text.encode('utf-8')) / 1024 / 1024 / best
+
+
+def stream_clean(text, chunk_size=65535):
+    out = []
+    cleaner = StreamCleaner(out.append)
+    for pos in range(0, len(text), chunk_size):
+        cleaner.feed(text[pos:pos + chunk_size])
+    cleaner.close()
+    return ''.join(out)
+
+
+def main():
+    if '--write-golden' in sys.argv:
+        write_golden()
+        return
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rng = random.Random(1)
+    text = huawei_config(int(size_mb * 1024 * 1024 / 180), rng)
+    assert clean_output(text) == legacy_clean_output(text)
+    assert stream_clean(text) == legacy_clean_output(text)
+    print("输出清理性能基准")
+    print("=" * 50)
+    print(f"样本: 华为配置 {len(text.encode('utf-8')) / 1024 / 1024:.1f} MB")
+    legacy = throughput(legacy_clean_output, text, repeat=1)
+    whole = throughput(clean_output, text)
+    streaming = throughput(stream_clean, text)
+    print(f"旧版 clean_output_preserve_integrity: {legacy:.2f} MB/s")
+    print(f"clean_output（整体）:                 {whole:.2f} MB/s ({whole / legacy:.0f}x)")
+    print(f"StreamCleaner（64KB 数据块）:         {streaming:.2f} MB/s ({streaming / legacy:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量采集性能基准 - bench_devices.py
+启动本机模拟设备（device_simulator），让 N 台模拟设备走完真实的备份/巡检流程（jobs.run_job），
+输出每分钟完成的设备数与单台设备耗时的 p50/p95，用于对比并发数、采集引擎与设备延迟/带宽的影响：
+    python bench_devices.py                                     # 默认 50 台，备份+巡检，两种引擎
+    python bench_devices.py -n 200 --latency 0.2 --bandwidth 100000 --engine async -c 50
+    python bench_devices.py --paging --password-change          # 强制分页 + 登录Y/N提示
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import async_engine
+import jobs
+from device_simulator import SimulatedDevice, VENDOR_PROFILES
+from timing import format_summary, read_records, summarize
+
+
+def percentile(values, pct):
+    """最近秩法百分位数（values 为空时返回 0）"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def run_bench(kind, devices, settings, output):
+    """执行一次批量任务，返回 (汇总字典, 每分钟设备数, p50, p95)"""
+    summary = jobs.run_job(kind, devices, output, settings)
+    durations = [device['duration'] for device in summary['devices']]
+    rate = summary['total'] / summary['duration'] * 60 if summary['duration'] else 0.0
+    return summary, rate, percentile(durations, 50), percentile(durations, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量备份/巡检性能基准（本机模拟设备）')
+    parser.add_argument('-n', '--devices', type=int, default=50, help='模拟设备数量（默认 50）')
+    parser.add_argument('--vendors', default=','.join(VENDOR_PROFILES), help='厂商列表，设备按顺序轮流分配')
+    parser.add_argument('--jobs', default='backup,inspect', help='要测试的任务（backup,inspect）')
+    parser.add_argument('--engine', choices=['thread', 'async', 'both'], default='both', help='采集引擎')
+    parser.add_argument('-c', '--concurrency', type=int, default=0, help='并发设备数（默认按引擎）')
+    parser.add_argument('--latency', type=float, default=0.05, help='每条命令的响应延迟秒数（默认 0.05）')
+    parser.add_argument('--bandwidth', type=int, default=0, help='每台设备输出带宽（字节/秒，0 不限速）')
+    parser.add_argument('--config-lines', type=int, default=2000, help='配置行数（默认 2000）')
+    parser.add_argument('--page-lines', type=int, default=24, help='分页时每页行数')
+    parser.add_argument('--paging', action='store_true', help='模拟设备拒绝关闭分页命令（强制翻页）')
+    parser.add_argument('--password-change', action='store_true', help='登录时输出 Y/N 密码修改提示')
+    parser.add_argument('--keep', metavar='目录', help='保留日志到指定目录（默认使用临时目录并在结束后删除）')
+    args = parser.parse_args()
+
+    vendors = [v.strip() for v in args.vendors.split(',') if v.strip()]
+    kinds = [k.strip() for k in args.jobs.split(',') if k.strip() in jobs.JOBS]
+    engines = {'thread': [False], 'async': [True], 'both': [False, True]}[args.engine]
+    if True in engines and not async_engine.is_available():
+        print("未安装 asyncssh，只测试线程池引擎")
+        engines = [False]
+
+    sims = [SimulatedDevice(vendor, latency=args.latency, bandwidth=args.bandwidth,
+                            config_lines=args.config_lines, page_lines=args.page_lines,
+                            accept_no_paging=not args.paging, password_change=args.password_change)
+            for vendor in vendors]
+    output = args.keep or tempfile.mkdtemp(prefix='bench_devices_')
+    try:
+        for sim in sims:
+            sim.start()
+        devices = [sims[i % len(sims)].device(f'SIM{i:04d}') for i in range(args.devices)]
+
+        print("批量采集性能基准")
+        print("=" * 50)
+        print(f"模拟设备: {args.devices} 台（{', '.join(vendors)}），响应延迟 {args.latency * 1000:.0f} ms，"
+              f"带宽 {args.bandwidth or '不限'}{' 字节/秒' if args.bandwidth else ''}，"
+              f"配置 {args.config_lines} 行，{'强制分页' if args.paging else '关闭分页'}"
+              f"{'，登录Y/N提示' if args.password_change else ''}")
+        for kind in kinds:
+            for use_async in engines:
+                settings = jobs.JobSettings(use_async_engine=use_async, max_retries=0)
+                if args.concurrency:
+                    settings.max_concurrent_devices = args.concurrency
+                    settings.async_max_concurrent = args.concurrency
+                elif use_async:
+                    # 未指定并发数时异步引擎按其默认会话上限测试（本机模拟设备，不经过跳板机）
+                    settings.async_max_concurrent = async_engine.DEFAULT_MAX_CONCURRENT
+                summary, rate, p50, p95 = run_bench(kind, devices, settings, output)
+                print(f"\n[{jobs.JOBS[kind][0]}] {summary['engine']}，并发 {summary['concurrency']}: "
+                      f"成功 {summary['success']}/{summary['total']}，总耗时 {summary['duration']:.1f}秒，"
+                      f"{rate:.0f} 台/分钟，单台 p50 {p50:.2f}秒 / p95 {p95:.2f}秒")
+                for line in format_summary(summarize(read_records(summary['timing_log'])), top=3):
+                    print(f"  {line}")
+        peak = max(sim.peak for sim in sims)
+        print(f"\n模拟设备同时在线会话峰值（单个厂商）: {peak}")
+    finally:
+        for sim in sims:
+            sim.stop()
+        if not args.keep:
+            shutil.rmtree(output, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
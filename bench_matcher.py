@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分页符/提示符匹配微基准 - 对比旧版逐行逐分页符比较与预编译 PromptMatcher
+每个数据块约 4KB（约 100 行配置），半数数据块以 '---- More ----' 结尾
+
+用法: python3 bench_matcher.py [数据块数量]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from channel_reader import build_prompt_regex
+from prompt_matcher import PAGINATION_INDICATORS, COMMAND_YN_PATTERNS, get_matcher
+
+
+def legacy_scan(data, prompt_list=('#', '>', '$')):
+    """旧版 backup_device 接收循环中的每数据块检测逻辑（去掉 sleep 与 send）"""
+    pagination_found = False
+    for line in data.split('\n'):
+        line_clean = line.strip()
+        for indicator in PAGINATION_INDICATORS:
+            if line_clean.lower() == indicator.lower().strip():
+                pagination_found = True
+                break
+            elif re.match(rf'^\s*{re.escape(indicator)}\s*$', line_clean, re.IGNORECASE):
+                pagination_found = True
+                break
+        if pagination_found:
+            break
+    if pagination_found:
+        return 'pager'
+    for pattern in COMMAND_YN_PATTERNS:
+        if re.search(pattern, data, re.IGNORECASE):
+            return 'yn'
+    lines = data.strip().splitlines()
+    if lines and any(lines[-1].strip().endswith(p) for p in prompt_list):
+        return 'prompt'
+    return None
+
+
+def make_chunks(count):
+    chunks = []
+    for i in range(count):
+        body = ''.join(f" interface GigabitEthernet0/0/{j}\r\n  port link-type trunk\r\n" for j in range(50))
+        chunks.append(body + ('  ---- More ----' if i % 2 == 0 else '#\r\n'))
+    return chunks
+
+
+def timeit(func, chunks):
+    start = time.perf_counter()
+    results = [func(c) for c in chunks]
+    return time.perf_counter() - start, results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    chunks = make_chunks(count)
+    size_mb = sum(len(c) for c in chunks) / 1024 / 1024
+    matcher = get_matcher('huawei')
+    prompt_regex = build_prompt_regex('<HUAWEI>')
+
+    legacy_time, legacy_results = timeit(legacy_scan, chunks)
+    new_time, new_results = timeit(lambda c: matcher.scan(c, prompt_regex), chunks)
+
+    pagers_legacy = sum(1 for r in legacy_results if r == 'pager')
+    pagers_new = sum(1 for r in new_results if r == 'pager')
+    print("分页符/提示符匹配微基准")
+    print("=" * 50)
+    print(f"数据块: {count} 个，共 {size_mb:.1f} MB")
+    print(f"旧版逐行匹配: {legacy_time * 1e6 / count:.1f} µs/块 (识别分页 {pagers_legacy} 次)")
+    print(f"PromptMatcher: {new_time * 1e6 / count:.1f} µs/块 (识别分页 {pagers_new} 次)")
+    print(f"加速比: {legacy_time / new_time:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
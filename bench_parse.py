@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志解析性能基准 - 对比单进程与多进程（log_parse_pool）解析巡检日志的速度，
+以及使用解析缓存（parse_cache）时只有少量日志变化的重新解析耗时
+
+用法:
+    python3 bench_parse.py [日志数量]    # 默认 3000 个日志
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from log_parse_pool import parse_logs, default_workers
+from extract_loader import load_extract_module
+from parse_cache import ParseCache
+
+EXTRACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extract_device_status.py')
+
+LOG_TEMPLATE = """
+===== 命令 1: display version =====
+<SW{n}>display version
+Huawei Versatile Routing Platform Software
+VRP (R) software, Version 5.170 (S5700 V200R019C10SPC500)
+HUAWEI S5700-28C-HI uptime is {n} days, 3 hours, 12 minutes
+===== 命令 2: display cpu-usage =====
+CPU usage in the last 5 seconds: {cpu}%
+===== 命令 3: display memory-usage =====
+Memory usage: 45%
+===== 命令 4: display current-configuration =====
+{config}
+<SW{n}>
+"""
+
+
+def make_logs(folder, count):
+    config = "\n".join(f"interface GigabitEthernet0/0/{i}\n port link-type access\n#" for i in range(200))
+    for n in range(count):
+        with open(os.path.join(folder, f'SW{n}_20250702_100000.log'), 'w', encoding='utf-8') as f:
+            f.write(LOG_TEMPLATE.format(n=n, cpu=n % 100, config=config))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    folder = tempfile.mkdtemp()
+    try:
+        make_logs(folder, count)
+        log_files = load_extract_module(EXTRACT_PATH).find_log_files(folder)
+        print("日志解析性能基准")
+        print("=" * 50)
+        print(f"日志数量: {len(log_files)}，CPU 核心数: {default_workers()}")
+        baseline = None
+        workers = 1
+        while True:
+            start = time.perf_counter()
+            rows = parse_logs(EXTRACT_PATH, log_files, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            assert len(rows) == len(log_files)
+            baseline = baseline or elapsed
+            print(f"{workers:>3} 个进程: {elapsed:.2f} 秒，{len(rows) / elapsed:.0f} 个/秒 ({baseline / elapsed:.1f}x)")
+            if workers >= default_workers():
+                break
+            workers = min(workers * 2, default_workers())
+
+        # 解析缓存：首次解析写入缓存，修改 10 个日志后再次解析
+        with ParseCache(os.path.join(folder, 'parse_cache.db')) as cache:
+            start = time.perf_counter()
+            parse_logs(EXTRACT_PATH, log_files, max_workers=workers, cache=cache)
+            cold = time.perf_counter() - start
+            for log_file in log_files[:10]:
+                with open(log_file, 'a', encoding='utf-8') as f:
+                    f.write("\n")
+            start = time.perf_counter()
+            rows = parse_logs(EXTRACT_PATH, log_files, max_workers=workers, cache=cache)
+            warm = time.perf_counter() - start
+            assert len(rows) == len(log_files) and cache.hits == len(log_files) - 10
+        print(f"解析缓存: 首次 {cold:.2f} 秒，修改 10 个日志后重新解析 {warm * 1000:.0f} 毫秒")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
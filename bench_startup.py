@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准 - bench_startup.py
+测量从启动进程到首个窗口绘制完成的时间（脚本方式，以及可选的打包 exe），
+并列出导入主程序模块时加载的重量级依赖（应只在首次使用时才加载）。
+    python bench_startup.py                      # 脚本方式，默认 5 次
+    python bench_startup.py --runs 10 --exe dist/网络管理工具V6-Win7-并发增强版-完整版.exe
+需要图形环境；无显示器时只输出导入耗时。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_FILE = os.path.join(BASE_DIR, 'main_v6_final_win7 copy.py')
+# 与主程序中的 STARTUP_PROBE_ENV 一致
+STARTUP_PROBE_ENV = 'NETTOOL_STARTUP_PROBE'
+# 启动时不应加载的模块（首次 SSH 任务 / 首次解析时才加载）
+DEFERRED_MODULES = ['paramiko', 'asyncssh', 'cryptography', 'extract_device_status']
+
+IMPORT_PROBE = '''
+import importlib.util, json, sys, time
+sys.path.insert(0, {base!r})
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('main_app', {main!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {deferred!r} if m in sys.modules]}}))
+'''
+
+
+def measure_import():
+    """在新进程中导入主程序模块（不创建窗口），返回 (耗时秒, 已加载的重量级模块)"""
+    code = IMPORT_PROBE.format(base=BASE_DIR, main=MAIN_FILE, deferred=DEFERRED_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['seconds'], result['loaded']
+
+
+def first_paint(command, timeout=60):
+    """启动 command，返回到首个窗口绘制完成的秒数；无法启动窗口时返回 None"""
+    fd, probe_path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    os.remove(probe_path)
+    env = dict(os.environ, **{STARTUP_PROBE_ENV: probe_path})
+    start = time.time()
+    try:
+        process = subprocess.run(command, env=env, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    if process.returncode != 0 or not os.path.exists(probe_path):
+        return None
+    with open(probe_path, encoding='utf-8') as f:
+        painted = float(f.read())
+    os.remove(probe_path)
+    return painted - start
+
+
+def report(label, command, runs):
+    samples = []
+    for _ in range(runs):
+        seconds = first_paint(command)
+        if seconds is None:
+            print(f"{label}: 无法启动窗口（需要图形环境）")
+            return
+        samples.append(seconds)
+    print(f"{label}: 首帧 中位数 {statistics.median(samples) * 1000:.0f} ms，"
+          f"最快 {min(samples) * 1000:.0f} ms，最慢 {max(samples) * 1000:.0f} ms（{runs} 次）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='启动耗时基准')
+    parser.add_argument('--runs', type=int, default=5, help='每种方式的启动次数')
+    parser.add_argument('--exe', help='打包后的 exe（或目录版中的 exe）路径')
+    args = parser.parse_args()
+
+    print("启动耗时基准")
+    print("=" * 50)
+    imports = [measure_import() for _ in range(args.runs)]
+    print(f"导入主程序模块: 中位数 {statistics.median(s for s, loaded in imports) * 1000:.0f} ms")
+    loaded = imports[-1][1]
+    print(f"启动时已加载的重量级模块: {', '.join(loaded) if loaded else '无'}")
+    report("脚本方式", [sys.executable, MAIN_FILE], args.runs)
+    if args.exe:
+        report(f"打包方式 ({os.path.basename(args.exe)})", [args.exe], args.runs)
+    print("注：单文件版每次启动需先解压到临时目录，可用 build_v6_win7_concurrent.py --onedir 对比目录版")
+
+
+if __name__ == '__main__':
+    main()
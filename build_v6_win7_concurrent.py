@@ -11,8 +11,13 @@ import shutil
 import subprocess
 from datetime import datetime
 
-def build_v6_win7_concurrent():
-    """构建网络管理工具V6 Win7并发增强版"""
+APP_NAME = '网络管理工具V6-Win7-并发增强版-完整版'
+
+def build_v6_win7_concurrent(onedir=False):
+    """
+    构建网络管理工具V6 Win7并发增强版
+    onedir=True 时输出目录版：启动时不需要先把全部文件解压到临时目录，首个窗口出现更快
+    """
     
     print("=" * 60)
     print("网络管理工具V6 Win7并发增强版打包脚本")
@@ -49,6 +54,36 @@ def build_v6_win7_concurrent():
         shutil.rmtree(dist_dir)
         print(f"✅ 清理 {dist_dir}")
     
+    # 单文件版把依赖全部打进exe（每次启动先解压）；目录版exe只含脚本，依赖放在同目录
+    if onedir:
+        exe_args = '''
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,'''
+        upx = False  # 目录版不压缩，启动时免去UPX解压
+    else:
+        exe_args = '''
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    [],'''
+        upx = True
+    collect = f'''
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx={upx},
+    upx_exclude=[],
+    name='{APP_NAME}',
+)
+''' if onedir else ''
+
     # 创建spec文件内容
     spec_content = f'''# -*- mode: python ; coding: utf-8 -*-
 
@@ -89,7 +124,8 @@ a = Analysis(
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
-    excludes=[],
+    # invoke 仅用于 ssh_config 的 Match exec，缺少时 paramiko 自动跳过
+    excludes=['invoke'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=None,
@@ -98,18 +134,12 @@ a = Analysis(
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=None)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    [],
-    name='网络管理工具V6-Win7-并发增强版-完整版',
+exe = EXE({exe_args}
+    name='{APP_NAME}',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx={upx},
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
@@ -123,7 +153,7 @@ exe = EXE(
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
 )
-'''
+{collect}'''
 
     # 写入spec文件
     spec_file = "网络管理工具V6-Win7-并发增强版-完整版.spec"
@@ -147,8 +177,9 @@ exe = EXE(
             print("✅ 打包成功!")
             
             # 检查输出文件
-            exe_file = os.path.join("dist", "网络管理工具V6-Win7-并发增强版-完整版.exe")
-            exe_file_linux = os.path.join("dist", "网络管理工具V6-Win7-并发增强版-完整版")
+            dist_dir = os.path.join("dist", APP_NAME) if onedir else "dist"
+            exe_file = os.path.join(dist_dir, f"{APP_NAME}.exe")
+            exe_file_linux = os.path.join(dist_dir, APP_NAME)
             
             actual_file = None
             if os.path.exists(exe_file):
@@ -157,7 +188,11 @@ exe = EXE(
                 actual_file = exe_file_linux
             
             if actual_file:
-                file_size = os.path.getsize(actual_file) / (1024 * 1024)  # MB
+                if onedir:
+                    file_size = sum(os.path.getsize(os.path.join(d, name)) for d, _, names in os.walk(dist_dir)
+                                    for name in names) / (1024 * 1024)  # MB
+                else:
+                    file_size = os.path.getsize(actual_file) / (1024 * 1024)  # MB
                 print(f"✅ 输出文件: {actual_file}")
                 print(f"✅ 文件大小: {file_size:.1f} MB")
                 
@@ -222,7 +257,8 @@ if __name__ == '__main__':
     print("时间:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
     print()
     
-    if build_v6_win7_concurrent():
+    # --onedir: 输出目录版（启动更快，分发时需要整个目录）
+    if build_v6_win7_concurrent(onedir='--onedir' in sys.argv[1:]):
         create_release_info()
         print("\n" + "=" * 60)
         print("🎉 打包完成!")
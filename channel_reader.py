@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SSH通道读取模块 - channel_reader.py
+事件驱动地读取 paramiko 交互通道：基于 chan.settimeout() 阻塞等待，
+数据到达即唤醒，替代 "sleep + recv_ready()" 的固定间隔轮询。
+提示符、分页符、Y/N 检测由调用方按数据块(chunk)回调处理。
+"""
+
+import codecs
+import re
+import socket
+import time
+
+
+def build_prompt_regex(prompt):
+    """
+    根据登录后得到的设备提示符（如 <HUAWEI>、Switch#）生成匹配正则
+    兼容视图切换带来的变化（<HUAWEI> / [HUAWEI]、Switch# / Switch(config)#）
+    提示符无效时返回 None，由调用方退回启发式判断
+    """
+    core = (prompt or '').strip().lstrip('<[').rstrip('>]#$')
+    if not core:
+        return None
+    return re.compile(r'^[<\[]?' + re.escape(core) + r'[^\s<>\[\]#$]*[>\]#$]\s*$')
+
+
+class ChannelReader:
+    """
+    交互式通道读取器
+    chan 只需提供 settimeout / recv / sendall（paramiko.Channel 与 socket 均满足）
+    """
+
+    def __init__(self, chan, encoding='utf-8', chunk_size=65535):
+        self.chan = chan
+        self.chunk_size = chunk_size
+        self.closed = False
+        # 增量解码：多字节字符被拆分到两个数据块时不丢字
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+
+    def send(self, data):
+        """向设备发送数据（str 自动按 utf-8 编码）"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.chan.sendall(data)
+
+    def read_chunk(self, timeout):
+        """
+        最多等待 timeout 秒读取一个数据块
+        有数据立即返回文本；超时或通道关闭返回 None
+        """
+        if self.closed:
+            return None
+        # settimeout(0) 为非阻塞模式，这里保证至少阻塞1毫秒
+        self.chan.settimeout(max(timeout, 0.001))
+        try:
+            data = self.chan.recv(self.chunk_size)
+        except socket.timeout:
+            return None
+        if not data:
+            self.closed = True
+            return None
+        return self._decoder.decode(data)
+
+    def read_until(self, on_chunk, idle_timeout, total_timeout, settle_timeout=0.0, keep=True):
+        """
+        持续读取，每个数据块到达后调用 on_chunk(data)
+        on_chunk 返回 True 表示已出现结束提示符：
+          - settle_timeout 为 0 时立即结束
+          - 否则再等待 settle_timeout 秒，期间有新数据则继续读取
+        连续 idle_timeout 秒无数据、总耗时超过 total_timeout 或通道关闭时结束
+        返回 (本次读取到的全部原始输出, 是否以结束提示符结束)；
+        keep=False 时数据只交给 on_chunk，不在内存中保留，输出为空字符串
+        """
+        parts = []
+        deadline = time.time() + total_timeout
+        prompt_seen = False
+        while not self.closed:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            if prompt_seen:
+                if settle_timeout <= 0:
+                    break
+                wait = settle_timeout
+            else:
+                wait = idle_timeout
+            data = self.read_chunk(min(wait, remaining))
+            if data is None:
+                break
+            if data:
+                if keep:
+                    parts.append(data)
+                prompt_seen = bool(on_chunk(data))
+        return ''.join(parts), prompt_seen
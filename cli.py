@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行入口 - cli.py
+无界面运行批量备份、巡检、在线监控和日志解析，便于计划任务/CI 调用：
+    python cli.py backup devices.csv -o 备份目录
+    python cli.py inspect devices.csv -o 巡检目录 --concurrency 20
+    python cli.py monitor devices.csv --duration 600
+    python cli.py parse 日志目录 --csv 状态.csv
+    python cli.py diff 本次备份目录或清单 [上次备份目录或清单]
+    python cli.py history --index 历史.db [--device 设备名 | --failures | --runs]
+备份默认写入 <输出目录>/config_store 去重配置库，配置未变化的设备不再重复保存（--no-store 关闭）；
+--archive 把设备日志压缩写入本次任务目录下的一个 zip 归档，parse 可直接解析归档。
+parse 默认使用程序目录下的解析缓存，只重新解析新增或修改过的日志（--no-cache 关闭）；
+--index 指定运行历史索引（SQLite）时 backup/inspect 逐台写入结果，parse 写入健康指标，history 查询历史。
+进度输出到标准错误（-q 关闭），结束时把 JSON 汇总输出到标准输出（--json 指定文件时写入文件）。
+退出码：0 全部成功；1 部分设备失败/离线/解析失败；2 参数或输入错误。
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import config_diff
+import jobs
+import monitor_scheduler
+import parse_cache
+import reachability
+import run_index
+import timeseries
+from extract_loader import get_extract_module
+from log_parse_pool import parse_logs
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+class UsageError(Exception):
+    """参数或输入文件错误（退出码 2）"""
+
+
+def _progress(args):
+    if args.quiet:
+        return None
+
+    def progress(text):
+        sys.stderr.write(text)
+        sys.stderr.flush()
+    return progress
+
+
+def _load_devices(path, inspect=False):
+    if not os.path.isfile(path):
+        raise UsageError(f"设备列表不存在: {path}")
+    try:
+        devices = jobs.load_inspect_devices(path) if inspect else jobs.open_csv_compat(path)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        raise UsageError(f"读取设备列表失败: {e}")
+    if not devices:
+        raise UsageError(f"设备列表为空: {path}")
+    return devices
+
+
+def _job_settings(args):
+    settings = jobs.JobSettings(connection_timeout=args.timeout, max_retries=args.retries,
+                                use_async_engine=args.use_async, async_max_concurrent=args.async_limit,
+                                config_store=args.command == 'backup' and not args.no_store and not args.archive,
+                                archive_logs=args.archive, run_index=args.index)
+    if args.concurrency:
+        settings.max_concurrent_devices = args.concurrency
+    return settings
+
+
+def run_batch(args):
+    """backup / inspect"""
+    devices = _load_devices(args.devices, inspect=args.command == 'inspect')
+    os.makedirs(args.output, exist_ok=True)
+    summary = jobs.run_job(args.command, devices, args.output, _job_settings(args), progress=_progress(args))
+    return summary, EXIT_OK if summary['fail'] == 0 else EXIT_FAILED
+
+
+def run_monitor(args):
+    """单次探测全部设备；--duration 大于 0 时按自适应间隔持续监控指定秒数"""
+    devices = _load_devices(args.devices)
+    targets = reachability.device_targets(devices)
+    progress = _progress(args) or (lambda text: None)
+    history = timeseries.TimeSeriesStore(spill_dir=args.history_dir)
+    state = [None] * len(targets)
+
+    def record(indexes, probes, now):
+        for idx, (ok, rtt, error) in zip(indexes, probes):
+            ip = targets[idx][0]
+            if ip:
+                history.record(ip, ok, rtt=rtt, ts=now)
+            if state[idx] is not None and state[idx][0] != ok:
+                progress(f"[{time.strftime('%H:%M:%S')}] {ip} {'在线' if ok else '离线'}\n")
+            state[idx] = (ok, rtt, error)
+
+    start = time.time()
+    progress(f"探测设备: {len(targets)} 台\n")
+    probes = reachability.sweep(targets, timeout=args.timeout, max_in_flight=args.max_in_flight)
+    record(range(len(targets)), probes, time.time())
+    progress(f"在线: {sum(1 for ok, rtt, error in probes if ok)}/{len(targets)}\n")
+
+    if args.duration > 0:
+        scheduler = monitor_scheduler.MonitorScheduler(len(targets), min_interval=args.min_interval,
+                                                       base_interval=args.base_interval,
+                                                       max_interval=args.max_interval)
+        now = time.time()
+        scheduler.due(now)
+        for idx, (ok, rtt, error) in enumerate(probes):
+            scheduler.record(idx, ok, now)
+        end = start + args.duration
+        try:
+            while time.time() < end:
+                due = scheduler.due(time.time())
+                if due:
+                    results = reachability.sweep([targets[idx] for idx in due], timeout=args.timeout,
+                                                 max_in_flight=args.max_in_flight)
+                    now = time.time()
+                    record(due, results, now)
+                    for idx, (ok, rtt, error) in zip(due, results):
+                        scheduler.record(idx, ok, now)
+                    continue
+                next_due = scheduler.next_due()
+                wait = end - time.time() if next_due is None else min(next_due, end) - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+        except KeyboardInterrupt:
+            progress("监控已中断\n")
+        finally:
+            history.flush()
+
+    rows = []
+    for dev, (ip, port), (ok, rtt, error) in zip(devices, targets, state):
+        stats = history.summary(ip) if ip else {}
+        rows.append({
+            'name': dev.get('name') or dev.get('设备名') or dev.get('设备名称') or dev.get('主机名'),
+            'ip': ip,
+            'port': port,
+            'online': ok,
+            'rtt_ms': None if rtt is None else round(rtt, 2),
+            'error': error,
+            'availability': stats.get('availability'),
+            'changes': stats.get('changes', 0),
+            'samples': stats.get('samples', 0),
+        })
+    online = sum(1 for row in rows if row['online'])
+    summary = {
+        'job': 'monitor',
+        'total': len(rows),
+        'online': online,
+        'offline': len(rows) - online,
+        'duration': round(time.time() - start, 3),
+        'availability': history.availability(),
+        'devices': rows,
+    }
+    return summary, EXIT_OK if online == len(rows) else EXIT_FAILED
+
+
+def run_parse(args):
+    """并行解析日志目录，--csv 时把设备状态写入 CSV"""
+    if not os.path.isdir(args.log_dir):
+        raise UsageError(f"日志目录不存在: {args.log_dir}")
+    if args.extract and not os.path.isfile(args.extract):
+        raise UsageError(f"解析模块不存在: {args.extract}")
+    module = get_extract_module(args.extract)
+    if module is None:
+        raise UsageError("找不到 extract_device_status.py 解析模块")
+    progress = _progress(args) or (lambda text: None)
+    log_files = module.find_log_files(args.log_dir)
+    progress(f"日志文件: {len(log_files)} 个\n")
+    cache = None if args.no_cache else parse_cache.open_cache(args.cache)
+    start = time.time()
+    try:
+        rows = parse_logs(module.__file__, log_files, max_workers=args.workers, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    duration = time.time() - start
+    cached = 0 if cache is None else cache.hits
+    progress(f"解析完成: {len(rows)}/{len(log_files)} 个（缓存 {cached} 个），耗时 {duration:.1f}秒\n")
+    if args.csv and rows:
+        with open(args.csv, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.index:
+        with run_index.RunIndex(args.index) as index:
+            index.record_health(rows)
+    summary = {
+        'job': 'parse',
+        'log_dir': args.log_dir,
+        'files': len(log_files),
+        'parsed': len(rows),
+        'failed': len(log_files) - len(rows),
+        'cached': cached,
+        'duration': round(duration, 3),
+        'csv': args.csv,
+        'devices': rows,
+    }
+    return summary, EXIT_OK if len(rows) == len(log_files) else EXIT_FAILED
+
+
+def run_diff(args):
+    """比较两次备份的配置变化并写入报告；未指定上次备份时自动查找"""
+    for path in (args.new, args.old):
+        if path and not os.path.exists(path):
+            raise UsageError(f"备份不存在: {path}")
+    old = args.old or config_diff.previous_run(args.new)
+    if old is None:
+        raise UsageError(f"找不到 {args.new} 的上一次备份")
+    progress = _progress(args) or (lambda text: None)
+    start = time.time()
+    result = config_diff.diff_runs(args.new, old, workers=args.workers, progress=progress)
+    report = config_diff.write_report(result, args.report or config_diff.report_path_for(args.new))
+    progress(f"{config_diff.summary_line(result)}\n报告: {report}\n")
+    summary = {'job': 'diff', 'new': args.new, 'duration': round(time.time() - start, 3)}
+    summary.update(config_diff.result_dict(result, report))
+    return summary, EXIT_FAILED if result['errors'] else EXIT_OK
+
+
+def run_history(args):
+    """查询运行历史索引：默认全部设备的最新状态"""
+    if not os.path.isfile(args.index):
+        raise UsageError(f"运行历史索引不存在: {args.index}")
+    with run_index.RunIndex(args.index) as index:
+        if args.device:
+            view, rows = 'device', index.device_history(args.device, args.kind, args.limit)
+        elif args.failures:
+            view, rows = 'failures', index.failures(args.kind, args.since, args.limit)
+        elif args.runs:
+            view, rows = 'runs', index.recent_runs(args.kind, args.limit)
+        else:
+            view, rows = 'status', index.latest_status()
+    return {'job': 'history', 'index': args.index, 'view': view, 'rows': rows}, EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description='网络管理工具命令行（无界面）')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', metavar='文件', help='JSON 汇总写入文件（默认输出到标准输出）')
+    common.add_argument('-q', '--quiet', action='store_true', help='不输出进度')
+    sub = parser.add_subparsers(dest='command', metavar='命令')
+    sub.required = True
+
+    for name, label in (('backup', '批量备份配置'), ('inspect', '批量巡检（CSV 第8列起为巡检命令）')):
+        p = sub.add_parser(name, parents=[common], help=label)
+        p.add_argument('devices', help='设备列表 CSV')
+        p.add_argument('-o', '--output', default='.', help='输出目录（默认当前目录）')
+        p.add_argument('-c', '--concurrency', type=int, default=0, help='并发设备数（默认 5）')
+        p.add_argument('--timeout', type=float, default=30, help='连接超时秒数（默认 30）')
+        p.add_argument('--retries', type=int, default=3, help='连接重试次数（默认 3）')
+        p.add_argument('--async', dest='use_async', action='store_true',
+                       help='使用异步引擎（需要 asyncssh），默认使用线程池')
+        p.add_argument('--async-limit', type=int, default=0,
+                       help='异步引擎同时在线会话上限（默认与 --concurrency 相同，如 500）')
+        p.add_argument('--archive', action='store_true',
+                       help='设备日志压缩写入一个 zip 归档（备份时代替配置库）')
+        p.add_argument('--index', help='运行历史索引（SQLite 数据库），逐台写入结果')
+        if name == 'backup':
+            p.add_argument('--no-store', action='store_true',
+                           help='不使用去重配置库，每台设备的配置单独保存到本次备份目录')
+        p.set_defaults(func=run_batch)
+
+    p = sub.add_parser('monitor', parents=[common], help='探测设备在线状态')
+    p.add_argument('devices', help='设备列表 CSV')
+    p.add_argument('--timeout', type=float, default=reachability.DEFAULT_TIMEOUT, help='探测超时秒数')
+    p.add_argument('--max-in-flight', type=int, default=reachability.DEFAULT_MAX_IN_FLIGHT,
+                   help='同时进行中的连接数上限')
+    p.add_argument('--duration', type=float, default=0, help='持续监控秒数（默认 0：只探测一次）')
+    p.add_argument('--min-interval', type=float, default=monitor_scheduler.DEFAULT_MIN_INTERVAL)
+    p.add_argument('--base-interval', type=float, default=monitor_scheduler.DEFAULT_BASE_INTERVAL)
+    p.add_argument('--max-interval', type=float, default=monitor_scheduler.DEFAULT_MAX_INTERVAL)
+    p.add_argument('--history-dir', help='历史样本写入目录（CSV）')
+    p.set_defaults(func=run_monitor)
+
+    p = sub.add_parser('parse', parents=[common], help='解析日志目录中的设备状态')
+    p.add_argument('log_dir', help='日志目录（*.log、*.txt）')
+    p.add_argument('--csv', help='设备状态写入 CSV 文件')
+    p.add_argument('--workers', type=int, default=None, help='解析进程数（默认 CPU 核数）')
+    p.add_argument('--extract', help='extract_device_status.py 路径（默认自动查找）')
+    p.add_argument('--index', help='解析出的健康指标写入运行历史索引（SQLite 数据库）')
+    p.add_argument('--cache', help='解析缓存数据库（默认程序目录下的 parse_cache.db）')
+    p.add_argument('--no-cache', action='store_true', help='不使用解析缓存，全部重新解析')
+    p.set_defaults(func=run_parse)
+
+    p = sub.add_parser('diff', parents=[common], help='比较两次备份的配置变化')
+    p.add_argument('new', help='本次备份目录或配置库清单(config_store/runs/*.json)')
+    p.add_argument('old', nargs='?', help='上次备份（默认自动查找上一次）')
+    p.add_argument('--report', help='报告文件（默认写入本次备份目录）')
+    p.add_argument('--workers', type=int, default=None, help='比较进程数（默认 CPU 核数）')
+    p.set_defaults(func=run_diff)
+
+    p = sub.add_parser('history', parents=[common], help='查询运行历史索引')
+    p.add_argument('--index', default=run_index.default_path(), help='运行历史索引（默认程序目录下的数据库）')
+    view = p.add_mutually_exclusive_group()
+    view.add_argument('--device', help='一台设备的历史结果')
+    view.add_argument('--failures', action='store_true', help='最近的失败')
+    view.add_argument('--runs', action='store_true', help='最近的批量任务')
+    p.add_argument('--kind', choices=sorted(jobs.JOBS), help='只看备份或巡检')
+    p.add_argument('--since', help='失败的起始时间（YYYY-MM-DD[ HH:MM:SS]）')
+    p.add_argument('--limit', type=int, default=50, help='最多返回的条数（默认 50）')
+    p.set_defaults(func=run_history)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        summary, code = args.func(args)
+    except UsageError as e:
+        sys.stderr.write(f"错误: {e}\n")
+        return EXIT_USAGE
+    summary['exit_code'] = code
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+    return code
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置变化比较模块 - config_diff.py
+比较两次备份，找出配置发生变化的设备并生成一个变化报告：
+  1. 先按规范化配置的摘要比较（配置库清单中已有摘要；普通备份目录并行计算），未变化的设备不再读取内容；
+  2. 只对摘要不同的设备并行生成逐行差异（unified diff）；
+  3. 时间戳、ntp clock-period 等易变行在比较前去除（见 backup_store.VOLATILE_PATTERNS）。
+设备按设备名对应；同一次备份中有同名设备（无法确定对应关系）或配置读取失败的设备记入 errors，不参与比较。
+一次备份可以是普通备份目录（backup_<时间戳>/，含 *.log 或 zip 归档），也可以是配置库清单（config_store/runs/*.json）。
+批量备份结束时自动与上一次备份比较（jobs.run_job）；手动比较:
+    python cli.py diff 本次备份目录或清单 [上次备份目录或清单] [--report 报告.txt]
+"""
+
+import datetime
+import difflib
+import os
+import re
+import zipfile
+
+from backup_store import RUNS_DIR, ConfigStore, config_digest, normalize_lines
+from log_archive import ARCHIVE_SUFFIX, archive_entry_path, read_entry
+from log_parse_pool import map_chunks
+
+# 备份目录名与日志文件名中的时间戳
+RUN_DIR_REGEX = re.compile(r'^(?P<kind>[A-Za-z]+)_\d{8}_\d{6}$')
+LOG_NAME_REGEX = re.compile(r'^(?P<name>.+)_\d{8}_\d{6}(?:_\d+)?\.log$')
+# 设备数少于 MIN_PARALLEL_ITEMS 时直接在当前进程处理（工作单元切分见 log_parse_pool.map_chunks）
+MIN_PARALLEL_ITEMS = 64
+# 报告中单台设备最多输出的差异行数
+MAX_DIFF_LINES = 400
+REPORT_PREFIX = 'config_changes'
+DUPLICATE_ERROR = '同一次备份中有多份同名设备的配置，无法对应比较'
+
+
+def _device_name(filename):
+    match = LOG_NAME_REGEX.match(filename)
+    return match.group('name') if match else os.path.splitext(filename)[0]
+
+
+def load_snapshot(path, duplicates=None):
+    """
+    读取一次备份：返回 {设备名: (配置路径, 摘要或None)}
+    path 为配置库清单(*.json)时只包含备份成功的设备；为目录时包含其中的设备日志与 zip 归档条目（汇总日志除外）
+    同名设备出现多次时不在结果中，设备名加入 duplicates（集合）
+    """
+    snapshot = {}
+    seen = set()
+
+    def add(name, value):
+        if name in seen:
+            snapshot.pop(name, None)
+            if duplicates is not None:
+                duplicates.add(name)
+        else:
+            seen.add(name)
+            snapshot[name] = value
+
+    if os.path.isfile(path) and path.endswith('.json'):
+        store = ConfigStore(os.path.dirname(os.path.dirname(os.path.abspath(path))))
+        for entry in store.load_manifest(path)['devices']:
+            if entry.get('ok') and entry.get('blob'):
+                add(entry['name'], (store.blob_path(entry['blob']), entry['blob']))
+        return snapshot
+    for filename in sorted(os.listdir(path)):
+        full = os.path.join(path, filename)
+        if filename.endswith(ARCHIVE_SUFFIX):
+            with zipfile.ZipFile(full) as zf:
+                names = zf.namelist()
+            for name in names:
+                if '/' not in name and name.endswith('.log'):
+                    add(_device_name(name), (archive_entry_path(full, name), None))
+        elif filename.endswith('.log') and '_summary_' not in filename:
+            add(_device_name(filename), (full, None))
+    return snapshot
+
+
+def previous_run(path):
+    """
+    上一次备份：清单取配置库中时间在前的上一个清单；
+    目录取同一输出目录下同类（backup_<时间戳>）、时间在前、含设备日志的上一个目录；没有时返回 None
+    """
+    path = os.path.abspath(path)
+    if os.path.isfile(path) and path.endswith('.json'):
+        runs_dir = os.path.dirname(path)
+        names = sorted(name for name in os.listdir(runs_dir) if name.endswith('.json') and
+                       os.path.join(runs_dir, name) < path)
+        return os.path.join(runs_dir, names[-1]) if names else None
+    parent, current = os.path.split(path.rstrip(os.sep))
+    match = RUN_DIR_REGEX.match(current)
+    if not match:
+        return None
+    prefix = match.group('kind') + '_'
+    for name in sorted(os.listdir(parent), reverse=True):
+        folder = os.path.join(parent, name)
+        if name < current and name.startswith(prefix) and RUN_DIR_REGEX.match(name) and os.path.isdir(folder) \
+                and load_snapshot(folder):
+            return folder
+    return None
+
+
+def read_config_lines(path):
+    """读取配置（普通文件、配置库文件或归档条目），返回规范化后的行列表"""
+    return list(normalize_lines(read_entry(path).splitlines()))
+
+
+def _digest_chunk(paths):
+    """返回 [(路径, 摘要, 错误), ...]，读取失败时摘要为 None"""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, config_digest(read_entry(path).splitlines()), None))
+        except Exception as e:
+            results.append((path, None, f"读取 {path} 失败: {e}"))
+    return results
+
+
+def _diff_chunk(items):
+    """
+    items 为 [(设备名, 上次路径, 本次路径), ...]，
+    返回 [(设备名, 新增行数, 删除行数, 差异行, 错误), ...]，读取失败时只有设备名与错误
+    """
+    results = []
+    for name, old_path, new_path in items:
+        try:
+            old_lines = read_config_lines(old_path)
+            new_lines = read_config_lines(new_path)
+        except Exception as e:
+            results.append((name, 0, 0, [], f"读取配置失败: {e}"))
+            continue
+        diff = list(difflib.unified_diff(old_lines, new_lines, f'上次/{name}', f'本次/{name}', n=2, lineterm=''))
+        added = sum(1 for line in diff if line.startswith('+') and not line.startswith('+++'))
+        removed = sum(1 for line in diff if line.startswith('-') and not line.startswith('---'))
+        results.append((name, added, removed, diff, None))
+    return results
+
+
+def diff_runs(new_path, old_path, workers=None, progress=None):
+    """
+    比较两次备份，返回:
+        {'new': 本次, 'old': 上次, 'changed': [(设备名, 新增行数, 删除行数, 差异行), ...],
+         'unchanged': [设备名...], 'added': [本次新出现的设备], 'removed': [本次缺少的设备],
+         'errors': [(设备名, 错误), ...]}
+    errors 为无法比较的设备：任一次备份中有同名设备，或配置读取失败
+    进程池不可用改为单进程处理时通过 progress(text) 提示
+    """
+    def on_fallback(e):
+        if progress is not None:
+            progress(f"并行比较失败，改为单进程处理: {e}\n")
+
+    duplicates = set()
+    new = load_snapshot(new_path, duplicates)
+    old = load_snapshot(old_path, duplicates)
+    errors = {}
+    for name in duplicates:
+        new.pop(name, None)
+        old.pop(name, None)
+        errors[name] = DUPLICATE_ERROR
+    common = sorted(set(new) & set(old))
+    # 第一步：补齐缺少的摘要（只计算两次都存在的设备）
+    missing = [snap[name][0] for name in common for snap in (new, old) if snap[name][1] is None]
+    digests = {}
+    read_errors = {}
+    for path, value, error in map_chunks(_digest_chunk, missing, workers, MIN_PARALLEL_ITEMS, on_fallback):
+        digests[path] = value
+        if error is not None:
+            read_errors[path] = error
+
+    def digest(snap, name):
+        path, value = snap[name]
+        return value if value is not None else digests[path]
+
+    for name in common:
+        for snap in (new, old):
+            if snap[name][0] in read_errors:
+                errors.setdefault(name, read_errors[snap[name][0]])
+    common = [name for name in common if name not in errors]
+    unchanged = [name for name in common if digest(new, name) == digest(old, name)]
+    changed_items = [(name, old[name][0], new[name][0]) for name in common if digest(new, name) != digest(old, name)]
+    # 第二步：只对摘要不同的设备生成差异
+    changed = []
+    for name, added, removed, diff, error in map_chunks(_diff_chunk, changed_items, workers, MIN_PARALLEL_ITEMS,
+                                                        on_fallback):
+        if error is None:
+            changed.append((name, added, removed, diff))
+        else:
+            errors[name] = error
+    return {
+        'new': new_path,
+        'old': old_path,
+        'changed': sorted(changed),
+        'unchanged': unchanged,
+        'added': sorted(set(new) - set(old)),
+        'removed': sorted(set(old) - set(new)),
+        'errors': sorted(errors.items()),
+    }
+
+
+def summary_line(result):
+    line = (f"配置变化: 变化 {len(result['changed'])} 台，未变化 {len(result['unchanged'])} 台，"
+            f"新增 {len(result['added'])} 台，缺失 {len(result['removed'])} 台")
+    if result['errors']:
+        line += f"，无法比较 {len(result['errors'])} 台"
+    return line
+
+
+def write_report(result, path):
+    """把比较结果写入一个文本报告"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("配置变化报告\n")
+        f.write(f"生成时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"本次备份: {result['new']}\n")
+        f.write(f"上次备份: {result['old']}\n")
+        f.write(summary_line(result) + "（已忽略时间戳等易变行）\n")
+        for name in result['added']:
+            f.write(f"[新增] {name}\n")
+        for name in result['removed']:
+            f.write(f"[缺失] {name}\n")
+        for name, error in result['errors']:
+            f.write(f"[无法比较] {name}: {error}\n")
+        for name, added, removed, diff in result['changed']:
+            f.write(f"\n[变化] {name}  +{added} -{removed}\n")
+            f.write('\n'.join(diff[:MAX_DIFF_LINES]) + '\n')
+            if len(diff) > MAX_DIFF_LINES:
+                f.write(f"... 省略 {len(diff) - MAX_DIFF_LINES} 行差异\n")
+    return path
+
+
+def report_path_for(new_path):
+    """默认报告路径：目录写入该目录；清单写入同名的备份目录（不存在时写在清单旁）"""
+    if os.path.isdir(new_path):
+        run = os.path.basename(os.path.abspath(new_path).rstrip(os.sep))
+        return os.path.join(new_path, f'{REPORT_PREFIX}_{run}.txt')
+    run = os.path.splitext(os.path.basename(new_path))[0]
+    store_root = os.path.dirname(os.path.dirname(os.path.abspath(new_path)))
+    folder = os.path.join(os.path.dirname(store_root), run)
+    if not os.path.isdir(folder) or os.path.basename(os.path.dirname(new_path)) != RUNS_DIR:
+        folder = os.path.dirname(new_path)
+    return os.path.join(folder, f'{REPORT_PREFIX}_{run}.txt')
+
+
+def compare_with_previous(new_path, report=None, workers=None, progress=None):
+    """
+    与上一次备份比较并写入报告，返回 (比较结果, 报告路径)；没有上一次备份时返回 (None, None)
+    """
+    old_path = previous_run(new_path)
+    if old_path is None:
+        return None, None
+    result = diff_runs(new_path, old_path, workers, progress)
+    return result, write_report(result, report or report_path_for(new_path))
+
+
+def result_dict(result, report):
+    """比较结果 -> 可序列化为 JSON 的摘要"""
+    return {
+        'report': report,
+        'old': result['old'],
+        'changed': [{'name': name, 'added': added, 'removed': removed}
+                    for name, added, removed, diff in result['changed']],
+        'unchanged': len(result['unchanged']),
+        'added': result['added'],
+        'removed': result['removed'],
+        'errors': [{'name': name, 'error': error} for name, error in result['errors']],
+    }
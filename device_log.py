@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+设备日志写入模块 - device_log.py
+数据块 -> 增量清理(StreamCleaner) -> 带缓冲的文件写入，
+单台设备占用的内存与配置大小无关；会话中途断开时已接收的输出保留在日志中。
+"""
+
+import datetime
+import os
+import re
+import tempfile
+
+from output_cleaner import StreamCleaner
+
+# 文件写入缓冲区大小
+WRITE_BUFFER_SIZE = 256 * 1024
+# 单台设备的输出在内存中缓冲的上限，超过后转存到临时文件（SpooledLogWriter）
+SPOOL_SIZE = 4 * 1024 * 1024
+
+
+def safe_filename(name):
+    """将设备名中的非法文件名字符替换为下划线"""
+    return re.sub(r'[^-\w\-\_\u4e00-\u9fa5]', '_', name)
+
+
+def device_log_path(folder, name):
+    """设备日志路径：<目录>/<设备名>_<时间戳>.log"""
+    return os.path.join(folder, f'{safe_filename(name)}_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
+
+
+class DeviceLogWriter:
+    """
+    单台设备的流式日志
+    用法:
+        with DeviceLogWriter(path, headers=True) as writer:
+            session.stream_many(cmds, writer)
+    headers=True 时每条命令前写入 "===== 命令 N: cmd =====" 标识（巡检日志格式）
+    file 为已打开的文本文件对象时写入该对象（path 仅用于显示），否则打开 path
+    """
+
+    def __init__(self, path, headers=False, file=None):
+        self.path = path
+        self.headers = headers
+        if file is None:
+            file = open(path, 'w', encoding='utf-8', errors='ignore', buffering=WRITE_BUFFER_SIZE)
+        self._file = file
+        self._cleaner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def start_command(self, idx, cmd, prompt):
+        """开始一条命令；prompt 为上一段输出末尾的提示符，清理后补在输出开头"""
+        if self.headers:
+            # 添加命令标识
+            self._file.write(f"\n===== 命令 {idx + 1}: {cmd} =====\n")
+        self._cleaner = StreamCleaner(self._file.write, prompt)
+
+    def feed(self, data):
+        self._cleaner.feed(data)
+
+    def end_command(self):
+        self._cleaner.close()
+        self._cleaner = None
+
+    def close(self):
+        """结束未完成的命令并关闭文件（异常退出时保留已写入的部分）"""
+        if self._file is None:
+            return
+        try:
+            if self._cleaner is not None:
+                self.end_command()
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class SpooledLogWriter(DeviceLogWriter):
+    """
+    先缓冲再提交的设备日志（配置库、日志归档使用）：清理后的输出先缓冲在内存（过大时转存临时文件），
+    关闭时把定位到开头的缓冲交给 commit(spool)，commit 返回最终的日志路径；
+    with 块因异常退出（会话失败）时丢弃缓冲，不提交不完整的配置，path 置为空
+    """
+
+    def __init__(self, name, commit, headers=False):
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, mode='w+', encoding='utf-8', errors='ignore')
+        super().__init__(name, headers, file=spool)
+        self.commit = commit
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close(commit=exc_type is None)
+        return False
+
+    def close(self, commit=True):
+        if self._file is None:
+            return
+        spool = self._file
+        try:
+            if commit:
+                if self._cleaner is not None:
+                    self.end_command()
+                spool.seek(0)
+                self.path = self.commit(spool)
+            else:
+                self._cleaner = None
+                self.path = ''
+        finally:
+            spool.close()
+            self._file = None
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+设备会话模块 - device_session.py
+统一封装SSH登录握手、Y/N自动应答、分页处理与提示符检测，
+备份、巡检、设备状态采集共用同一条读取路径
+"""
+
+import re
+import socket
+import time
+
+from channel_reader import ChannelReader, build_prompt_regex
+from prompt_matcher import PAGER, YN, PROMPT, LOGIN_MATCHER, get_matcher
+from output_cleaner import last_line
+from retry_policy import CommandTimeout, ConnectError, classify_error
+from timing import SessionTiming
+
+# 各厂商关闭终端分页的命令（仅对当前会话生效，登录后立即发送）
+NO_PAGING_COMMANDS = {
+    'huawei': ['screen-length 0 temporary'],
+    'h3c': ['screen-length disable'],
+    'cisco': ['terminal length 0'],
+    'ruijie': ['terminal length 0'],
+}
+# 厂商未知时依次尝试，第一条被接受即停止
+DEFAULT_NO_PAGING_COMMANDS = ['screen-length 0 temporary', 'screen-length disable', 'terminal length 0']
+
+# 设备拒绝命令时的回显特征
+COMMAND_REJECTED_PATTERNS = [
+    r'Unrecognized command',  # 华为/华三: Error: Unrecognized command found at '^' position.
+    r'Wrong parameter',
+    r'Incomplete command',
+    r'Too many parameters',
+    r'Unknown command',
+    r'% ?Invalid input',  # 思科/锐捷: % Invalid input detected at '^' marker.
+    r'^\s*Error:',
+    r'^\s*\^\s*$',
+]
+COMMAND_REJECTED_REGEX = re.compile('|'.join(COMMAND_REJECTED_PATTERNS), re.IGNORECASE | re.MULTILINE)
+
+
+def device_field(device, *keys, default=''):
+    """按顺序读取设备字典中的字段，兼容中英文列名"""
+    for key in keys:
+        value = device.get(key)
+        if value:
+            return value
+    return default
+
+
+def vendor_key(vendor):
+    """将CSV中的厂商字段归一为 huawei/h3c/cisco/ruijie，无法识别时返回空字符串"""
+    vendor = (vendor or '').lower()
+    if 'huawei' in vendor or '华为' in vendor:
+        return 'huawei'
+    if 'h3c' in vendor or '华三' in vendor:
+        return 'h3c'
+    if 'cisco' in vendor or '思科' in vendor:
+        return 'cisco'
+    if 'ruijie' in vendor or '锐捷' in vendor:
+        return 'ruijie'
+    return ''
+
+
+def vendor_timeouts(vendor, cmd):
+    """
+    根据命令类型和厂商计算 (总超时, 数据静默超时) 秒数
+    正常情况下命令在提示符重新出现时立即结束，超时只在异常时生效
+    """
+    vendor = (vendor or '').lower()
+    cmd = cmd.lower()
+    timeout = 300
+    if any(x in cmd for x in ['configuration', 'running-config', 'startup-config']):
+        timeout = 900  # 配置备份命令超时15分钟
+    elif any(x in cmd for x in ['version', 'hardware', 'system']):
+        timeout = 180
+    # 厂商特定超时调整
+    if 'huawei' in vendor:
+        timeout += 300  # 华为设备额外增加5分钟
+        idle_timeout = 20  # 华为设备需要更宽松的静默等待
+    elif 'h3c' in vendor:
+        timeout += 240  # 华三设备额外增加4分钟
+        idle_timeout = 12
+    elif 'cisco' in vendor:
+        timeout += 180  # 思科设备额外增加3分钟
+        idle_timeout = 12
+    else:
+        timeout += 120  # 锐捷及其他厂商额外增加2分钟
+        idle_timeout = 12
+    return timeout, idle_timeout
+
+
+class DeviceSession:
+    """
+    单台设备的交互式SSH会话
+    用法:
+        with DeviceSession(device) as session:
+            raw = session.run('display version')
+    """
+
+    def __init__(self, device, connect_timeout=30, login_timeout=30, idle_timeout=None, disable_paging=True):
+        self.name = device_field(device, 'name', '设备名', '设备名称', '主机名', default='unknown')
+        self.ip = device_field(device, 'ip', 'IP', default='-')
+        self.username = device_field(device, 'username', '用户名', default='admin')
+        self.password = device_field(device, 'password', '密码')
+        self.port = int(device_field(device, 'port', '端口', default=22))
+        self.vendor = (device_field(device, 'vendor', '厂商') or '').strip().lower()
+        self.connect_timeout = connect_timeout
+        self.login_timeout = login_timeout
+        self.idle_timeout = idle_timeout
+        self.disable_paging = disable_paging
+        self.transport = None
+        self.reader = None
+        self.login_output = ''
+        self.prompt = ''
+        self.prompt_regex = None
+        # 成功关闭分页后不再检测分页符
+        self.paging_disabled = False
+        self.no_paging_command = ''
+        self.matcher = get_matcher(vendor_key(self.vendor))
+        # 最近收到的输出末尾，提示符被拆分到两个数据块时也能识别
+        self._tail = ''
+        # 最近一段含非空白内容的输出末尾，用于取上一条命令结束时的提示符
+        self._content_tail = ''
+        # 流式执行时接收每个数据块的回调
+        self._on_data = None
+        # 各阶段耗时（连接、登录、逐条命令）；_phase 为正在执行的命令阶段
+        self.timing = SessionTiming()
+        self._phase = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def open(self):
+        """
+        建立SSH连接，完成登录握手并记录设备提示符
+        连接/登录阶段的异常统一转换为 ConnectError（带失败类别），供批量任务决定是否重试
+        """
+        # paramiko 及其加密库导入耗时较长，首次连接时才导入，不拖慢程序启动
+        import paramiko
+        # 从建连开始计时，不含首次导入 paramiko 的耗时
+        self.timing = SessionTiming()
+        try:
+            # 自行建立 TCP 连接，TCP 建连与 SSH 握手分别计时
+            with self.timing.phase('tcp_connect'):
+                sock = socket.create_connection((str(self.ip), self.port), timeout=self.connect_timeout)
+            # 直接使用 Transport：密钥交换（start_client）与认证（auth_password）分别计时；
+            # 与 SSHClient(AutoAddPolicy) 相同不校验主机密钥，只用密码认证（设备要求 keyboard-interactive 时自动改用）
+            self.transport = paramiko.Transport(sock)
+            self.transport.banner_timeout = self.connect_timeout
+            self.transport.auth_timeout = self.connect_timeout
+            with self.timing.phase('ssh_kex'):
+                self.transport.start_client(timeout=self.connect_timeout)
+            with self.timing.phase('ssh_auth'):
+                self.transport.auth_password(self.username, self.password)
+            chan = self.transport.open_session(timeout=self.connect_timeout)
+            chan.get_pty(width=1000, height=200)
+            chan.invoke_shell()
+            self.reader = ChannelReader(chan)
+            self._tail = ''
+            with self.timing.phase('login'):
+                self.login_output, _ = self.reader.read_until(self._on_login_chunk, self.login_timeout,
+                                                              self.login_timeout)
+        except Exception as e:
+            self.close()
+            raise ConnectError(classify_error(e), str(e) or e.__class__.__name__) from e
+        # 登录后的最后一行即设备提示符，命令结束以再次出现该提示符为准
+        if self.login_output.strip():
+            self.prompt = self.login_output.strip().splitlines()[-1].strip()
+        self.prompt_regex = build_prompt_regex(self.prompt)
+        if self.disable_paging:
+            self.setup_terminal()
+        return self
+
+    def setup_terminal(self):
+        """
+        发送厂商对应的关闭分页命令，避免大配置输出时逐页翻页
+        命令被设备拒绝时保持分页符检测作为兜底
+        """
+        cmds = NO_PAGING_COMMANDS.get(vendor_key(self.vendor), DEFAULT_NO_PAGING_COMMANDS)
+        for cmd in cmds:
+            # 关闭分页命令无响应时不中断会话，保持分页符检测
+            output = self.run(cmd, timeout=15, idle_timeout=5, phase='no_paging', check=False)
+            if output.strip() and not COMMAND_REJECTED_REGEX.search(output):
+                self.paging_disabled = True
+                self.no_paging_command = cmd
+                break
+        return self.paging_disabled
+
+    def run(self, cmd, timeout=None, idle_timeout=None, on_data=None, phase='command', check=True):
+        """
+        执行单条命令，返回原始输出（含回显与结束提示符）
+        指定 on_data 时每个数据块直接交给 on_data(data)，不在内存中累积，返回空字符串
+        phase 为该命令在耗时记录中的阶段名
+        check 为 True 时，通道关闭、静默或总超时而未出现结束提示符（输出不完整）抛出 CommandTimeout
+        """
+        timeout, idle_timeout, settle_timeout = self._prepare_run(cmd, timeout, idle_timeout, on_data, phase)
+        try:
+            self.reader.send(cmd.rstrip('\n') + '\n')
+            output, prompt_seen = self.reader.read_until(self._on_command_chunk, idle_timeout, timeout,
+                                                         settle_timeout, keep=on_data is None)
+        finally:
+            self._finish_run()
+        if check and not prompt_seen:
+            raise CommandTimeout(cmd, self.reader.closed, timeout)
+        return output
+
+    def _prepare_run(self, cmd, timeout, idle_timeout, on_data, phase):
+        """run() 的公共部分：计算超时、重置提示符检测状态并开始计时，返回 (总超时, 静默超时, 确认等待)"""
+        default_timeout, default_idle = vendor_timeouts(self.vendor, cmd)
+        if timeout is None:
+            timeout = default_timeout
+        if idle_timeout is None:
+            idle_timeout = self.idle_timeout if self.idle_timeout is not None else default_idle
+        # 未取得设备提示符时，出现疑似提示符后额外等待确认没有更多数据
+        settle_timeout = 0 if self.prompt_regex is not None else 1.5
+        self._tail = ''
+        self._content_tail = ''
+        self._on_data = on_data
+        self._phase = self.timing.begin(phase, cmd, chars=0, chunks=0, pages=0)
+        if on_data is not None:
+            self._phase['write_seconds'] = 0.0
+        return timeout, idle_timeout, settle_timeout
+
+    def _finish_run(self):
+        phase = self.timing.end(self._phase)
+        if phase is not None and 'write_seconds' in phase:
+            phase['write_seconds'] = round(phase['write_seconds'], 6)
+        self._phase = None
+        self._on_data = None
+
+    def timing_record(self, attempt=1, ok=True, error='', **fields):
+        """本次连接尝试的耗时记录（见 timing.SessionTiming.record）"""
+        return self.timing.record(device=self.name, ip=self.ip, vendor=vendor_key(self.vendor) or self.vendor,
+                                  attempt=attempt, ok=ok, error=error, **fields)
+
+    def run_many(self, cmds):
+        """顺序执行多条命令，返回 [(命令, 原始输出), ...]"""
+        return [(cmd, self.run(cmd)) for cmd in cmds]
+
+    def stream_many(self, cmds, writer):
+        """
+        顺序执行多条命令，输出边接收边交给 writer（DeviceLogWriter）清理并写入磁盘，
+        内存中不保留完整输出；某条命令未出现结束提示符时抛出 CommandTimeout（日志中保留已写入的部分）
+        """
+        # 第一条命令前补登录后的提示符，之后补上一条命令结束时的提示符
+        prompt = self.prompt
+        for idx, cmd in enumerate(cmds):
+            writer.start_command(idx, cmd, prompt)
+            self.run(cmd, on_data=writer.feed)
+            writer.end_command()
+            prompt = last_line(self._content_tail)
+
+    def close(self):
+        if self.transport is not None:
+            try:
+                with self.timing.phase('disconnect'):
+                    self.transport.close()
+            finally:
+                self.transport = None
+
+    def _on_login_chunk(self, data):
+        self._tail = (self._tail + data)[-LOGIN_MATCHER.tail_size:]
+        kind = LOGIN_MATCHER.scan(self._tail, check_pager=False)
+        if kind == YN:
+            # 登录阶段的Y/N提示（如华为密码变更提示）发送 'n' 跳过
+            self.reader.send(b'n\n')
+            return False
+        return kind == PROMPT
+
+    def _on_command_chunk(self, data):
+        phase = self._phase
+        if phase is not None:
+            phase['chars'] += len(data)
+            phase['chunks'] += 1
+        if self._on_data is not None:
+            if phase is not None:
+                start = time.perf_counter()
+                self._on_data(data)
+                phase['write_seconds'] += time.perf_counter() - start
+            else:
+                self._on_data(data)
+        self._tail = (self._tail + data)[-self.matcher.tail_size:]
+        if self._tail.strip():
+            self._content_tail = self._tail
+        kind = self.matcher.scan(self._tail, self.prompt_regex, check_pager=not self.paging_disabled)
+        if kind == PAGER:
+            if phase is not None:
+                phase['pages'] += 1
+            self.reader.send(b' ')
+            return False
+        if kind == YN:
+            self.reader.send(b'n\n')
+            return False
+        return kind == PROMPT
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟设备模块 - device_simulator.py
+本机 SSH 服务器（paramiko），模拟华为/华三/思科/锐捷设备的提示符、命令回显、
+---- More ---- 分页（含翻页后的擦除控制符）、登录时的 Y/N 密码修改提示，
+并可设置每条命令的响应延迟与输出带宽，供回归测试与 bench_devices.py 基准使用：
+    with SimulatedDevice('huawei', latency=0.05, bandwidth=200000) as sim:
+        device = {'name': 'SW1', 'ip': sim.host, 'port': sim.port, 'vendor': 'huawei', ...}
+    python device_simulator.py huawei --port 2222 --paging    # 单独运行，便于手工连接
+"""
+
+import argparse
+import socket
+import threading
+import time
+
+# 各厂商的提示符、分页符、翻页擦除序列、关闭分页命令与错误回显
+VENDOR_PROFILES = {
+    'huawei': {
+        'prompt': '<{name}>',
+        'banner': 'Info: The max number of VTY users is 10, and the number\r\n'
+                  '      of current VTY users on line is 1.',
+        'change_prompt': 'The password needs to be changed. Change now? [Y/N]:',
+        'no_paging': {'screen-length 0 temporary':
+                      'Info: The configuration takes effect on the current user terminal interface only.'},
+        'pager': '  ---- More ----',
+        'erase': '\x1b[42D' + ' ' * 42 + '\x1b[42D',
+        'error': "Error: Unrecognized command found at '^' position.",
+        'family': 'display',
+    },
+    'h3c': {
+        'prompt': '<{name}>',
+        'banner': '******************************************************************************\r\n'
+                  '* Copyright (c) 2004-2024 New H3C Technologies Co., Ltd. All rights reserved.*\r\n'
+                  '******************************************************************************',
+        'change_prompt': 'The password has expired. Change now? [Y/N]:',
+        'no_paging': {'screen-length disable': ''},
+        'pager': '---- More ----',
+        'erase': '\x1b[16D' + ' ' * 16 + '\x1b[16D',
+        'error': "% Unrecognized command found at '^' position.",
+        'family': 'display',
+    },
+    'cisco': {
+        'prompt': '{name}#',
+        'banner': '',
+        'change_prompt': None,
+        'no_paging': {'terminal length 0': ''},
+        'pager': ' --More-- ',
+        'erase': '\x08' * 10 + ' ' * 10 + '\x08' * 10,
+        'error': "% Invalid input detected at '^' marker.",
+        'family': 'show',
+    },
+    'ruijie': {
+        'prompt': '{name}#',
+        'banner': '',
+        'change_prompt': 'Do you want to change the password? [Y/N]:',
+        'no_paging': {'terminal length 0': ''},
+        'pager': ' --More-- ',
+        'erase': '\x08' * 10 + ' ' * 10 + '\x08' * 10,
+        'error': "% Invalid input detected at '^' marker.",
+        'family': 'show',
+    },
+}
+
+# 配置备份命令
+CONFIG_COMMANDS = {
+    'display': ('display current-configuration', 'display saved-configuration'),
+    'show': ('show running-config', 'show startup-config'),
+}
+
+# 巡检常用命令的固定输出（{name} 替换为设备名）
+CANNED_OUTPUTS = {
+    'display': {
+        'display version': 'VRP (R) software, Version 8.180 (S5735 V200R019C10SPC500)\n'
+                           'Copyright (C) 2012-2024 HUAWEI TECH Co., Ltd.\n'
+                           '{name} uptime is 120 days, 3 hours, 12 minutes',
+        'display cpu-usage': 'CPU Usage Stat. Cycle: 60 (Second)\n'
+                             'CPU usage in the last 5 seconds: 12%\n'
+                             'CPU usage in the last 1 minute: 10%\n'
+                             'CPU usage in the last 5 minutes: 9%',
+        'display memory-usage': 'Memory utilization statistics at 2025-07-02 10:00:00+08:00\n'
+                                'System Total Memory Is: 2097152 Kbytes\n'
+                                'Total Memory Used Is: 943718 Kbytes\n'
+                                'Memory Using Percentage Is: 45%',
+        'display fan': 'Slot  FanID  Online   Status   Speed\n'
+                       '1     1      Present  Normal   50%\n'
+                       '1     2      Present  Normal   50%',
+        'display power': 'PowerID   Online    Mode   State     Power(W)\n'
+                         'PWR1      Present   AC     Supply    150\n'
+                         'PWR2      Present   AC     Supply    150',
+        'display environment': 'Slot    Current(C)  Lower(C)   Upper(C)   Status\n'
+                               '1       35          0          70         NORMAL',
+        'display temperature': 'Slot    Current(C)  Lower(C)   Upper(C)   Status\n'
+                               '1       35          0          70         NORMAL',
+    },
+    'show': {
+        'show version': 'Cisco IOS Software, Version 15.2(4)E10, RELEASE SOFTWARE (fc2)\n'
+                        '{name} uptime is 120 days, 3 hours, 12 minutes\n'
+                        'System image file is "flash:c2960-lanbasek9-mz.152-4.E10.bin"',
+        'show processes cpu': 'CPU utilization for five seconds: 12%/0%; one minute: 10%; five minutes: 9%',
+        'show memory statistics': '                Head    Total(b)     Used(b)     Free(b)\n'
+                                  'Processor    2F3E1B8   134217728    60397977    73819751',
+        'show environment': 'FAN is OK\nTEMPERATURE is OK\nPOWER is OK',
+    },
+}
+
+
+def generate_config(vendor, name, lines=200):
+    """生成约 lines 行的设备配置（内容确定，可用于校验备份结果）"""
+    family = VENDOR_PROFILES[vendor]['family']
+    if family == 'display':
+        head = ['#', f'sysname {name}', '#', 'vlan batch 10 20 30', '#']
+        tail = ['#', 'user-interface vty 0 4', ' authentication-mode aaa', ' protocol inbound ssh', '#', 'return']
+        block = [' description to-access-{i}', ' port link-type access', ' port default vlan {vlan}', '#']
+        iface = 'interface GigabitEthernet0/0/{i}'
+    else:
+        head = ['Building configuration...', '', 'Current configuration : 8192 bytes', '!',
+                'version 15.2', f'hostname {name}', '!']
+        tail = ['!', 'line vty 0 4', ' login local', ' transport input ssh', '!', 'end']
+        block = [' description to-access-{i}', ' switchport mode access', ' switchport access vlan {vlan}', '!']
+        iface = 'interface GigabitEthernet0/{i}'
+    count = max(1, (lines - len(head) - len(tail)) // (len(block) + 1))
+    body = []
+    for i in range(1, count + 1):
+        vlan = 10 * (i % 3 + 1)
+        body.append(iface.format(i=i))
+        body.extend(line.format(i=i, vlan=vlan) for line in block)
+    return '\n'.join(head + body + tail)
+
+
+_host_key = None
+_host_key_lock = threading.Lock()
+
+
+def host_key():
+    """进程内共用的服务器主机密钥（生成 RSA 密钥较慢，只生成一次）"""
+    global _host_key
+    with _host_key_lock:
+        if _host_key is None:
+            import paramiko
+            _host_key = paramiko.RSAKey.generate(2048)
+        return _host_key
+
+
+class _Console:
+    """单个 SSH 会话的命令行：逐行读取命令、回显并按厂商格式输出"""
+
+    def __init__(self, device, chan):
+        self.device = device
+        self.chan = chan
+        self.profile = device.profile
+        self.prompt = self.profile['prompt'].format(name=device.hostname)
+        self.paging = True
+        self._buffer = b''
+
+    def _fill(self):
+        data = self.chan.recv(4096)
+        if not data:
+            raise EOFError
+        self._buffer += data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+    def read_line(self):
+        while b'\n' not in self._buffer:
+            self._fill()
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return line.decode('utf-8', errors='ignore')
+
+    def read_key(self):
+        while not self._buffer:
+            self._fill()
+        key, self._buffer = self._buffer[:1], self._buffer[1:]
+        return key
+
+    def send(self, text):
+        """按设置的带宽分块发送（bandwidth 为每秒字节数，0 表示不限速）"""
+        data = text.encode('utf-8')
+        bandwidth = self.device.bandwidth
+        if not bandwidth:
+            self.chan.sendall(data)
+            return
+        chunk = max(256, min(4096, bandwidth // 20))
+        start = time.perf_counter()
+        for offset in range(0, len(data), chunk):
+            self.chan.sendall(data[offset:offset + chunk])
+            # 按累计发送量计算应到达的时间，避免逐块 sleep 的误差累积
+            wait = start + (offset + chunk) / bandwidth - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+    def run(self):
+        device = self.device
+        if device.latency:
+            time.sleep(device.latency)
+        if self.profile['banner']:
+            self.send('\r\n' + self.profile['banner'] + '\r\n')
+        if device.password_change and self.profile['change_prompt']:
+            self.send('\r\n' + self.profile['change_prompt'])
+            answer = self.read_line()
+            self.send(answer + '\r\n')
+        self.send('\r\n' + self.prompt)
+        while True:
+            cmd = self.read_line().strip()
+            self.send(cmd + '\r\n')
+            if cmd in ('quit', 'exit', 'logout'):
+                return
+            device.count_command()
+            output = self.execute(cmd)
+            if device.latency:
+                time.sleep(device.latency)
+            if output:
+                self.write_output(output)
+            self.send(self.prompt)
+
+    def execute(self, cmd):
+        """返回命令输出（\\n 分隔，不含提示符）"""
+        if not cmd:
+            return ''
+        family = self.profile['family']
+        if cmd in self.profile['no_paging'] and self.device.accept_no_paging:
+            self.paging = False
+            return self.profile['no_paging'][cmd]
+        if cmd in CONFIG_COMMANDS[family]:
+            if self.device.drop_after_lines:
+                self.write_output('\n'.join(self.device.config.split('\n')[:self.device.drop_after_lines]))
+                raise EOFError
+            return self.device.config
+        canned = CANNED_OUTPUTS[family].get(cmd)
+        if canned is not None:
+            return canned.format(name=self.device.hostname)
+        # 命令被拒绝：^ 指向命令末尾
+        return ' ' * (len(self.prompt) + len(cmd)) + '^\n' + self.profile['error']
+
+    def write_output(self, output):
+        lines = output.split('\n')
+        page = self.device.page_lines if self.paging else 0
+        if not page or len(lines) <= page:
+            self.send('\r\n'.join(lines) + '\r\n')
+            return
+        for start in range(0, len(lines), page):
+            self.send('\r\n'.join(lines[start:start + page]) + '\r\n')
+            if start + page >= len(lines):
+                break
+            self.send(self.profile['pager'])
+            key = self.read_key()
+            self.send(self.profile['erase'])
+            if key in (b'q', b'Q'):
+                self.send('\r\n')
+                break
+
+
+class SimulatedDevice:
+    """
+    模拟设备 SSH 服务器（每个连接一个线程）
+    vendor            huawei / h3c / cisco / ruijie
+    latency           每条命令（及登录）的响应延迟秒数
+    bandwidth         输出带宽（字节/秒，0 不限速）
+    config_lines      配置备份命令输出的行数
+    page_lines        分页时每页行数
+    accept_no_paging  为 False 时拒绝关闭分页命令，强制走分页处理
+    password_change   登录时先输出 Y/N 密码修改提示（思科无此提示）
+    drop_after_lines  配置备份命令只输出前 N 行后断开会话（模拟中途断开，不输出提示符），0 不断开
+    username/password 指定时校验账号，否则接受任意账号
+    """
+
+    def __init__(self, vendor='huawei', host='127.0.0.1', port=0, hostname=None, latency=0.0, bandwidth=0,
+                 config_lines=200, page_lines=24, accept_no_paging=True, password_change=False,
+                 username=None, password=None, idle_timeout=300, drop_after_lines=0):
+        if vendor not in VENDOR_PROFILES:
+            raise ValueError(f"不支持的厂商: {vendor}")
+        self.vendor = vendor
+        self.profile = VENDOR_PROFILES[vendor]
+        self.host = host
+        self.port = port
+        self.hostname = hostname or f'SIM-{vendor.upper()}'
+        self.latency = latency
+        self.bandwidth = int(bandwidth)
+        self.config = generate_config(vendor, self.hostname, config_lines)
+        self.page_lines = page_lines
+        self.accept_no_paging = accept_no_paging
+        self.password_change = password_change
+        self.username = username
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.drop_after_lines = drop_after_lines
+        # 统计：累计连接数、当前/峰值会话数、累计命令数
+        self.connections = 0
+        self.active = 0
+        self.peak = 0
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._listener = None
+        self._thread = None
+        self._transports = set()
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        host_key()
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((self.host, self.port))
+        self._listener.listen(128)
+        self.port = self._listener.getsockname()[1]
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._accept_loop, name=f'sim-{self.vendor}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._listener is not None:
+            # 仅 close() 不能唤醒阻塞在 accept() 中的线程
+            try:
+                self._listener.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._listener.close()
+            self._listener = None
+        with self._lock:
+            transports = list(self._transports)
+        for transport in transports:
+            transport.close()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def device(self, name, **fields):
+        """生成指向本模拟设备的设备字典（与设备CSV的列名一致）"""
+        device = {'name': name, 'ip': self.host, 'username': self.username or 'admin',
+                  'password': self.password or 'admin', 'port': str(self.port), 'vendor': self.vendor}
+        device.update(fields)
+        return device
+
+    def count_command(self):
+        with self._lock:
+            self.commands += 1
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                sock, addr = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock):
+        import paramiko
+        transport = paramiko.Transport(sock)
+        transport.add_server_key(host_key())
+        server = _ssh_server(self)
+        with self._lock:
+            self._transports.add(transport)
+            self.connections += 1
+        try:
+            transport.start_server(server=server)
+            chan = transport.accept(30)
+            if chan is None or not server.shell_requested.wait(30):
+                return
+            chan.settimeout(self.idle_timeout)
+            with self._lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            try:
+                _Console(self, chan).run()
+            finally:
+                with self._lock:
+                    self.active -= 1
+                chan.close()
+        except (EOFError, OSError, paramiko.SSHException):
+            pass
+        finally:
+            transport.close()
+            with self._lock:
+                self._transports.discard(transport)
+
+
+def _server_interface():
+    import paramiko
+
+    class SSHServer(paramiko.ServerInterface):
+        def __init__(self, device):
+            self.device = device
+            self.shell_requested = threading.Event()
+
+        def get_allowed_auths(self, username):
+            return 'password'
+
+        def check_auth_password(self, username, password):
+            device = self.device
+            if device.username is not None and username != device.username:
+                return paramiko.AUTH_FAILED
+            if device.password is not None and password != device.password:
+                return paramiko.AUTH_FAILED
+            return paramiko.AUTH_SUCCESSFUL
+
+        def check_channel_request(self, kind, chanid):
+            if kind == 'session':
+                return paramiko.OPEN_SUCCEEDED
+            return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+        def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+            return True
+
+        def check_channel_window_change_request(self, channel, width, height, pixelwidth, pixelheight):
+            return True
+
+        def check_channel_shell_request(self, channel):
+            self.shell_requested.set()
+            return True
+    return SSHServer
+
+
+_server_class = None
+
+
+def _ssh_server(device):
+    """paramiko.ServerInterface 子类在首次使用时才定义（导入本模块不加载 paramiko）"""
+    global _server_class
+    if _server_class is None:
+        _server_class = _server_interface()
+    return _server_class(device)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模拟网络设备 SSH 服务器')
+    parser.add_argument('vendor', choices=sorted(VENDOR_PROFILES), help='模拟的厂商')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2222)
+    parser.add_argument('--hostname', help='设备名（提示符）')
+    parser.add_argument('--latency', type=float, default=0.0, help='每条命令的响应延迟秒数')
+    parser.add_argument('--bandwidth', type=int, default=0, help='输出带宽（字节/秒，0 不限速）')
+    parser.add_argument('--config-lines', type=int, default=200, help='配置行数')
+    parser.add_argument('--page-lines', type=int, default=24, help='每页行数')
+    parser.add_argument('--paging', action='store_true', help='拒绝关闭分页命令（强制分页）')
+    parser.add_argument('--password-change', action='store_true', help='登录时输出 Y/N 密码修改提示')
+    args = parser.parse_args()
+    sim = SimulatedDevice(args.vendor, host=args.host, port=args.port, hostname=args.hostname,
+                          latency=args.latency, bandwidth=args.bandwidth, config_lines=args.config_lines,
+                          page_lines=args.page_lines, accept_no_paging=not args.paging,
+                          password_change=args.password_change)
+    with sim:
+        print(f"模拟 {args.vendor} 设备已启动: ssh admin@{sim.host} -p {sim.port}（Ctrl+C 退出）")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
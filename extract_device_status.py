@@ -353,62 +353,114 @@ def extract_ruijie_info(output, info):
     
     return info
 
-def parse_log_files(log_dir):
+def find_log_files(log_dir):
     """
-    解析日志目录中的所有日志文件，返回设备状态列表
+    返回日志目录中的所有日志文件（*.log、*.txt），
+    以及日志归档（*.zip，每台设备一个条目）中的日志条目，条目路径形如 <归档.zip>/<条目名>
     """
     import os
     import glob
-    
-    results = []
-    
-    # 查找所有日志文件
+    import zipfile
+
     log_patterns = [
         os.path.join(log_dir, "*.log"),
         os.path.join(log_dir, "*.txt")
     ]
-    
+
     log_files = []
     for pattern in log_patterns:
         log_files.extend(glob.glob(pattern))
-    
-    for log_file in log_files:
+    # 只读取归档末尾的条目索引，不解压条目内容
+    for archive in glob.glob(os.path.join(log_dir, "*.zip")):
         try:
-            # 从文件名提取设备信息
-            filename = os.path.basename(log_file)
-            device_name = filename.split('_')[0] if '_' in filename else filename.split('.')[0]
-            
-            # 读取日志内容
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # 检测厂商
-            vendor = detect_vendor(content)
-            
-            # 提取状态信息
-            info = extract_info(content, vendor)
-            
-            # 组装结果
-            result = {
-                '设备名': device_name,
-                '时间': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                '厂商': vendor.upper(),
-                'CPU使用率': info.get('cpu', 'N/A'),
-                '内存使用率': info.get('mem', 'N/A'),
-                '温度状态': info.get('temp', 'N/A'),
-                '电源状态': info.get('power', 'N/A'),
-                '风扇状态': info.get('fan', 'N/A'),
-                '运行时间': info.get('uptime', 'N/A')
-            }
-            
-            results.append(result)
-            
-        except Exception as e:
-            print(f"解析文件 {log_file} 时出错: {e}")
+            with zipfile.ZipFile(archive) as zf:
+                names = zf.namelist()
+        except (zipfile.BadZipFile, OSError) as e:
+            print(f"读取归档 {archive} 时出错: {e}")
             continue
-    
+        log_files.extend(os.path.join(archive, name) for name in names
+                         if '/' not in name and name.lower().endswith(('.log', '.txt')))
+    return log_files
+
+def read_log_file(log_file, archives=None):
+    """
+    读取日志内容；归档内的条目（<归档.zip>/<条目名>）只解压该条目
+    archives 为 {归档路径: 已打开的 ZipFile}，同一组文件共用已打开的归档，避免重复读取条目索引
+    本模块可与程序分开更新，读取逻辑不依赖程序的其他模块；log_archive.read_entry 复用此函数
+    """
+    import os
+    import zipfile
+
+    archive, entry = os.path.split(log_file)
+    if archive.lower().endswith('.zip') and os.path.isfile(archive):
+        if archives is None:
+            with zipfile.ZipFile(archive) as zf:
+                return zf.read(entry).decode('utf-8', errors='ignore')
+        if archive not in archives:
+            archives[archive] = zipfile.ZipFile(archive)
+        return archives[archive].read(entry).decode('utf-8', errors='ignore')
+    with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+def parse_log_file(log_file, archives=None):
+    """
+    解析单个日志文件（或归档内的日志条目），返回设备状态字典
+    """
+    import os
+
+    # 从文件名提取设备信息
+    filename = os.path.basename(log_file)
+    device_name = filename.split('_')[0] if '_' in filename else filename.split('.')[0]
+    
+    # 读取日志内容
+    content = read_log_file(log_file, archives)
+    
+    # 检测厂商
+    vendor = detect_vendor(content)
+    
+    # 提取状态信息
+    info = extract_info(content, vendor)
+    
+    # 组装结果
+    return {
+        '设备名': device_name,
+        '时间': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        '厂商': vendor.upper(),
+        'CPU使用率': info.get('cpu', 'N/A'),
+        '内存使用率': info.get('mem', 'N/A'),
+        '温度状态': info.get('temp', 'N/A'),
+        '电源状态': info.get('power', 'N/A'),
+        '风扇状态': info.get('fan', 'N/A'),
+        '运行时间': info.get('uptime', 'N/A')
+    }
+
+def parse_log_chunk(log_files, key=None):
+    """
+    顺序解析一组日志文件，返回设备状态列表（解析出错的文件跳过）
+    作为并行解析的工作单元，一次处理多个文件以减少进程间通信；组内同一归档只打开一次
+    指定 key 时返回 [(key(日志路径), 设备状态), ...]，如解析缓存按日志路径对应结果
+    """
+    results = []
+    archives = {}
+    try:
+        for log_file in log_files:
+            try:
+                row = parse_log_file(log_file, archives)
+                results.append(row if key is None else (key(log_file), row))
+            except Exception as e:
+                print(f"解析文件 {log_file} 时出错: {e}")
+                continue
+    finally:
+        for zf in archives.values():
+            zf.close()
     return results
 
+def parse_log_files(log_dir):
+    """
+    解析日志目录中的所有日志文件，返回设备状态列表
+    """
+    return parse_log_chunk(find_log_files(log_dir))
+
 if __name__ == '__main__':
     # 测试代码
     test_output = """
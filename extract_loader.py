@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析模块加载器 - extract_loader.py
+查找并加载外部的 extract_device_status.py（可与程序分开更新），加载结果按路径缓存；
+文件修改时间变化后下次获取时自动重新加载，否则直接返回已加载的模块。
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+
+EXTRACT_FILENAME = 'extract_device_status.py'
+EXTRACT_MODULE_NAME = 'extract_device_status'
+
+_lock = threading.Lock()
+_cache = {'path': None, 'mtime': None, 'module': None}
+
+
+def candidate_paths():
+    """按优先级返回 extract_device_status.py 的候选路径"""
+    paths = []
+    # PyInstaller打包后的临时目录
+    if hasattr(sys, '_MEIPASS'):
+        paths.append(os.path.join(sys._MEIPASS, EXTRACT_FILENAME))
+    # 程序文件同目录
+    paths.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), EXTRACT_FILENAME))
+    # 当前工作目录
+    paths.append(os.path.abspath(EXTRACT_FILENAME))
+    # 程序所在目录
+    if hasattr(sys, 'executable') and sys.executable:
+        paths.append(os.path.join(os.path.dirname(sys.executable), EXTRACT_FILENAME))
+    # 工作目录的上级目录
+    paths.append(os.path.join(os.getcwd(), '..', EXTRACT_FILENAME))
+    return paths
+
+
+def find_extract_module():
+    """返回第一个存在的 extract_device_status.py 路径，找不到时返回 None"""
+    for path in candidate_paths():
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def load_extract_module(path):
+    """按路径加载 extract_device_status.py，并注册到 sys.modules（供 pickle 按模块名查找）"""
+    spec = importlib.util.spec_from_file_location(EXTRACT_MODULE_NAME, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"无法加载解析模块: {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[EXTRACT_MODULE_NAME] = module
+    return module
+
+
+def get_extract_module(path=None):
+    """
+    获取解析模块：路径只查找一次，模块只在首次获取或文件修改时间变化时加载
+    找不到文件时返回 None，加载出错时抛出异常
+    """
+    with _lock:
+        if path is None:
+            path = _cache['path']
+            if path is None or not os.path.isfile(path):
+                path = find_extract_module()
+                if path is None:
+                    return None
+        mtime = os.path.getmtime(path)
+        if _cache['module'] is not None and _cache['path'] == path and _cache['mtime'] == mtime:
+            return _cache['module']
+        module = load_extract_module(path)
+        _cache.update(path=path, mtime=mtime, module=module)
+        return module
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量任务模块 - jobs.py
+设备CSV读取、并发备份/巡检与汇总日志，不依赖 tkinter；
+图形界面与命令行(cli.py)共用，进度文本通过 progress(text) 回调输出。
+"""
+
+import csv
+import datetime
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import async_engine
+import config_diff
+from backup_store import STORE_DIRNAME, ConfigStore
+from device_log import DeviceLogWriter, device_log_path
+from device_session import DeviceSession
+from extract_loader import get_extract_module
+from log_archive import ARCHIVE_SUFFIX, LogArchive
+from retry_policy import RetryPolicy
+from run_index import IndexWriter, RunIndex
+from timing import TimingLog, format_summary, summarize
+
+
+def open_csv_compat(file_path):
+    """读取设备CSV，兼容 UTF-8 与 GBK 编码"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    except UnicodeDecodeError:
+        with open(file_path, 'r', encoding='gbk') as f:
+            return list(csv.DictReader(f))
+
+
+def load_inspect_devices(file_path):
+    """读取巡检设备+指令CSV：第8列起为巡检命令，存入 device['cmds']"""
+    devices = open_csv_compat(file_path)
+    for device in devices:
+        cmds = []
+        row_list = list(device.values())
+        if len(row_list) > 7:
+            cmds = [cmd.strip() for cmd in row_list[7:] if cmd and cmd.strip()]
+        device['cmds'] = cmds
+    return devices
+
+
+def backup_commands(device):
+    """根据厂商自动选择备份命令"""
+    vendor = (device.get('vendor', '') or '').lower()
+    if 'huawei' in vendor or 'h3c' in vendor:
+        return ['display current-configuration']
+    return ['show running-config']
+
+
+def inspect_commands(device):
+    """巡检命令：优先使用CSV中的指令，否则按厂商选择默认命令"""
+    vendor = (device.get('vendor', '') or '').lower()
+    cmds = device.get('cmds') if device.get('cmds') else None
+    if not cmds:
+        if vendor == 'huawei':
+            cmds = ['display cpu-usage', 'display memory-usage', 'display current-configuration', 'display fan', 'display power', 'display environment']
+        elif vendor == 'cisco':
+            cmds = ['show version', 'show running-config']
+        else:
+            cmds = ['display version', 'show version']
+    if isinstance(cmds, str):
+        cmds = [cmd.strip() for cmd in cmds.split(',') if cmd.strip()]
+    return cmds
+
+
+def backup_log_writer(device, backup_dir):
+    """备份日志：命令输出边接收边清理写入 <设备名>_<时间戳>.log"""
+    return DeviceLogWriter(device_log_path(backup_dir, device.get('name', 'unknown')))
+
+
+def inspect_log_writer(device, folder):
+    """巡检日志：每条命令前写入命令标识，输出边接收边清理写入"""
+    return DeviceLogWriter(device_log_path(folder, device.get('name', 'unknown')), headers=True)
+
+
+# 任务类型 -> (名称, 命令选择, 日志写入)
+JOBS = {
+    'backup': ('备份', backup_commands, backup_log_writer),
+    'inspect': ('巡检', inspect_commands, inspect_log_writer),
+}
+
+
+class JobSettings:
+    """
+    批量任务的并发、超时与重试参数
+    use_async_engine 为 True 时使用异步引擎（需要 asyncssh，默认使用线程池）；
+    async_max_concurrent 为异步引擎同时在线会话上限，为 None/0 时与 max_concurrent_devices 相同，
+    更大的上限（如 async_engine.DEFAULT_MAX_CONCURRENT）需要显式指定
+    config_store 为 True 时备份写入输出目录下的去重配置库（见 backup_store），不再逐台复制配置文件
+    archive_logs 为 True 时设备日志压缩写入本次任务目录下的一个 zip 归档（见 log_archive；备份使用配置库时不生效）
+    run_index 为 SQLite 数据库路径时每台设备完成即写入运行历史索引（见 run_index），巡检同时记录解析出的健康指标
+    """
+
+    def __init__(self, max_concurrent_devices=5, connection_timeout=30, max_retries=3, retry_base_delay=5,
+                 retry_max_delay=60, retry_jitter=0.3, use_async_engine=False, async_max_concurrent=None,
+                 config_store=False, archive_logs=False, run_index=None):
+        self.max_concurrent_devices = max_concurrent_devices
+        self.connection_timeout = connection_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.retry_jitter = retry_jitter
+        self.use_async_engine = use_async_engine
+        self.async_max_concurrent = async_max_concurrent
+        self.config_store = config_store
+        self.archive_logs = archive_logs
+        self.run_index = run_index
+
+    def use_async(self):
+        """已启用且安装了 asyncssh 时使用异步引擎"""
+        return self.use_async_engine and async_engine.is_available()
+
+    def concurrency(self):
+        """实际使用的并发数（异步引擎未设置会话上限时与并发设备数相同）"""
+        if self.use_async():
+            return self.async_max_concurrent or self.max_concurrent_devices
+        return self.max_concurrent_devices
+
+    def engine_name(self):
+        return "异步引擎" if self.use_async() else "线程池"
+
+    def retry_policy(self):
+        """根据重试次数构建连接重试策略"""
+        return RetryPolicy(max_retries=self.max_retries, base_delay=self.retry_base_delay,
+                           max_delay=self.retry_max_delay, jitter=self.retry_jitter)
+
+
+def collect_device(device, folder, commands_for, open_log, connect_timeout, attempt=1, on_timing=None):
+    """
+    登录单台设备执行命令并写入日志，返回 (ok, logfile, errmsg)
+    on_timing(耗时记录) 在本次连接尝试结束时回调
+    """
+    cmds = commands_for(device)
+    writer = None
+    session = DeviceSession(device, connect_timeout=connect_timeout)
+    try:
+        with session:
+            with open_log(device, folder) as writer:
+                session.stream_many(cmds, writer)
+        result = True, writer.path, ''
+    except Exception as e:
+        if writer is not None and writer.path:
+            # 逐台日志保留已接收的部分；配置库/归档的缓冲在失败时已丢弃（path 为空）
+            result = False, '', f"{e} (已保存部分输出: {writer.path})"
+        else:
+            result = False, '', str(e)
+    if on_timing is not None:
+        on_timing(session.timing_record(attempt, result[0], result[2]))
+    return result
+
+
+def _delayed_call(delay, func, *args):
+    """等待 delay 秒后调用 func（用于重试退避）"""
+    if delay > 0:
+        time.sleep(delay)
+    return func(*args)
+
+
+def _thread_worker(kind, settings, progress, on_timing, open_log):
+    """线程池方式下单台设备的任务，带开始/完成进度"""
+    label, commands_for = JOBS[kind][:2]
+
+    def worker(device, folder, device_idx, total, attempt):
+        name = device.get('name', 'unknown')
+        ip = device.get('ip', '-')
+        start_time = time.time()
+        progress(f"[{device_idx}/{total}] 开始{label}: {name} ({ip})\n")
+        try:
+            progress(f"[{device_idx}/{total}] 正在连接设备: {name} ({ip})\n")
+            ok, logfile, errmsg = collect_device(device, folder, commands_for, open_log, settings.connection_timeout,
+                                                 attempt, on_timing)
+            duration = time.time() - start_time
+            if ok:
+                progress(f"[{device_idx}/{total}] ✅ {label}完成: {name} ({ip}) -> {logfile} (耗时: {duration:.1f}秒)\n")
+            else:
+                progress(f"[{device_idx}/{total}] ❌ {label}失败: {name} ({ip}) -> {errmsg} (耗时: {duration:.1f}秒)\n")
+            return ok, logfile, errmsg, duration
+        except Exception as e:
+            duration = time.time() - start_time
+            progress(f"[{device_idx}/{total}] ❌ {label}异常: {name} ({ip}) -> {str(e)} (耗时: {duration:.1f}秒)\n")
+            return False, '', str(e), duration
+    return worker
+
+
+def run_device_batch(kind, devices, folder, settings, on_result, progress, on_timing=None, open_log=None):
+    """
+    批量采集设备，每台设备最终完成时回调 on_result(device, (ok, logfile, errmsg, duration))
+    已安装 asyncssh 时使用异步引擎（单线程维持大量会话），否则使用线程池
+    连接/登录阶段的超时、认证失败、连接中断在本轮结束后只对失败设备按退避时间重试
+    on_timing(耗时记录) 在每次连接尝试结束时回调（含重试）
+    open_log(device, folder) 不指定时使用任务类型对应的日志写入
+    """
+    label, commands_for, default_open_log = JOBS[kind]
+    open_log = open_log or default_open_log
+    total = len(devices)
+    policy = settings.retry_policy()
+
+    def on_retry(device, result, attempt, delay):
+        progress(f"[RETRY] {device.get('name', 'unknown')} ({device.get('ip', '-')}) -> {result[2]}，"
+                 f"{delay:.1f}秒后进行第 {attempt} 次重试\n")
+
+    if settings.use_async():
+        async_engine.run_batch(
+            devices, commands_for,
+            lambda device: open_log(device, folder),
+            max_concurrent=settings.concurrency(),
+            on_done=lambda idx, device, result: on_result(device, result),
+            retry_policy=policy,
+            on_retry=lambda idx, device, result, attempt, delay: on_retry(device, result, attempt, delay),
+            on_timing=None if on_timing is None else lambda idx, device, record: on_timing(record),
+            connect_timeout=settings.connection_timeout)
+        return
+    worker = _thread_worker(kind, settings, progress, on_timing, open_log)
+    # 创建线程池并发执行，重试轮次复用同一个线程池
+    with ThreadPoolExecutor(max_workers=settings.max_concurrent_devices) as executor:
+        pending = [(idx, device, 0) for idx, device in enumerate(devices)]
+        attempt = 1
+        while pending:
+            future_to_device = {}
+            for idx, device, delay in pending:
+                future = executor.submit(_delayed_call, delay, worker, device, folder, idx + 1, total, attempt)
+                future_to_device[future] = (idx, device)
+            pending = []
+
+            for future in as_completed(future_to_device):
+                idx, device = future_to_device[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = (False, '', str(e), 0)
+                if not result[0] and policy.should_retry(result[2], attempt):
+                    delay = policy.backoff(attempt)
+                    pending.append((idx, device, delay))
+                    on_retry(device, result, attempt, delay)
+                    continue
+                on_result(device, result)
+            attempt += 1
+
+
+def run_job(kind, devices, output_folder, settings, progress=None):
+    """
+    执行一次批量备份('backup')或巡检('inspect')：在 output_folder 下创建 <kind>_<时间戳> 目录，
+    写入每台设备的日志、汇总日志与阶段耗时记录(JSON Lines)，返回汇总字典（可直接序列化为 JSON）
+    备份且 settings.config_store 时设备配置写入 output_folder/config_store，本目录只保留汇总，
+    设备 -> 配置摘要的清单写入配置库 runs/<kind>_<时间戳>.json；
+    否则 settings.archive_logs 时设备日志写入本目录下的 <kind>_logs_<时间戳>.zip
+    settings.run_index 时任务与每台设备的结果写入运行历史索引（后台线程解析健康指标并分批提交），
+    索引无法打开或写入失败时只通过 progress 提示，不影响设备与任务的结果
+    """
+    label = JOBS[kind][0]
+    if progress is None:
+        def progress(text):
+            pass
+    now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    folder = os.path.join(output_folder, f'{kind}_{now}')
+    os.makedirs(folder, exist_ok=True)
+    total = len(devices)
+    success = 0
+    fail = 0
+    log_lines = []
+    results = []
+    store = None
+    archive = None
+    open_log = None
+    if kind == 'backup' and settings.config_store:
+        store = ConfigStore(os.path.join(output_folder, STORE_DIRNAME))
+        open_log = lambda device, folder: store.log_writer(device)
+    elif settings.archive_logs:
+        archive = LogArchive(os.path.join(folder, f'{kind}_logs_{now}{ARCHIVE_SUFFIX}'))
+        open_log = lambda device, folder: archive.log_writer(device, headers=kind == 'inspect')
+
+    concurrency = settings.concurrency()
+    index = None
+    index_writer = None
+    if settings.run_index:
+        try:
+            index = RunIndex(settings.run_index)
+            run_id = index.start_run(kind, folder, total, settings.engine_name(), concurrency)
+        except Exception as e:
+            progress(f"打开运行历史索引失败，本次不记录历史: {e}\n")
+            if index is not None:
+                index.close()
+            index = None
+    if index is not None:
+        health_parser = None
+        if kind == 'inspect':
+            try:
+                health_parser = get_extract_module()
+            except Exception as e:
+                progress(f"加载解析模块失败，不记录健康指标: {e}\n")
+        # 解析与写入在后台线程进行，不占用设备完成回调（异步引擎的事件循环线程）
+        parse = None if health_parser is None else health_parser.parse_log_file
+        index_writer = IndexWriter(index, run_id, parse=parse, on_error=lambda text: progress(text + "\n"))
+    progress(f"{label}目录: {folder}\n")
+    if store is not None:
+        progress(f"配置库: {store.root}\n")
+    if archive is not None:
+        progress(f"日志归档: {archive.path}\n")
+    progress(f"设备总数: {total}\n")
+    progress(f"并发数: {concurrency} 台同时进行 ({settings.engine_name()})\n")
+    progress("=" * 50 + "\n\n")
+
+    # 记录总开始时间
+    total_start_time = time.time()
+
+    def on_result(device, result):
+        nonlocal success, fail
+        name = device.get('name', 'unknown')
+        ip = device.get('ip', '-')
+        ok, logfile, errmsg, duration = result
+        if ok:
+            success += 1
+            log_lines.append(f"[SUCCESS] {name} ({ip}) -> {logfile} (耗时: {duration:.1f}秒)")
+        else:
+            fail += 1
+            log_lines.append(f"[FAILED] {name} ({ip}) -> {errmsg} (耗时: {duration:.1f}秒)")
+        entry = {'name': name, 'ip': ip, 'ok': ok, 'logfile': logfile, 'error': errmsg,
+                 'duration': round(duration, 3)}
+        if store is not None:
+            entry['blob'] = store.digest_of(logfile)
+        results.append(entry)
+        if index_writer is not None:
+            index_writer.put(device, entry)
+        progress(log_lines[-1] + "\n")
+
+    # 并发执行，每次连接尝试的阶段耗时写入 <kind>_timing_<时间戳>.jsonl
+    timing_log = os.path.join(folder, f'{kind}_timing_{now}.jsonl')
+    try:
+        with TimingLog(timing_log) as timings:
+            run_device_batch(kind, devices, folder, settings, on_result, progress, on_timing=timings.write,
+                             open_log=open_log)
+    except BaseException:
+        if index is not None:
+            index_writer.close()
+            index.close()
+        raise
+    finally:
+        if archive is not None:
+            archive.close()
+    timing_lines = format_summary(summarize(timings.records))
+    manifest = None
+    if store is not None:
+        manifest = store.write_manifest(f'{kind}_{now}', [
+            {key: entry[key] for key in ('name', 'ip', 'ok', 'blob', 'error')} for entry in results])
+        store_line = (f"配置库: {store.root}，新写入 {store.written} 份配置（{store.bytes_written / 1024:.1f} KB），"
+                      f"内容未变化 {store.reused} 份")
+    if archive is not None:
+        archive_line = (f"日志归档: {archive.path}，{archive.entries} 台设备，"
+                        f"原始 {archive.raw_bytes / 1024:.1f} KB，压缩后 {archive.size() / 1024:.1f} KB")
+
+    # 计算总耗时
+    total_duration = time.time() - total_start_time
+
+    # 备份完成后与上一次备份比较配置变化（比较失败不影响备份结果）
+    changes = None
+    change_line = None
+    if kind == 'backup' and success:
+        try:
+            result, report = config_diff.compare_with_previous(manifest or folder, progress=progress)
+        except Exception as e:
+            change_line = f"配置变化比较失败: {e}"
+        else:
+            if result is not None:
+                changes = config_diff.result_dict(result, report)
+                change_line = f"{config_diff.summary_line(result)}，报告: {report}"
+
+    # 写入汇总日志
+    summary_log = os.path.join(folder, f'{kind}_summary_{now}.log')
+    with open(summary_log, 'w', encoding='utf-8', errors='ignore') as f:
+        f.write(f"全部设备并发自动{label}完成。\n成功: {success} 台，失败: {fail} 台，总计: {total} 台。\n")
+        f.write(f"并发数: {concurrency} 台\n")
+        f.write(f"总耗时: {total_duration:.1f}秒 ({total_duration/60:.1f}分钟)\n")
+        f.write(f"平均每台耗时: {total_duration/max(total, 1):.1f}秒\n")
+        f.write('\n'.join(timing_lines) + '\n')
+        f.write(f"耗时明细: {timing_log}\n")
+        if store is not None:
+            f.write(f"{store_line}\n")
+            f.write(f"本次清单: {manifest}\n")
+        if archive is not None:
+            f.write(f"{archive_line}\n")
+        if change_line:
+            f.write(f"{change_line}\n")
+        f.write(f"{label}目录: {folder}\n\n")
+        f.write('\n'.join(log_lines))
+
+    if index is not None:
+        # 等待后台线程写完剩余的结果
+        index_writer.close()
+        try:
+            index.finish_run(run_id, success, fail, total_duration, summary_log, manifest)
+        except Exception as e:
+            progress(f"写入运行历史索引失败: {e}\n")
+        index.close()
+
+    # 显示最终结果
+    progress("\n" + "=" * 50 + "\n")
+    progress(f"🎉 并发{label}完成！\n")
+    progress(f"成功: {success} 台，失败: {fail} 台，总计: {total} 台\n")
+    progress(f"总耗时: {total_duration:.1f}秒 ({total_duration/60:.1f}分钟)\n")
+    progress(f"并发数: {concurrency} 台\n")
+    progress(timing_lines[0] + "\n")
+    if store is not None:
+        progress(store_line + "\n")
+    if archive is not None:
+        progress(archive_line + "\n")
+    if change_line:
+        progress(change_line + "\n")
+    progress(f"汇总日志: {summary_log}\n")
+
+    return {
+        'job': kind,
+        'folder': folder,
+        'summary_log': summary_log,
+        'timing_log': timing_log,
+        'total': total,
+        'success': success,
+        'fail': fail,
+        'duration': round(total_duration, 3),
+        'concurrency': concurrency,
+        'engine': settings.engine_name(),
+        'store': None if store is None else store.root,
+        'manifest': manifest,
+        'archive': None if archive is None else archive.path,
+        'changes': changes,
+        'index': None if index is None else index.path,
+        'devices': results,
+    }
+
+
+# 查看设备状态：各厂商的状态命令、登录超时与表格列
+STATUS_COMMANDS = {
+    'huawei': [
+        'display cpu-usage',
+        'display memory-usage',
+        'display temperature',
+        'display power',
+        'display fan'
+    ],
+    'h3c': [
+        'display cpu-usage',
+        'display cpu',
+        'display memory',
+        'display temperature all',
+        'display power',
+        'display fan'
+    ],
+    'cisco': [
+        'show processes cpu',
+        'show processes memory',
+        'show environment temperature',
+        'show environment power',
+        'show environment fan'
+    ],
+    'ruijie': [
+        'show cpu',
+        'show memory',
+        'show temperature',
+        'show power',
+        'show fan'
+    ]
+}
+STATUS_SESSION_TIMEOUTS = {'connect_timeout': 10, 'login_timeout': 20, 'idle_timeout': 8}
+STATUS_COLUMNS = ("设备名", "IP", "厂商", "状态", "CPU", "内存", "温度", "电源", "风扇", "运行时间")
+STATUS_FIELDS = ['cpu', 'mem', 'temp', 'power', 'fan', 'uptime']
+
+
+def status_vendor(vendor):
+    """厂商名 -> STATUS_COMMANDS 的键（无法识别时按华为处理）"""
+    vendor = (vendor or '').lower()
+    if 'huawei' in vendor:
+        return 'huawei'
+    if 'h3c' in vendor:
+        return 'h3c'
+    if 'cisco' in vendor:
+        return 'cisco'
+    if 'ruijie' in vendor or '锐捷' in vendor:
+        return 'ruijie'
+    return 'huawei'
+
+
+def status_abnormal_score(row):
+    """异常优先排序的键：离线、出现异常/告警字样的设备排在前面"""
+    score = 0
+    if row['状态'] != '在线':
+        score += 10
+    for k in ['CPU', '内存', '温度', '电源', '风扇']:
+        v = str(row.get(k, ''))
+        if v and (('异常' in v) or ('告警' in v) or ('高' in v) or ('坏' in v) or ('down' in v.lower()) or ('fail' in v.lower())):
+            score += 5
+    return -score
+
+
+def collect_device_status(dev, extract_module=None, fallback=None, session_factory=DeviceSession):
+    """
+    登录单台设备执行状态命令并解析，返回表格行（连接或命令失败时状态为 '离线'）
+    优先使用 extract_module（extract_device_status）解析，未提取到有效信息时使用 fallback(输出, 厂商, 状态)
+    """
+    name = dev.get('name') or dev.get('设备名') or dev.get('设备名称') or dev.get('主机名')
+    ip = dev.get('ip') or dev.get('IP')
+    vendor = (dev.get('vendor') or dev.get('厂商') or '').strip()
+    status = '离线'
+    output_all = ''
+    try:
+        cmds = STATUS_COMMANDS[status_vendor(vendor)]
+        with session_factory(dev, **STATUS_SESSION_TIMEOUTS) as session:
+            for cmd, cmd_output in session.run_many(cmds):
+                output_all += f"\n{cmd.strip()}\n{cmd_output}"
+        status = '在线'
+    except Exception as e:
+        output_all += f"\n[ERROR] {e}"
+        status = '离线'
+    # 解析状态（字段名与 extract_device_status.py 的汇总一致）
+    vendor_detected = vendor
+    info = {}
+    try:
+        if extract_module is not None:
+            vendor_detected = extract_module.detect_vendor(output_all)
+            info = extract_module.extract_info(output_all, vendor_detected)
+    except Exception:
+        pass
+    if fallback is not None and (not info or all(not info.get(k) for k in ['cpu', 'mem', 'temp', 'power', 'fan'])):
+        info = fallback(output_all, vendor_detected, status)
+    values = {k: str(info.get(k, '') or '').strip() for k in STATUS_FIELDS}
+    # 对于在线设备，字段为空则填充N/A；离线设备保持空值
+    if status == '在线':
+        values = {k: v or 'N/A' for k, v in values.items()}
+    return {
+        '设备名': name,
+        'IP': ip,
+        '厂商': vendor_detected,
+        '状态': status,
+        'CPU': values['cpu'],
+        '内存': values['mem'],
+        '温度': values['temp'],
+        '电源': values['power'],
+        '风扇': values['fan'],
+        '运行时间': values['uptime']
+    }
+
+
+def collect_status(devices, settings, on_row=None, extract_module=None, fallback=None,
+                   session_factory=DeviceSession):
+    """
+    按 settings.max_concurrent_devices 并发采集设备状态，不依赖 tkinter
+    每台设备完成时回调 on_row(序号, 行)（序号为设备在 devices 中的位置，可作为表格行的稳定键），
+    返回按异常优先排序的 [(序号, 行), ...]（同等异常程度时保持设备顺序）
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, settings.max_concurrent_devices)) as executor:
+        futures = {executor.submit(collect_device_status, dev, extract_module, fallback, session_factory): idx
+                   for idx, dev in enumerate(devices)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                # 解析回调等意外错误：该设备按离线显示，不影响其他设备
+                dev = devices[idx]
+                row = dict.fromkeys(STATUS_COLUMNS, '')
+                row.update({'设备名': dev.get('name') or dev.get('设备名'), 'IP': dev.get('ip') or dev.get('IP'),
+                            '状态': '离线'})
+                print(f"采集设备状态失败: {e}")
+            results.append((idx, row))
+            if on_row is not None:
+                on_row(idx, row)
+    results.sort(key=lambda item: (status_abnormal_score(item[1]), item[0]))
+    return results
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志归档模块 - log_archive.py
+可选的压缩输出格式：一次备份/巡检的全部设备日志写入同一个 zip 归档（每台设备一个 deflate 压缩条目），
+zip 末尾的中央目录即条目索引，读取单台设备的日志只解压该条目，不需要解压整个归档。
+归档内条目的路径写作 <归档.zip>/<条目名>，extract_device_status.find_log_files / parse_log_file 可直接解析。
+    <巡检目录>/inspect_logs_20250702_100000.zip
+        SW1_20250702_100001.log
+        SW2_20250702_100003.log
+"""
+
+import os
+import threading
+import zipfile
+
+from device_log import SpooledLogWriter, device_log_path
+
+ARCHIVE_SUFFIX = '.zip'
+# deflate 压缩级别：配置文本在 6 级时压缩率已接近最高，速度明显快于 9 级
+COMPRESS_LEVEL = 6
+# 缓冲读取块大小（字符）
+COPY_CHUNK_SIZE = 256 * 1024
+
+
+def archive_entry_path(archive_path, entry):
+    """归档内条目的路径：<归档.zip>/<条目名>"""
+    return os.path.join(archive_path, entry)
+
+
+def split_entry_path(path):
+    """<归档.zip>/<条目名> -> (归档路径, 条目名)；不是归档内条目时返回 (None, None)"""
+    archive, entry = os.path.split(path)
+    if archive.lower().endswith(ARCHIVE_SUFFIX) and os.path.isfile(archive):
+        return archive, entry
+    return None, None
+
+
+def read_entry(path, archives=None):
+    """
+    读取归档内单个条目（或普通日志文件）的文本内容，只解压该条目
+    archives 为 {归档路径: 已打开的 ZipFile}，同一组文件共用已打开的归档，避免重复读取条目索引（由调用方关闭）
+    解码由解析模块的 read_log_file 完成，配置对比等功能与状态解析读取到的内容一致
+    """
+    # 首次读取时才加载解析模块（与 jobs/cli 的延迟加载一致）
+    from extract_device_status import read_log_file
+
+    return read_log_file(path, archives)
+
+
+class LogArchive:
+    """
+    写入中的日志归档（多线程安全）
+    用法:
+        with LogArchive(path) as archive:
+            with archive.log_writer(device, headers=True) as writer:   # 代替 DeviceLogWriter
+                session.stream_many(cmds, writer)
+    每台设备的输出先缓冲，设备完成时整体压缩写入一个条目；归档关闭时写入中央目录（条目索引）
+    """
+
+    def __init__(self, path, compresslevel=COMPRESS_LEVEL):
+        self.path = path
+        self.entries = 0
+        self.raw_bytes = 0
+        self._names = set()
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def log_writer(self, device, headers=False):
+        """单台设备的日志写入对象（接口与 DeviceLogWriter 相同），关闭时压缩写入归档"""
+        entry = os.path.basename(device_log_path('', device.get('name', 'unknown')))
+        # 关闭后 path 为 <归档.zip>/<条目名>
+        return SpooledLogWriter(entry, lambda spool: self.add(entry, spool), headers)
+
+    def add(self, entry, fileobj):
+        """把 fileobj（文本文件对象）写入条目 entry，返回条目路径；同名条目自动加序号"""
+        with self._lock:
+            base, ext = os.path.splitext(entry)
+            n = 1
+            while entry in self._names:
+                n += 1
+                entry = f'{base}_{n}{ext}'
+            self._names.add(entry)
+            size = 0
+            with self._zip.open(entry, 'w') as dest:
+                while True:
+                    chunk = fileobj.read(COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    data = chunk.encode('utf-8', errors='ignore')
+                    dest.write(data)
+                    size += len(data)
+            self.entries += 1
+            self.raw_bytes += size
+        return archive_entry_path(self.path, entry)
+
+    def close(self):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+
+    def size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
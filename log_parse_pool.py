@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志并行解析模块 - log_parse_pool.py
+将巡检日志按组分配给 ProcessPoolExecutor 的多个进程解析（detect_vendor + extract_info 为纯 CPU 计算），
+每组解析完成后立即通过 on_rows 回调返回，调用方可以边解析边显示。
+解析逻辑来自外部的 extract_device_status.py（见 extract_loader），工作进程启动时各自按路径加载一次。
+传入 cache（parse_cache.ParseCache）时未变化的日志直接取缓存结果，只有新增或修改过的日志交给进程池解析。
+打包为 exe 时主程序入口需调用 multiprocessing.freeze_support()。
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from extract_loader import get_extract_module, load_extract_module
+from parse_cache import parser_version
+
+# 每个工作单元最多包含的日志文件数
+MAX_CHUNK_SIZE = 32
+# 每个进程平均分到的工作单元数，保证各进程负载均衡、结果尽早返回
+CHUNKS_PER_WORKER = 4
+
+# 工作进程中加载的解析模块
+_worker_module = None
+
+
+def default_workers():
+    """默认进程数：CPU 核心数"""
+    return os.cpu_count() or 1
+
+
+def make_chunks(items, workers, chunk_size=None):
+    """按进程数切分工作单元"""
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, math.ceil(len(items) / (workers * CHUNKS_PER_WORKER))))
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def _init_worker(module_path):
+    global _worker_module
+    _worker_module = load_extract_module(module_path)
+
+
+def parse_chunk_keyed(module, log_files):
+    """
+    顺序解析一组日志文件，返回 [(日志路径, 设备状态), ...]（解析出错的文件跳过），用于写入解析缓存
+    """
+    return module.parse_log_chunk(log_files, key=_log_path)
+
+
+def _log_path(log_file):
+    return log_file
+
+
+def _parse_chunk(log_files):
+    return _worker_module.parse_log_chunk(log_files)
+
+
+def _parse_chunk_keyed(log_files):
+    return parse_chunk_keyed(_worker_module, log_files)
+
+
+def run_chunks(chunks, workers, pool_func, local_func, emit, initializer=None, initargs=(), on_fallback=None):
+    """
+    把工作单元交给进程池执行（pool_func(单元)，须为模块级函数），每个单元完成后 emit(结果)
+    只有一个进程或一个工作单元时、以及进程池异常退出后剩余的单元，在当前进程用 local_func(单元) 执行；
+    进程池不可用时先回调 on_fallback(异常)
+    """
+    remaining = list(range(len(chunks)))
+    if workers > 1 and len(chunks) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=initializer,
+                                     initargs=initargs) as pool:
+                futures = {pool.submit(pool_func, chunks[i]): i for i in remaining}
+                for future in as_completed(futures):
+                    rows = future.result()
+                    remaining.remove(futures[future])
+                    emit(rows)
+        except (BrokenProcessPool, OSError) as e:
+            if on_fallback is not None:
+                on_fallback(e)
+    for i in remaining:
+        emit(local_func(chunks[i]))
+
+
+def map_chunks(func, items, workers=None, min_parallel=0, on_fallback=None):
+    """
+    通用的分块并行：items 切分为工作单元交给进程池执行 func(单元)（返回结果列表），返回全部结果（完成顺序）
+    少于 min_parallel 项时直接在当前进程执行；进程池不可用时回调 on_fallback(异常) 后在当前进程处理剩余单元
+    """
+    items = list(items)
+    if not items:
+        return []
+    workers = workers or default_workers()
+    chunks = make_chunks(items, workers)
+    results = []
+    run_chunks(chunks, workers if len(items) >= min_parallel else 1, func, func, results.extend,
+               on_fallback=on_fallback)
+    return results
+
+
+def _report_fallback(e):
+    print(f"并行解析失败，改为单进程解析: {e}")
+
+
+def _run_chunks(module_path, chunks, workers, pool_func, local_func, emit):
+    """解析日志的工作单元：工作进程启动时加载解析模块，当前进程中用 local_func(模块, 单元) 解析"""
+    run_chunks(chunks, workers, pool_func, lambda chunk: local_func(get_extract_module(module_path), chunk), emit,
+               initializer=_init_worker, initargs=(module_path,), on_fallback=_report_fallback)
+
+
+def parse_logs(module_path, log_files, on_rows=None, max_workers=None, chunk_size=None, cache=None):
+    """
+    解析日志文件列表，返回全部设备状态（顺序为完成顺序，使用缓存时命中的在前）
+    on_rows(rows) 在每个工作单元完成后于调用线程中回调（缓存命中的结果一次性回调）
+    cache 为 parse_cache.ParseCache 时只解析缓存中没有或已变化的日志，新的结果在每个工作单元完成后写入缓存
+    """
+    workers = max_workers or default_workers()
+    results = []
+
+    def emit(rows):
+        results.extend(rows)
+        if on_rows and rows:
+            on_rows(rows)
+
+    if cache is None:
+        chunks = make_chunks(list(log_files), workers, chunk_size)
+        _run_chunks(module_path, chunks, workers, _parse_chunk,
+                    lambda module, chunk: module.parse_log_chunk(chunk), emit)
+        return results
+
+    version = parser_version(module_path)
+    hits, misses = cache.lookup(log_files, version)
+    emit(hits)
+
+    def emit_keyed(pairs):
+        cache.store([(path, misses[path], row) for path, row in pairs], version)
+        emit([row for path, row in pairs])
+
+    chunks = make_chunks(list(misses), workers, chunk_size)
+    _run_chunks(module_path, chunks, workers, _parse_chunk_keyed, parse_chunk_keyed, emit_keyed)
+    return results
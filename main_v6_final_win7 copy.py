@@ -21,18 +21,25 @@ from tkinter import ttk, filedialog, messagebox
 import csv
 import threading
 import time
-import socket
 import os
-import sys
 import re
-import datetime
-import paramiko
-import importlib.util
+import multiprocessing
 import glob
 import shutil
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from queue import Queue, Empty
 import concurrent.futures
+import async_engine
+import jobs
+import reachability
+import monitor_scheduler
+import timeseries
+import run_index
+import parse_cache
+from tree_updater import TreeDiffUpdater
+from progress_pump import ProgressPump, TextSink
+from output_cleaner import clean_output
+from log_parse_pool import parse_logs
+from extract_loader import get_extract_module
 
 class NetworkManagementToolV5:
     def __init__(self, root):
@@ -41,7 +48,15 @@ class NetworkManagementToolV5:
         self.root.geometry("1000x750")
         self.device_list = []
         self.monitor_results = []
+        # 监控结果各行的稳定键（设备序号），与 monitor_results 一一对应
+        self.monitor_keys = []
+        self.tree_updater = None
         self.online_status = {}
+        self.online_rtt = {}  # 最近一次探测的建连耗时(毫秒)，离线为 None
+        # 监控历史（按设备IP的环形缓冲）；设置 monitor_history_dir 后写满的历史溢出到该目录
+        self.monitor_history_dir = None
+        self.monitor_history = timeseries.TimeSeriesStore(spill_dir=self.monitor_history_dir)
+        self.monitor_trend_window = 3600  # 趋势图与可用率统计的时间范围（秒）
         self.inspect_device_count_var = tk.StringVar(value="设备数：0")
         self.create_widgets()
         self.monitoring = False
@@ -55,8 +70,36 @@ class NetworkManagementToolV5:
         self.max_concurrent_devices = 5  # 最大并发设备数，可根据网络和系统性能调整
         self.concurrent_executor = None
         self.progress_queue = Queue()  # 用于线程间通信的进度队列
+        # 工作线程只投递进度事件，界面线程按帧合并写入进度文本框
+        self.progress_pump = ProgressPump(self.root, self.progress_queue)
+        self.progress_pump.register('backup', TextSink(lambda: getattr(self, 'backup_progress_text', None)))
+        self.progress_pump.register('inspect', TextSink(lambda: getattr(self, 'inspect_progress_text', None)))
+        self.progress_pump.start()
         self.connection_timeout = 30  # 连接超时时间
         self.max_retries = 3  # 连接重试次数
+        self.retry_base_delay = 5  # 首次重试前等待秒数，之后按指数退避
+        self.retry_max_delay = 60  # 单次退避等待上限
+        self.retry_jitter = 0.3  # 退避时间随机抖动比例
+        # 在线监控：TCP 探测超时与同时进行中的连接数上限
+        self.monitor_timeout = reachability.DEFAULT_TIMEOUT
+        self.monitor_max_in_flight = reachability.DEFAULT_MAX_IN_FLIGHT
+        # 持续监控的探测间隔：失败/抖动设备、首次在线、稳定在线上限（秒）
+        self.monitor_min_interval = monitor_scheduler.DEFAULT_MIN_INTERVAL
+        self.monitor_base_interval = monitor_scheduler.DEFAULT_BASE_INTERVAL
+        self.monitor_max_interval = monitor_scheduler.DEFAULT_MAX_INTERVAL
+        # 异步采集引擎（可选，需要 asyncssh；默认使用线程池，在备份/巡检模块的并发设置区开启）
+        self.use_async_engine = False
+        self.async_max_concurrent = None  # 异步引擎同时在线会话上限，None 时与并发设备数相同
+        # 备份写入输出目录下的去重配置库（config_store），配置未变化的设备不再重复保存；
+        # 开启后本次备份目录不再有逐台配置文件，默认关闭，仍按设备保存到备份目录
+        self.use_config_store = False
+        # 设备日志压缩写入每次任务目录下的一个 zip 归档（解析设备状态可直接读取归档）
+        self.archive_logs = False
+        # 运行历史索引（SQLite）：导入的设备、每次备份/巡检的逐台结果与解析出的健康指标
+        self.run_index_path = run_index.default_path()
+        self.index_writer = None  # 导入设备登记到索引的后台写入线程（首次导入时启动）
+        # 日志解析缓存：再次解析时只解析新增或修改过的日志
+        self.parse_cache_path = parse_cache.default_path()
 
     def create_widgets(self):
         # 顶部模块切换区美化
@@ -119,6 +162,9 @@ class NetworkManagementToolV5:
         self.status_canvas.pack(side="left", padx=18, pady=12)
         self.status_label = tk.Label(self.status_frame, text="", font=("微软雅黑", 15, "bold"), fg="#007acc", bg=card_bg)
         self.status_label.pack(side="left", padx=18, pady=12)
+        # 可用率/延迟趋势图（数据来自 monitor_history）
+        self.trend_canvas = tk.Canvas(self.status_frame, width=360, height=200, bg=card_bg, highlightthickness=0)
+        self.trend_canvas.pack(side="right", padx=18, pady=12)
         
         # 监控详情区卡片
         frame_detail = tk.Frame(self.main_frame, bg=card_bg, highlightbackground="#b3d7f5", highlightthickness=2, bd=0)
@@ -143,7 +189,7 @@ class NetworkManagementToolV5:
         
         # 切换回来自动恢复监控结果和统计
         if self.monitor_results:
-            self.update_tree(self.monitor_results)
+            self.update_tree(self.monitor_results, self.monitor_keys)
             self.online_status = {}
             for row in self.monitor_results:
                 ip = row.get('IP') or row.get('ip')
@@ -166,6 +212,7 @@ class NetworkManagementToolV5:
         tk.Button(btns, text="导出模板", command=self.export_backup_template, width=15, **btn_style).pack(side="left", padx=8, pady=8)
         tk.Button(btns, text="并发备份", command=self.backup_now, width=15, bg="#d9ead3", fg="#38761d", activebackground="#b6d7a8", activeforeground="#38761d", relief="flat", bd=0, font=("微软雅黑", 11, "bold"), height=2, cursor="hand2").pack(side="left", padx=8, pady=8)
         tk.Button(btns, text="定时备份", command=self.backup_scheduler, width=15, **btn_style).pack(side="left", padx=8, pady=8)
+        tk.Button(btns, text="历史状态", command=self.show_run_history, width=15, **btn_style).pack(side="left", padx=8, pady=8)
         
         # 并发设置区
         concurrent_frame = tk.Frame(frame_backup, bg=card_bg)
@@ -192,6 +239,7 @@ class NetworkManagementToolV5:
         tk.Button(concurrent_control, text="+", command=increase_concurrent, width=2, font=("微软雅黑", 10), bg="#f0f0f0", relief="flat").pack(side="left")
         
         tk.Label(concurrent_frame, text="台 (建议1-10台)", font=("微软雅黑", 9), bg=card_bg, fg="#666666").pack(side="left", padx=5)
+        self._engine_controls(concurrent_frame, card_bg)
         
         if not hasattr(self, 'backup_device_count_var'):
             self.backup_device_count_var = tk.StringVar()
@@ -234,6 +282,7 @@ class NetworkManagementToolV5:
         tk.Button(btns, text="并发巡检", command=self.auto_inspect, width=15, bg="#d9ead3", fg="#38761d", activebackground="#b6d7a8", activeforeground="#38761d", relief="flat", bd=0, font=("微软雅黑", 11, "bold"), height=2, cursor="hand2").pack(side="left", padx=8, pady=8)
         tk.Button(btns, text="定时巡检", command=self.inspect_scheduler, width=15, **btn_style).pack(side="left", padx=8, pady=8)
         tk.Button(btns, text="解析设备状态", command=self.parse_device_status_from_logs, width=15, **btn_style).pack(side="left", padx=8, pady=8)
+        tk.Button(btns, text="历史状态", command=self.show_run_history, width=15, **btn_style).pack(side="left", padx=8, pady=8)
 
         # 并发设置区（共享备份模块的设置）
         concurrent_frame = tk.Frame(frame_inspect, bg=card_bg)
@@ -260,6 +309,7 @@ class NetworkManagementToolV5:
         tk.Button(concurrent_control, text="+", command=increase_concurrent, width=2, font=("微软雅黑", 10), bg="#f0f0f0", relief="flat").pack(side="left")
         
         tk.Label(concurrent_frame, text="台 (巡检建议2-5台)", font=("微软雅黑", 9), bg=card_bg, fg="#666666").pack(side="left", padx=5)
+        self._engine_controls(concurrent_frame, card_bg)
 
         if not hasattr(self, 'inspect_device_count_var'):
             self.inspect_device_count_var = tk.StringVar()
@@ -287,6 +337,29 @@ class NetworkManagementToolV5:
         self.inspect_progress_text.insert("1.0", "等待并发巡检任务开始...\n\n提示：\n1. 请先导入设备+指令列表\n2. 调整并发数（推荐2-5台）\n3. 点击'并发巡检'开始任务\n4. 巡检过程中请勿关闭程序")
         self.inspect_progress_text.config(state="disabled")
 
+    def _engine_controls(self, parent, card_bg):
+        """并发设置区中的采集引擎选项：是否使用异步引擎，以及异步引擎的同时在线会话上限（0 表示与并发数相同）"""
+        async_var = tk.BooleanVar(value=self.use_async_engine)
+        limit_var = tk.StringVar(value=str(self.async_max_concurrent or 0))
+
+        def apply(*args):
+            self.use_async_engine = async_var.get()
+            try:
+                limit = int(limit_var.get())
+            except ValueError:
+                return
+            self.async_max_concurrent = max(0, limit) or None
+
+        available = async_engine.is_available()
+        tk.Checkbutton(parent, text="异步引擎" if available else "异步引擎(未安装asyncssh)", variable=async_var,
+                       command=apply, state="normal" if available else "disabled", font=("微软雅黑", 9),
+                       bg=card_bg, fg="#007acc", activebackground=card_bg).pack(side="left", padx=(15, 2))
+        tk.Label(parent, text="会话上限:", font=("微软雅黑", 9), bg=card_bg, fg="#666666").pack(side="left")
+        tk.Spinbox(parent, from_=0, to=async_engine.DEFAULT_MAX_CONCURRENT, textvariable=limit_var, width=4,
+                   command=apply, font=("微软雅黑", 9)).pack(side="left", padx=2)
+        limit_var.trace_add('write', apply)
+        tk.Label(parent, text="(0=与并发数相同)", font=("微软雅黑", 9), bg=card_bg, fg="#666666").pack(side="left")
+
     def show_manage_module(self):
         # 管理模块
         card_bg = "#ffffff"
@@ -300,12 +373,13 @@ class NetworkManagementToolV5:
 
     # 监控功能实现
     def _open_csv_compat(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return list(csv.DictReader(f))
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='gbk') as f:
-                return list(csv.DictReader(f))
+        return jobs.open_csv_compat(file_path)
+
+    def _index_devices(self, devices, source):
+        """导入的设备交给后台写入线程登记到运行历史索引（界面线程不打开数据库，失败不影响导入）"""
+        if self.index_writer is None:
+            self.index_writer = run_index.IndexWriter(self.run_index_path, on_error=print)
+        self.index_writer.put_devices(devices, source)
 
     def import_monitor_devices(self):
         file_path = filedialog.askopenfilename(title="选择监控设备CSV文件", filetypes=[("CSV文件", "*.csv")])
@@ -313,6 +387,7 @@ class NetworkManagementToolV5:
             try:
                 self.device_list = self._open_csv_compat(file_path)
                 self.device_count_var.set(f"设备数：{len(self.device_list)}")
+                self._index_devices(self.device_list, 'monitor')
                 messagebox.showinfo("导入成功", f"成功导入{len(self.device_list)}台设备！")
             except Exception as e:
                 messagebox.showerror("导入失败", f"导入设备列表失败: {e}")
@@ -321,7 +396,8 @@ class NetworkManagementToolV5:
         if not self.device_list:
             messagebox.showwarning("无设备", "请先导入设备列表！")
             return
-        if self.monitoring:
+        # 停止后上一轮监控线程最多1秒内退出，退出前不重复启动
+        if self.monitoring or (self.monitor_thread is not None and self.monitor_thread.is_alive()):
             messagebox.showinfo("监控中", "监控已在运行！")
             return
         # 新增进度弹窗
@@ -336,61 +412,117 @@ class NetworkManagementToolV5:
 
     def stop_monitor(self):
         self.monitoring = False
+        self.monitor_history.flush()
         messagebox.showinfo("监控停止", "已停止监控任务。")
 
-    def monitor_loop(self):
+    def monitor_loop(self, devices=None, initial=None):
+        """
+        持续监控直到停止：每台设备按 MonitorScheduler 安排的自适应间隔探测，
+        失败或抖动的设备频繁探测，稳定在线的设备逐步降低探测频率
+        initial 为已完成的一轮探测结果（与 devices 顺序一致），据此安排第一次间隔
+        """
+        devices = list(self.device_list) if devices is None else devices
+        targets = self._monitor_targets(devices)
+        rows = list(self.monitor_results) if len(self.monitor_results) == len(devices) else \
+            [self._monitor_row(dev, ip, '') for dev, (ip, port) in zip(devices, targets)]
+        scheduler = monitor_scheduler.MonitorScheduler(len(targets), min_interval=self.monitor_min_interval,
+                                     base_interval=self.monitor_base_interval,
+                                     max_interval=self.monitor_max_interval)
+        if initial is not None:
+            now = time.time()
+            scheduler.due(now)
+            for idx, (ok, rtt, error) in enumerate(initial):
+                scheduler.record(idx, ok, now)
         while self.monitoring:
-            self.monitor_once()
-            for _ in range(1800):  # 30分钟
-                if not self.monitoring:
-                    break
-                time.sleep(1)
+            due = scheduler.due(time.time())
+            if due:
+                probes = reachability.sweep([targets[idx] for idx in due], timeout=self.monitor_timeout,
+                                            max_in_flight=self.monitor_max_in_flight)
+                now = time.time()
+                for idx, (ok, rtt, error) in zip(due, probes):
+                    scheduler.record(idx, ok, now)
+                    ip = targets[idx][0]
+                    status = '在线' if ok else '离线'
+                    rows[idx] = self._monitor_row(devices[idx], ip, status)
+                    self.online_status[ip] = status
+                    self.online_rtt[ip] = rtt
+                    if ip:
+                        self.monitor_history.record(ip, ok, rtt=rtt, ts=now)
+                self.monitor_results = list(rows)
+                self.monitor_keys = list(range(len(rows)))
+                self.root.after(0, self._refresh_monitor_view)
+            # 休眠到下一台设备到期，每秒检查一次是否已停止监控
+            next_due = scheduler.next_due()
+            wait = 1.0 if next_due is None else next_due - time.time()
+            time.sleep(min(1.0, max(0.05, wait)))
 
     def monitor_loop_with_progress(self):
-        total = len(self.device_list)
-        for idx in range(1):  # 只监控一次，后续可扩展为定时
-            if not self.monitoring:
-                break
-            for i, dev in enumerate(self.device_list):
-                if not self.monitoring:
-                    break
-                name = dev.get('name') or dev.get('设备名') or dev.get('设备名称') or dev.get('主机名')
-                ip = dev.get('ip') or dev.get('IP')
-                self.root.after(0, lambda i=i, name=name, ip=ip: self.monitor_progress_label.config(text=f"正在监控第{i+1}/{total}台设备: {name} ({ip})"))
-                self.monitor_progress.update()
-            self.monitor_once()
+        """先并发探测一轮全部设备（显示进度），之后转入持续监控"""
+        devices = list(self.device_list)
+        total = len(devices)
+
+        def on_progress(done):
+            self.root.after(0, lambda: self.monitor_progress_label.config(text=f"正在监控: 已探测 {done}/{total} 台设备"))
+
+        probes = self.monitor_once(on_progress, devices=devices)
         self.root.after(0, self.monitor_progress.destroy)
+        if self.monitoring:
+            self.monitor_loop(devices, initial=probes)
+
+    def monitor_once(self, on_progress=None, devices=None):
+        """并发探测所有设备的管理端口，记录在线状态与建连耗时，返回探测结果列表"""
+        devices = list(self.device_list) if devices is None else devices
+        targets = self._monitor_targets(devices)
+        done = [0]
+
+        def on_result(idx, result):
+            done[0] += 1
+            if on_progress and (done[0] % 100 == 0 or done[0] == len(targets)):
+                on_progress(done[0])
 
-    def monitor_once(self):
+        probes = reachability.sweep(targets, timeout=self.monitor_timeout,
+                                    max_in_flight=self.monitor_max_in_flight, on_result=on_result)
         results = []
-        for dev in self.device_list:
-            ip = dev.get('ip') or dev.get('IP')
-            name = dev.get('name') or dev.get('设备名') or dev.get('设备名称') or dev.get('主机名')
-            vendor = (dev.get('vendor') or dev.get('厂商') or '').strip()
-            port = int(dev.get('port') or dev.get('端口') or 22)
-            status = '离线'
-            try:
-                sock = socket.create_connection((ip, port), timeout=3)
-                sock.close()
-                status = '在线'
-            except Exception:
-                status = '离线'
-            results.append({
-                '设备名': name,
-                'IP': ip,
-                '厂商': vendor,
-                '状态': status,
-                'CPU': '',
-                '内存': '',
-                '温度': '',
-                '电源': '',
-                '风扇': '',
-                '运行时间': ''
-            })
+        now = time.time()
+        for dev, (ip, port), (ok, rtt, error) in zip(devices, targets, probes):
+            status = '在线' if ok else '离线'
+            results.append(self._monitor_row(dev, ip, status))
             self.online_status[ip] = status
+            self.online_rtt[ip] = rtt
+            if ip:
+                self.monitor_history.record(ip, ok, rtt=rtt, ts=now)
         self.monitor_results = results
-        self.update_tree(self.monitor_results)
-        self.update_status_chart()
+        self.monitor_keys = list(range(len(results)))
+        self.root.after(0, self._refresh_monitor_view)
+        return probes
+
+    def _monitor_targets(self, devices):
+        """设备列表 -> [(ip, 端口), ...]"""
+        return reachability.device_targets(devices)
+
+    def _monitor_row(self, dev, ip, status):
+        name = dev.get('name') or dev.get('设备名') or dev.get('设备名称') or dev.get('主机名')
+        vendor = (dev.get('vendor') or dev.get('厂商') or '').strip()
+        return {
+            '设备名': name,
+            'IP': ip,
+            '厂商': vendor,
+            '状态': status,
+            'CPU': '',
+            '内存': '',
+            '温度': '',
+            '电源': '',
+            '风扇': '',
+            '运行时间': ''
+        }
+
+    def _refresh_monitor_view(self):
+        """在界面线程中刷新监控表格与在线统计（已切换到其他模块时跳过）"""
+        try:
+            self.update_tree(self.monitor_results, self.monitor_keys)
+            self.update_status_chart()
+        except tk.TclError:
+            pass
 
     # 备份功能实现
     def import_backup_devices(self):
@@ -399,6 +531,7 @@ class NetworkManagementToolV5:
             try:
                 self.backup_device_list = self._open_csv_compat(file_path)
                 self.backup_device_count_var.set(f"设备数：{len(self.backup_device_list)}")
+                self._index_devices(self.backup_device_list, 'backup')
                 messagebox.showinfo("导入成功", f"成功导入{len(self.backup_device_list)}台设备！")
             except Exception as e:
                 messagebox.showerror("导入失败", f"导入设备列表失败: {e}")
@@ -431,362 +564,44 @@ class NetworkManagementToolV5:
         backup_thread.start()
 
     def _run_concurrent_backup_task(self, backup_folder):
-        """并发备份任务的具体实现（在后台线程中运行）"""
-        now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_dir = os.path.join(backup_folder, f'backup_{now}')
-        os.makedirs(backup_dir, exist_ok=True)
-        total = len(self.backup_device_list)
-        success = 0
-        fail = 0
-        log_lines = []
-        
-        # 显示备份目录信息（使用after方法在主线程中更新UI）
-        def update_progress(text):
-            self.root.after(0, lambda: self._update_backup_progress(text))
-        
-        update_progress(f"备份目录: {backup_dir}\n")
-        update_progress(f"设备总数: {total}\n")
-        update_progress(f"并发数: {self.max_concurrent_devices} 台同时进行\n")
-        update_progress("=" * 50 + "\n\n")
-        
-        # 记录总开始时间
-        total_start_time = time.time()
-        
-        # 创建线程池并发执行备份
-        with ThreadPoolExecutor(max_workers=self.max_concurrent_devices) as executor:
-            future_to_device = {}
-            for idx, device in enumerate(self.backup_device_list):
-                future = executor.submit(self._concurrent_backup_device, device, backup_dir, idx+1, total)
-                future_to_device[future] = device
-            
-            for future in as_completed(future_to_device):
-                device = future_to_device[future]
-                name = device.get('name', 'unknown')
-                ip = device.get('ip', '-')
-                try:
-                    result = future.result()
-                    ok, logfile, errmsg, duration = result
-                except Exception as e:
-                    ok, logfile, errmsg, duration = False, '', str(e), 0
-                
-                if ok:
-                    success += 1
-                    log_lines.append(f"[SUCCESS] {name} ({ip}) -> {logfile} (耗时: {duration:.1f}秒)")
-                else:
-                    fail += 1
-                    log_lines.append(f"[FAILED] {name} ({ip}) -> {errmsg} (耗时: {duration:.1f}秒)")
-                
-                update_progress(log_lines[-1] + "\n")
-        
-        # 计算总耗时
-        total_end_time = time.time()
-        total_duration = total_end_time - total_start_time
-        
-        # 写入汇总日志
-        summary_log = os.path.join(backup_dir, f'backup_summary_{now}.log')
-        with open(summary_log, 'w', encoding='utf-8', errors='ignore') as f:
-            f.write(f"全部设备并发自动备份完成。\n成功: {success} 台，失败: {fail} 台，总计: {total} 台。\n")
-            f.write(f"并发数: {self.max_concurrent_devices} 台\n")
-            f.write(f"总耗时: {total_duration:.1f}秒 ({total_duration/60:.1f}分钟)\n")
-            f.write(f"平均每台耗时: {total_duration/total:.1f}秒\n")
-            f.write(f"效率提升: 相比串行约节省 {max(0, total*30 - total_duration):.0f}秒\n")
-            f.write(f"备份目录: {backup_dir}\n\n")
-            f.write('\n'.join(log_lines))
-        
-        # 显示最终结果
-        update_progress(f"\n" + "=" * 50 + "\n")
-        update_progress(f"🎉 并发备份完成！\n")
-        update_progress(f"成功: {success} 台，失败: {fail} 台，总计: {total} 台\n")
-        update_progress(f"总耗时: {total_duration:.1f}秒 ({total_duration/60:.1f}分钟)\n")
-        update_progress(f"并发数: {self.max_concurrent_devices} 台\n")
-        update_progress(f"汇总日志: {summary_log}\n")
+        """并发备份任务的具体实现（在后台线程中运行，实现见 jobs.run_job）"""
+        summary = jobs.run_job('backup', self.backup_device_list, backup_folder, self._job_settings(),
+                               progress=self._update_backup_progress)
+        success, fail, total = summary['success'], summary['fail'], summary['total']
+        total_duration = summary['duration']
+        timing_log = summary['timing_log']
+        manifest = f"\n本次清单: {summary['manifest']}" if summary['manifest'] else ""
+        changes = summary['changes']
+        if changes:
+            manifest += f"\n配置变化: {len(changes['changed'])} 台，报告: {changes['report']}"
         
         # 在主线程中显示完成消息
         self.root.after(0, lambda: messagebox.showinfo("完成", 
             f"全部设备并发自动备份完成！\n成功: {success} 台，失败: {fail} 台，总计: {total} 台。\n"
             f"总耗时: {total_duration:.1f}秒 ({total_duration/60:.1f}分钟)\n"
-            f"并发效率提升明显！"))
-    
-    def _concurrent_backup_device(self, device, backup_dir, device_idx, total):
-        """单个设备的备份任务（在线程池中执行）"""
-        name = device.get('name', 'unknown')
-        ip = device.get('ip', '-')
-        
-        # 记录开始时间
-        start_time = time.time()
-        
-        # 更新进度显示（线程安全）
-        def update_progress(text):
-            self.root.after(0, lambda: self._update_backup_progress(text))
-        
-        update_progress(f"[{device_idx}/{total}] 开始备份: {name} ({ip})\n")
-        
-        try:
-            # 添加调试信息
-            update_progress(f"[{device_idx}/{total}] 正在连接设备: {name} ({ip})\n")
-            ok, logfile, errmsg = self.backup_device(device, backup_dir)
-            end_time = time.time()
-            duration = end_time - start_time
-            
-            # 添加完成信息
-            if ok:
-                update_progress(f"[{device_idx}/{total}] ✅ 备份完成: {name} ({ip}) -> {logfile} (耗时: {duration:.1f}秒)\n")
-            else:
-                update_progress(f"[{device_idx}/{total}] ❌ 备份失败: {name} ({ip}) -> {errmsg} (耗时: {duration:.1f}秒)\n")
-            
-            return ok, logfile, errmsg, duration
-        except Exception as e:
-            end_time = time.time()
-            duration = end_time - start_time
-            update_progress(f"[{device_idx}/{total}] ❌ 备份异常: {name} ({ip}) -> {str(e)} (耗时: {duration:.1f}秒)\n")
-            return False, '', str(e), duration
+            f"阶段耗时明细: {timing_log}{manifest}"))
     
     def _update_backup_progress(self, text):
-        """在主线程中安全地更新备份进度显示"""
-        try:
-            self.backup_progress_text.config(state="normal")
-            self.backup_progress_text.insert("end", text)
-            self.backup_progress_text.config(state="disabled")
-            self.backup_progress_text.see("end")
-            self.backup_progress_text.update()
-        except Exception:
-            pass  # 忽略UI更新错误
-            self.backup_progress_text.config(state="normal")
-            self.backup_progress_text.insert("end", text)
-            self.backup_progress_text.config(state="disabled")
-            self.backup_progress_text.see("end")
-            self.backup_progress_text.update()
-        except Exception:
-            pass  # 忽略UI更新错误
-
-    def backup_device(self, device, backup_dir):
-        name = device.get('name', 'unknown')
-        ip = device.get('ip', '-')
-        username = device.get('username', 'admin')
-        password = device.get('password', '')
-        port = int(device.get('port', 22))
-        vendor = (device.get('vendor', '') or '').lower()
-        # 自动选择备份命令
-        if 'huawei' in vendor or 'h3c' in vendor:
-            cmds = ['display current-configuration']
-        else:
-            cmds = ['show running-config']
-        log_output = []
-        try:
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(str(ip), port=port, username=username, password=password, timeout=30, allow_agent=False, look_for_keys=False)
-            chan = ssh.invoke_shell(width=1000, height=200)
-            time.sleep(2.5)
-            
-            # 登录输出收集 - 修复所有厂商设备登录阶段Y/N自动应答问题
-            login_output = ''
-            prompt_list = ['#', '>', '$']
-            login_timeout = time.time() + 30
-            
-            # 登录阶段所有厂商的Y/N检测模式（通用匹配）
-            login_yn_patterns = [
-                # 华为设备常见登录Y/N提示
-                r'Change now\?\s*\[Y/N\][:：]\s*$',  # Change now? [Y/N]:
-                r'password needs to be changed.*\[Y/N\][:：]\s*$',  # password needs to be changed. Change now? [Y/N]:
-                r'Do you want to change.*\[Y/N\][:：]\s*$',  # Do you want to change the password? [Y/N]:
-                # 思科设备常见登录Y/N提示
-                r'Would you like to enter the initial configuration dialog\?\s*\[yes/no\][:：]\s*$',  # Would you like to enter the initial configuration dialog? [yes/no]:
-                r'Would you like to terminate autoinstall\?\s*\[yes\][:：]\s*$',  # Would you like to terminate autoinstall? [yes]:
-                # 华三设备常见登录Y/N提示
-                r'Save\?\s*\[Y/N\][:：]\s*$',  # Save? [Y/N]:
-                r'Continue\?\s*\[Y/N\][:：]\s*$',  # Continue? [Y/N]:
-                # 锐捷设备常见登录Y/N提示
-                r'Enter the password\?\s*\[yes/no\][:：]\s*$',  # Enter the password? [yes/no]:
-                # 通用Y/N模式（登录阶段）
-                r'\w+\?\s*\[Y/N\][:：]\s*$',  # 任何问题? [Y/N]:
-                r'\w+\?\s*\[yes/no\][:：]\s*$',  # 任何问题? [yes/no]:
-            ]
-            
-            while True:
-                time.sleep(0.12)
-                if chan.recv_ready():
-                    data = chan.recv(65535).decode(errors='ignore')
-                    login_output += data
-                    
-                    # 检查是否是登录阶段的Y/N提示（仅在登录阶段处理）
-                    login_yn_found = False
-                    for pattern in login_yn_patterns:
-                        if re.search(pattern, data, re.IGNORECASE):
-                            # 华为设备登录时的密码变更提示，发送 'n' 跳过
-                            chan.send(b'n\n')
-                            time.sleep(0.3)
-                            login_yn_found = True
-                            break
-                    
-                    if not login_yn_found:
-                        lines = data.strip().splitlines()
-                        if lines:
-                            last_line = lines[-1].strip()
-                            if any(last_line.endswith(p) for p in prompt_list):
-                                break
-                if time.time() > login_timeout:
-                    break
-            prev_raw_output = login_output
-            for idx, cmd in enumerate(cmds):
-                chan.send((cmd + '\n').encode('utf-8'))
-                time.sleep(1.0)
-                raw_output = ''
-                start_time = time.time()
-                
-                # 扩展的分页符检测列表 - 支持所有主流厂商 (备份模块)
-                pagination_indicators = [
-                    # 华为设备分页符
-                    '---- More ----', '--More--', '<--- More --->', '--- More ---',
-                    'Press any key to continue', 'Press SPACE to continue', 'Press Q to quit',
-                    '按任意键继续', '按空格键继续', '按Q键退出',
-                    # 华三设备分页符
-                    '---- More ----', '--More--', 'More:', '(more)', '[more]', 
-                    '---- more ----', '--more--', '(MORE)', '[MORE]', '-- More --', '---More---',
-                    # 思科设备分页符
-                    '--More--', 'Press any key to continue', 'Press SPACE for more',
-                    '-- More --', '<spacebar> for more', 'q to quit',
-                    # 锐捷设备分页符
-                    '---- More ----', '--More--', 'More...', '(More)', '[More]',
-                    'Press any key to continue', 'Press SPACE to continue',
-                    # 其他厂商通用分页符
-                    'Continue?', 'More (Press SPACE)', 'More (Press any key)',
-                    '继续？', '更多(按空格键)', '更多(按任意键)'
-                ]
-                
-                # 更精确的Y/N检测模式（仅命令执行阶段）
-                yn_pattern = re.compile(r'((\(y/n\)|(\[y/n\])|(\(yes/no\))|(\[yes/no\])|continue\s*\?\s*\([yn]\))\s*[:：]\s*$', re.IGNORECASE)
-                
-                last_data_time = time.time()
-                empty_count = 0
-                max_empty = 60  # 增加基础空闲计数
-                
-                # 根据厂商调整参数 - 为所有厂商提供优化参数
-                if 'ruijie' in vendor.lower() or '锐捷' in vendor.lower():
-                    max_empty = 45
-                elif 'h3c' in vendor.lower():
-                    max_empty = 80
-                elif 'huawei' in vendor.lower():
-                    max_empty = 100  # 华为设备给予最大的容忍度
-                elif 'cisco' in vendor.lower():
-                    max_empty = 70   # 思科设备需要较多容忍度
-                else:
-                    max_empty = 60   # 其他厂商默认参数
-                
-                # 根据命令类型和厂商调整超时 - 为所有厂商优化超时时间
-                timeout = 240  # 基础超时增加到240秒
-                if any(x in cmd.lower() for x in ['configuration', 'running-config', 'startup-config']):
-                    timeout = 900  # 配置备份命令超时增加到15分钟
-                
-                # 厂商特定超时调整
-                if 'huawei' in vendor.lower():
-                    timeout += 300  # 华为设备额外增加5分钟
-                elif 'h3c' in vendor.lower():
-                    timeout += 240  # 华三设备额外增加4分钟
-                elif 'cisco' in vendor.lower():
-                    timeout += 180  # 思科设备额外增加3分钟
-                elif 'ruijie' in vendor.lower() or '锐捷' in vendor.lower():
-                    timeout += 120  # 锐捷设备额外增加2分钟
-                
-                while True:
-                    time.sleep(0.08)
-                    if chan.recv_ready():
-                        data = chan.recv(65535).decode(errors='ignore')
-                        raw_output += data
-                        last_data_time = time.time()
-                        
-                        # 改进的分页符检测：精确的完整行匹配，避免误判配置内容
-                        pagination_found = False
-                        data_lines = data.split('\n')
-                        for line in data_lines:
-                            line_clean = line.strip()
-                            # 精确匹配分页符：必须是完整的分页符行，避免误判配置
-                            for indicator in pagination_indicators:
-                                # 方法1：完全相等匹配
-                                if line_clean.lower() == indicator.lower().strip():
-                                    chan.send(b' ')
-                                    time.sleep(0.2)  # 增加延迟确保分页命令生效
-                                    pagination_found = True
-                                    break
-                                # 方法2：精确的正则匹配（行首行尾匹配）
-                                elif re.match(rf'^\s*{re.escape(indicator)}\s*$', line_clean, re.IGNORECASE):
-                                    chan.send(b' ')
-                                    time.sleep(0.2)
-                                    pagination_found = True
-                                    break
-                            if pagination_found:
-                                break
-                        
-                        if not pagination_found:
-                            # Y/N自动应答（仅在命令执行阶段，更严格的匹配）
-                            if yn_pattern.search(data):
-                                chan.send(b'n\n')
-                                time.sleep(0.15)
-                        
-                        # 改进的提示符检测 - 更保守的结束条件
-                        lines = data.strip().splitlines()
-                        if lines:
-                            last_line = lines[-1].strip()
-                            # 检查最后一行是否为提示符，增加更多验证条件
-                            if any(last_line.endswith(p) for p in prompt_list):
-                                # 多重验证确保这确实是提示符
-                                if (len(last_line) < 80 and  # 提示符通常较短
-                                    not any(keyword in last_line.lower() for keyword in ['interface', 'vlan', 'route', 'access', 'trunk']) and  # 不包含配置关键字
-                                    time.time() - last_data_time > 1.5):  # 确保有足够的静默时间
-                                    # 额外等待确认没有更多数据
-                                    time.sleep(0.5)
-                                    if not chan.recv_ready():  # 确认没有pending数据
-                                        break
-                    else:
-                        empty_count += 1
-                        # 调整超时检查逻辑 - 华为设备需要更宽松的检查
-                        data_silence_time = time.time() - last_data_time
-                        total_time = time.time() - start_time
-                        
-                        # 华为设备专门的超时逻辑
-                        if 'huawei' in vendor.lower():
-                            if empty_count >= max_empty or data_silence_time > 20 or total_time > timeout:
-                                break
-                        else:
-                            if empty_count >= max_empty or data_silence_time > 12 or total_time > timeout:
-                                break
-                # 分页符与控制符清理
-                output = self.clean_output_preserve_integrity(raw_output, cmd)
-                # 从上一次的输出中提取提示符
-                prompt = ''
-                if prev_raw_output and prev_raw_output.strip():
-                    prompt_lines = prev_raw_output.strip().splitlines()
-                    if prompt_lines:
-                        prompt = prompt_lines[-1].strip()
-                        cleaned_lines = output.strip().splitlines()
-                        if cleaned_lines and cleaned_lines[0].strip() == prompt:
-                            pass
-                        else:
-                            output = f"{prompt}\n{output}"
-                log_output.append(output)
-                prev_raw_output = raw_output
-            ssh.close()
-            safe_name = re.sub(r'[^-\w\-\_\u4e00-\u9fa5]', '_', name)
-            out_file = os.path.join(backup_dir, f'{safe_name}_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-            with open(out_file, 'w', encoding='utf-8', errors='ignore') as f:
-                f.writelines(log_output)
-            return True, out_file, ''
-        except Exception as e:
-            return False, '', str(e)
+        """更新备份进度显示（任意线程可调用，由 progress_pump 在界面线程中合并写入）"""
+        self.progress_pump.post('backup', text)
+
+    def _job_settings(self):
+        """当前并发设置对应的批量任务参数"""
+        return jobs.JobSettings(
+            max_concurrent_devices=self.max_concurrent_devices, connection_timeout=self.connection_timeout,
+            max_retries=self.max_retries, retry_base_delay=self.retry_base_delay,
+            retry_max_delay=self.retry_max_delay, retry_jitter=self.retry_jitter,
+            use_async_engine=self.use_async_engine, async_max_concurrent=self.async_max_concurrent,
+            config_store=self.use_config_store, archive_logs=self.archive_logs,
+            run_index=self.run_index_path)
 
     def import_inspect_devices(self):
         file_path = filedialog.askopenfilename(title="选择巡检设备+指令CSV文件", filetypes=[("CSV文件", "*.csv")])
         if file_path:
             try:
-                devices = self._open_csv_compat(file_path)
-                for device in devices:
-                    cmds = []
-                    row_list = list(device.values())
-                    if len(row_list) > 7:
-                        cmds = [cmd.strip() for cmd in row_list[7:] if cmd.strip()]
-                    device['cmds'] = cmds
-                self.inspect_device_list = devices
+                self.inspect_device_list = jobs.load_inspect_devices(file_path)
                 self.inspect_device_count_var.set(f"设备数：{len(self.inspect_device_list)}")
+                self._index_devices(self.inspect_device_list, 'inspect')
                 messagebox.showinfo("导入成功", f"成功导入{len(self.inspect_device_list)}台设备！")
             except Exception as e:
                 messagebox.showerror("导入失败", f"导入设备列表失败: {e}")
@@ -819,458 +634,29 @@ class NetworkManagementToolV5:
         inspect_thread.start()
     
     def _run_inspect_task(self, inspect_folder):
-        """并发巡检任务的具体实现（在后台线程中运行）"""
-        now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        folder = os.path.join(inspect_folder, f'inspect_{now}')
-        os.makedirs(folder, exist_ok=True)
-        total = len(self.inspect_device_list)
-        success = 0
-        fail = 0
-        log_lines = []
-        
-        # 显示巡检目录信息（使用after方法在主线程中更新UI）
-        def update_progress(text):
-            self.root.after(0, lambda: self._update_inspect_progress(text))
-        
-        update_progress(f"巡检目录: {folder}\n")
-        update_progress(f"设备总数: {total}\n")
-        update_progress(f"并发数: {self.max_concurrent_devices} 台同时进行\n")
-        update_progress("=" * 50 + "\n\n")
-        
-        # 记录总开始时间
-        total_start_time = time.time()
-        
-        # 创建线程池并发执行巡检
-        with ThreadPoolExecutor(max_workers=self.max_concurrent_devices) as executor:
-            future_to_device = {}
-            for idx, device in enumerate(self.inspect_device_list):
-                future = executor.submit(self._concurrent_inspect_device, device, folder, idx+1, total)
-                future_to_device[future] = device
-            
-            for future in as_completed(future_to_device):
-                device = future_to_device[future]
-                name = device.get('name', 'unknown')
-                ip = device.get('ip', '-')
-                try:
-                    result = future.result()
-                    ok, logfile, errmsg, duration = result
-                except Exception as e:
-                    ok, logfile, errmsg, duration = False, '', str(e), 0
-                
-                if ok:
-                    success += 1
-                    log_lines.append(f"[SUCCESS] {name} ({ip}) -> {logfile} (耗时: {duration:.1f}秒)")
-                else:
-                    fail += 1
-                    log_lines.append(f"[FAILED] {name} ({ip}) -> {errmsg} (耗时: {duration:.1f}秒)")
-                
-                update_progress(log_lines[-1] + "\n")
-        
-        # 计算总耗时
-        total_end_time = time.time()
-        total_duration = total_end_time - total_start_time
-        
-        # 写入汇总日志
-        summary_log = os.path.join(folder, f'inspect_summary_{now}.log')
-        with open(summary_log, 'w', encoding='utf-8', errors='ignore') as f:
-            f.write(f"全部设备并发自动巡检完成。\n成功: {success} 台，失败: {fail} 台，总计: {total} 台。\n")
-            f.write(f"并发数: {self.max_concurrent_devices} 台\n")
-            f.write(f"总耗时: {total_duration:.1f}秒 ({total_duration/60:.1f}分钟)\n")
-            f.write(f"平均每台耗时: {total_duration/total:.1f}秒\n")
-            f.write(f"效率提升: 相比串行约节省 {max(0, total*60 - total_duration):.0f}秒\n")
-            f.write(f"巡检目录: {folder}\n\n")
-            f.write('\n'.join(log_lines))
-        
-        # 显示最终结果
-        update_progress(f"\n" + "=" * 50 + "\n")
-        update_progress(f"🎉 并发巡检完成！\n")
-        update_progress(f"成功: {success} 台，失败: {fail} 台，总计: {total} 台\n")
-        update_progress(f"总耗时: {total_duration:.1f}秒 ({total_duration/60:.1f}分钟)\n")
-        update_progress(f"并发数: {self.max_concurrent_devices} 台\n")
-        update_progress(f"汇总日志: {summary_log}\n")
+        """并发巡检任务的具体实现（在后台线程中运行，实现见 jobs.run_job）"""
+        summary = jobs.run_job('inspect', self.inspect_device_list, inspect_folder, self._job_settings(),
+                               progress=self._update_inspect_progress)
+        success, fail, total = summary['success'], summary['fail'], summary['total']
+        total_duration = summary['duration']
+        timing_log = summary['timing_log']
         
         # 在主线程中显示完成消息
         self.root.after(0, lambda: messagebox.showinfo("完成", 
             f"全部设备并发自动巡检完成！\n成功: {success} 台，失败: {fail} 台，总计: {total} 台。\n"
             f"总耗时: {total_duration:.1f}秒 ({total_duration/60:.1f}分钟)\n"
-            f"并发效率提升明显！"))
-    
-    def _concurrent_inspect_device(self, device, folder, device_idx, total):
-        """单个设备的巡检任务（在线程池中执行）"""
-        name = device.get('name', 'unknown')
-        ip = device.get('ip', '-')
-        
-        # 记录开始时间
-        start_time = time.time()
-        
-        # 更新进度显示（线程安全）
-        def update_progress(text):
-            self.root.after(0, lambda: self._update_inspect_progress(text))
-        
-        update_progress(f"[{device_idx}/{total}] 开始巡检: {name} ({ip})\n")
-        
-        try:
-            # 添加调试信息
-            update_progress(f"[{device_idx}/{total}] 正在连接设备: {name} ({ip})\n")
-            ok, logfile, errmsg = self.inspect_device(device, folder)
-            end_time = time.time()
-            duration = end_time - start_time
-            
-            # 添加完成信息
-            if ok:
-                update_progress(f"[{device_idx}/{total}] ✅ 巡检完成: {name} ({ip}) -> {logfile} (耗时: {duration:.1f}秒)\n")
-            else:
-                update_progress(f"[{device_idx}/{total}] ❌ 巡检失败: {name} ({ip}) -> {errmsg} (耗时: {duration:.1f}秒)\n")
-            
-            return ok, logfile, errmsg, duration
-        except Exception as e:
-            end_time = time.time()
-            duration = end_time - start_time
-            update_progress(f"[{device_idx}/{total}] ❌ 巡检异常: {name} ({ip}) -> {str(e)} (耗时: {duration:.1f}秒)\n")
-            return False, '', str(e), duration
+            f"阶段耗时明细: {timing_log}"))
     
     def _update_inspect_progress(self, text):
-        """在主线程中安全地更新巡检进度显示"""
-        try:
-            self.inspect_progress_text.config(state="normal")
-            self.inspect_progress_text.insert("end", text)
-            self.inspect_progress_text.config(state="disabled")
-            self.inspect_progress_text.see("end")
-            self.inspect_progress_text.update()
-        except Exception:
-            pass  # 忽略UI更新错误
-
-    def inspect_device(self, device, folder):
-        """
-        彻底迁移V10巡检主循环和分页符处理，保证输出与V10一致。
-        """
-        name = device.get('name', 'unknown')
-        ip = device.get('ip', '-')
-        username = device.get('username', 'admin')
-        password = device.get('password', '')
-        port = int(device.get('port', 22))
-        vendor = (device.get('vendor', '') or '').lower()
-        cmds = device.get('cmds') if device.get('cmds') else None
-        if not cmds:
-            if vendor == 'huawei':
-                cmds = ['display cpu-usage', 'display memory-usage', 'display current-configuration', 'display fan', 'display power', 'display environment']
-            elif vendor == 'cisco':
-                cmds = ['show version', 'show running-config']
-            else:
-                cmds = ['display version', 'show version']
-        if isinstance(cmds, str):
-            cmds = [cmd.strip() for cmd in cmds.split(',') if cmd.strip()]
-        log_output = []
-        try:
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(str(ip), port=port, username=username, password=password, timeout=30, allow_agent=False, look_for_keys=False)
-            chan = ssh.invoke_shell(width=1000, height=200)
-            time.sleep(2.5)
-            # 登录输出收集 - 修复所有厂商设备登录阶段Y/N自动应答问题
-            login_output = ''
-            prompt_list = ['#', '>', '$']
-            login_timeout = time.time() + 30
-            
-            # 登录阶段所有厂商的Y/N检测模式（通用匹配）
-            login_yn_patterns = [
-                # 华为设备常见登录Y/N提示
-                r'Change now\?\s*\[Y/N\][:：]\s*$',  # Change now? [Y/N]:
-                r'password needs to be changed.*\[Y/N\][:：]\s*$',  # password needs to be changed. Change now? [Y/N]:
-                r'Do you want to change.*\[Y/N\][:：]\s*$',  # Do you want to change the password? [Y/N]:
-                # 思科设备常见登录Y/N提示
-                r'Would you like to enter the initial configuration dialog\?\s*\[yes/no\][:：]\s*$',  # Would you like to enter the initial configuration dialog? [yes/no]:
-                r'Would you like to terminate autoinstall\?\s*\[yes\][:：]\s*$',  # Would you like to terminate autoinstall? [yes]:
-                # 华三设备常见登录Y/N提示
-                r'Save\?\s*\[Y/N\][:：]\s*$',  # Save? [Y/N]:
-                r'Continue\?\s*\[Y/N\][:：]\s*$',  # Continue? [Y/N]:
-                # 锐捷设备常见登录Y/N提示
-                r'Enter the password\?\s*\[yes/no\][:：]\s*$',  # Enter the password? [yes/no]:
-                # 通用Y/N模式（登录阶段）
-                r'\w+\?\s*\[Y/N\][:：]\s*$',  # 任何问题? [Y/N]:
-                r'\w+\?\s*\[yes/no\][:：]\s*$',  # 任何问题? [yes/no]:
-            ]
-            
-            while True:
-                time.sleep(0.12)
-                if chan.recv_ready():
-                    data = chan.recv(65535).decode(errors='ignore')
-                    login_output += data
-                    
-                    # 检查是否是登录阶段的Y/N提示（仅在登录阶段处理）
-                    login_yn_found = False
-                    for pattern in login_yn_patterns:
-                        if re.search(pattern, data, re.IGNORECASE):
-                            # 华为设备登录时的密码变更提示，发送 'n' 跳过
-                            chan.send(b'n\n')
-                            time.sleep(0.3)
-                            login_yn_found = True
-                            break
-                    
-                    if not login_yn_found:
-                        lines = data.strip().splitlines()
-                        if lines:
-                            last_line = lines[-1].strip()
-                            if any(last_line.endswith(p) for p in prompt_list):
-                                break
-                if time.time() > login_timeout:
-                    break
-            prev_raw_output = login_output
-            for idx, cmd in enumerate(cmds):
-                # 添加命令标识
-                log_output.append(f"\n===== 命令 {idx + 1}: {cmd} =====\n")
-                
-                chan.send((cmd + '\n').encode('utf-8'))
-                time.sleep(1.0)
-                raw_output = ''
-                start_time = time.time()
-                
-                # 扩展的分页符检测列表 - 支持所有主流厂商 (巡检模块)
-                pagination_indicators = [
-                    # 华为设备分页符
-                    '---- More ----', '--More--', '<--- More --->', '--- More ---',
-                    'Press any key to continue', 'Press SPACE to continue', 'Press Q to quit',
-                    '按任意键继续', '按空格键继续', '按Q键退出',
-                    # 华三设备分页符
-                    '---- More ----', '--More--', 'More:', '(more)', '[more]', 
-                    '---- more ----', '--more--', '(MORE)', '[MORE]', '-- More --', '---More---',
-                    # 思科设备分页符
-                    '--More--', 'Press any key to continue', 'Press SPACE for more',
-                    '-- More --', '<spacebar> for more', 'q to quit',
-                    # 锐捷设备分页符
-                    '---- More ----', '--More--', 'More...', '(More)', '[More]',
-                    'Press any key to continue', 'Press SPACE to continue',
-                    # 其他厂商通用分页符
-                    'Continue?', 'More (Press SPACE)', 'More (Press any key)',
-                    '继续？', '更多(按空格键)', '更多(按任意键)'
-                ]
-                
-                prompt_regex = r'({})\\s*$'.format('|'.join([re.escape(p) for p in prompt_list]))
-                stable_prompt_count = 0
-                required_stable_count = 3  # 减少稳定计数要求
-                last_output_len = 0
-                no_growth_count = 0
-                max_no_growth = 25  # 减少无增长计数
-                
-                timeout = 300
-                if any(x in cmd.lower() for x in ['configuration', 'running-config', 'startup-config']):
-                    timeout = 600  # 配置命令需要更长时间
-                elif any(x in cmd.lower() for x in ['version', 'hardware', 'system']):
-                    timeout = 180
-                
-                # 针对不同厂商的特殊处理 - 全面优化所有厂商参数
-                if 'ruijie' in vendor.lower() or '锐捷' in vendor.lower():
-                    max_no_growth = 20
-                    required_stable_count = 2
-                    timeout += 120  # 锐捷设备额外增加2分钟
-                elif 'h3c' in vendor.lower():
-                    timeout = 600  # 华三设备需要更长时间
-                    max_no_growth = 30
-                    required_stable_count = 4
-                    timeout += 240  # 华三设备额外增加4分钟
-                elif 'huawei' in vendor.lower():
-                    max_no_growth = 40
-                    required_stable_count = 3
-                    timeout += 300  # 华为设备额外增加5分钟
-                elif 'cisco' in vendor.lower():
-                    max_no_growth = 25
-                    required_stable_count = 3
-                    timeout += 180  # 思科设备额外增加3分钟
-                else:
-                    max_no_growth = 25
-                    required_stable_count = 3
-                    timeout += 120  # 其他厂商额外增加2分钟
-                
-                while True:
-                    time.sleep(0.08)  # 稍微加快循环速度
-                    if chan.recv_ready():
-                        data = chan.recv(65535).decode(errors='ignore')
-                        
-                        # 改进的分页符检测：精确的完整行匹配，避免误判配置内容
-                        pagination_found = False
-                        data_lines = data.split('\n')
-                        for line in data_lines:
-                            line_clean = line.strip()
-                            # 精确匹配分页符：必须是完整的分页符行，避免误判配置
-                            for indicator in pagination_indicators:
-                                # 方法1：完全相等匹配
-                                if line_clean.lower() == indicator.lower().strip():
-                                    chan.send(b' ')
-                                    time.sleep(0.2)  # 增加延迟确保分页命令生效
-                                    pagination_found = True
-                                    break
-                                # 方法2：精确的正则匹配（行首行尾匹配）
-                                elif re.match(rf'^\s*{re.escape(indicator)}\s*$', line_clean, re.IGNORECASE):
-                                    chan.send(b' ')
-                                    time.sleep(0.2)
-                                    pagination_found = True
-                                    break
-                            if pagination_found:
-                                break
-                        
-                        # 处理Y/N应答（仅在命令执行阶段，更严格的匹配）
-                        if not pagination_found:
-                            yn_patterns = [
-                                r'\(y/n\)[:：]\s*$',  # (y/n): 
-                                r'\(yes/no\)[:：]\s*$',  # (yes/no):
-                                r'\[[yY]/[nN]\][:：]\s*$',  # [y/n]:
-                                r'\([yY]/[nN]\)[:：]\s*$',  # (y/n):
-                                r'\[[yY][eE][sS]/[nN][oO]\][:：]\s*$',  # [yes/no]:
-                                r'\([yY][eE][sS]/[nN][oO]\)[:：]\s*$',  # (yes/no):
-                                r'continue\s*\?\s*\([yY]/[nN]\)[:：]\s*$',  # continue? (y/n):
-                                r'sure\s*\?\s*\([yY]/[nN]\)[:：]\s*$',  # sure? (y/n):
-                            ]
-                            
-                            yn_found = False
-                            for pattern in yn_patterns:
-                                if re.search(pattern, data, re.IGNORECASE):
-                                    chan.send(b'n\n')
-                                    time.sleep(0.15)
-                                    yn_found = True
-                                    break
-                        
-                        raw_output += data
-                        
-                        # 检查命令提示符
-                        lines = data.strip().splitlines()
-                        if lines:
-                            last_line = lines[-1].strip()
-                            if re.search(prompt_regex, last_line):
-                                stable_prompt_count += 1
-                                if stable_prompt_count >= required_stable_count:
-                                    break
-                            else:
-                                stable_prompt_count = 0
-                        
-                        # 检查输出增长
-                        if len(raw_output) == last_output_len:
-                            no_growth_count += 1
-                            if no_growth_count > max_no_growth:
-                                break
-                        else:
-                            no_growth_count = 0
-                            last_output_len = len(raw_output)
-                    else:
-                        no_growth_count += 1
-                        if no_growth_count > max_no_growth or (time.time() - start_time > timeout):
-                            break
-                # 分页符与控制符清理
-                output = self.clean_output_preserve_integrity(raw_output, cmd)
-                # 从上一次的输出中提取提示符
-                prompt = ''
-                if prev_raw_output and prev_raw_output.strip():
-                    prompt_lines = prev_raw_output.strip().splitlines()
-                    if prompt_lines:
-                        prompt = prompt_lines[-1].strip()
-                        cleaned_lines = output.strip().splitlines()
-                        if cleaned_lines and cleaned_lines[0].strip() == prompt:
-                            pass
-                        else:
-                            output = f"{prompt}\n{output}"
-                log_output.append(output)
-                prev_raw_output = raw_output
-            ssh.close()
-            safe_name = re.sub(r'[^-\w\-\_\u4e00-\u9fa5]', '_', name)
-            out_file = os.path.join(folder, f'{safe_name}_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-            with open(out_file, 'w', encoding='utf-8', errors='ignore') as f:
-                f.writelines(log_output)
-            return True, out_file, ''
-        except Exception as e:
-            return False, '', str(e)
+        """更新巡检进度显示（任意线程可调用，由 progress_pump 在界面线程中合并写入）"""
+        self.progress_pump.post('inspect', text)
 
     def clean_output_preserve_integrity(self, text, command=None):
         """
         V13增强版输出清理函数，智能处理分页符遗留的异常空格，同时保留原始缩进和列对齐
+        （实现见 output_cleaner.clean_output，流式写日志时使用 StreamCleaner）
         """
-        if not text:
-            return text
-        # 第一步：移除ANSI转义序列，但绝对保留换行符
-        text = re.sub(r'\x1b\[[0-9;]*[A-Za-z]', '', text)
-        text = re.sub(r'\x1b\[[0-9]*[A-Za-z]', '', text)
-        # 第二步：处理锐捷设备的退格符问题
-        text = re.sub(r'(\x08)+', '', text)
-        text = re.sub(r'(\bBS\b\s*)+', '', text)
-        # 第三步：统一换行符，但保留所有换行
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        # 第四步：逐行精确处理分页符和空格遗留问题
-        lines = text.split('\n')
-        cleaned_lines = []
-        pagination_patterns = [
-            r'---- More ----', r'--More--', r'<--- More --->', r'--- More ---',
-            r'Press any key to continue', r'Press SPACE to continue', r'Press Q to quit',
-            r'More:', r'\(more\)', r'\[more\]', r'---- more ----', r'--more--', 
-            r'\(MORE\)', r'\[MORE\]', r'-- More --', r'---More---'
-        ]
-        for line in lines:
-            original_line = line
-            line_stripped = line.strip()
-            is_pure_pagination = False
-            for pattern in pagination_patterns:
-                if re.fullmatch(pattern, line_stripped, flags=re.IGNORECASE):
-                    is_pure_pagination = True
-                    break
-            if is_pure_pagination:
-                continue
-            cleaned_line = original_line
-            for pattern in pagination_patterns:
-                match = re.search(pattern, cleaned_line, re.IGNORECASE)
-                if match:
-                    before = cleaned_line[:match.start()]
-                    after = cleaned_line[match.end():]
-                    before_clean = before.rstrip()
-                    after_clean = after.lstrip()
-                    if after_clean.strip():
-                        cleaned_line = after_clean
-                    elif before_clean.strip():
-                        cleaned_line = before_clean
-                    else:
-                        cleaned_line = ''
-                    break
-            # 清理Y/N自动应答残留（仅清理明显的孤立应答字符）
-            if re.match(r'^\s*[nNyY]\s*$', cleaned_line):
-                continue
-            cleaned_line = re.sub(r'\(y/n\):\s*[nNyY]\s*$', '(y/n):', cleaned_line, flags=re.IGNORECASE)
-            cleaned_line = re.sub(r'\(yes/no\):\s*(yes|no)\s*$', '(yes/no):', cleaned_line, flags=re.IGNORECASE)
-            cleaned_line = re.sub(r'\[Y/N\]:\s*[nNyY]\s*$', '[Y/N]:', cleaned_line, flags=re.IGNORECASE)
-            # V13增强：智能处理行首异常空格（分页符遗留）
-            leading_match = re.match(r'^(\s+)', cleaned_line)
-            if leading_match:
-                leading_spaces = leading_match.group(1)
-                leading_count = len(leading_spaces)
-                content_after_spaces = cleaned_line[leading_count:]
-                is_abnormal_leading = False
-                # 超过8个空格且内容为命令/任务/表格，判定为异常
-                if leading_count >= 8:
-                    if re.match(r'^[A-Z0-9]+\s+\d+%', content_after_spaces):
-                        is_abnormal_leading = True
-                    elif re.match(r'^[A-Z][A-Z0-9_]+\s+', content_after_spaces):
-                        is_abnormal_leading = True
-                    elif re.match(r'^\w+\s+\w+\s+:', content_after_spaces):
-                        is_abnormal_leading = True
-                if is_abnormal_leading:
-                    cleaned_line = content_after_spaces
-            # V13增强：行内异常空格压缩（分页符遗留）
-            # 对于任务/表格类，超过8个连续空格压缩为2个空格
-            cleaned_line = re.sub(r' {8,}', '  ', cleaned_line)
-            # 只清理行尾过多的空格（超过10个连续空格的行尾）
-            if re.search(r'\s{10,}$', cleaned_line):
-                cleaned_line = cleaned_line.rstrip()
-            cleaned_lines.append(cleaned_line)
-        # 第五步：适度的空行合并（保留格式完整性）
-        final_lines = []
-        consecutive_empty = 0
-        for line in cleaned_lines:
-            if not line.strip():
-                consecutive_empty += 1
-                if consecutive_empty <= 2:
-                    final_lines.append(line)
-            else:
-                consecutive_empty = 0
-                final_lines.append(line)
-        result = '\n'.join(final_lines)
-        if result and not result.endswith('\n'):
-            result += '\n'
-        return result
+        return clean_output(text)
 
     def show_device_status(self):
         if not hasattr(self, 'inspect_device_list') or not self.inspect_device_list:
@@ -1293,60 +679,32 @@ class NetworkManagementToolV5:
     def parse_device_status_from_logs(self):
         """
         从巡检日志中解析设备状态，使用 extract_device_status.py 模块
+        解析在后台线程中交给多进程并行执行（log_parse_pool），结果分批插入表格；
+        未变化的日志直接取解析缓存（parse_cache）中的结果
         """
         log_dir = filedialog.askdirectory(title="请选择巡检日志文件夹")
         if not log_dir:
             return
 
-        # 动态加载 extract_device_status.py
+        # 获取 extract_device_status.py（已加载且文件未修改时直接复用）
         try:
-            importlib.invalidate_caches()  # 强制清除缓存，确保加载最新模块
-            
-            # 多路径查找 extract_device_status.py
-            possible_paths = []
-            # PyInstaller打包后的临时目录
-            if hasattr(sys, '_MEIPASS'):
-                possible_paths.append(os.path.join(sys._MEIPASS, 'extract_device_status.py'))
-            # 当前文件同目录
-            if '__file__' in globals():
-                possible_paths.append(os.path.join(os.path.dirname(__file__), 'extract_device_status.py'))
-            # 当前工作目录
-            possible_paths.append(os.path.abspath('extract_device_status.py'))
-            # 程序所在目录
-            if hasattr(sys, 'executable') and sys.executable:
-                exe_dir = os.path.dirname(sys.executable)
-                possible_paths.append(os.path.join(exe_dir, 'extract_device_status.py'))
-            # 脚本所在目录
-            possible_paths.append(os.path.join(os.getcwd(), 'extract_device_status.py'))
-            
-            found_path = None
-            for p in possible_paths:
-                if os.path.isfile(p):
-                    found_path = p
-                    break
-            
-            if found_path is None:
+            extract_module = get_extract_module()
+            if extract_module is None:
                 messagebox.showerror("导入失败", "未找到 extract_device_status.py，请确保该文件与程序在同一目录！")
                 return
-                
-            spec = importlib.util.spec_from_file_location("extract_device_status", found_path)
-            if spec is None or spec.loader is None:
-                messagebox.showerror("导入失败", "无法加载 extract_device_status.py 模块！")
-                return
-                
-            extract_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(extract_module)
-            
-            # 使用模块解析日志
-            status_data = extract_module.parse_log_files(log_dir)
+            found_path = extract_module.__file__
+            log_files = extract_module.find_log_files(log_dir)
             
-            if not status_data:
+            if not log_files:
                 messagebox.showwarning("解析结果", "未找到可解析的日志文件或解析结果为空！")
                 return
             
         except Exception as e:
             messagebox.showerror("解析失败", f"解析设备状态时发生错误: {e}")
             return
+
+        # 解析在后台多进程进行，结果边解析边显示
+        status_data = []
 
         # 显示解析结果窗口
         win = tk.Toplevel(self.root)
@@ -1357,8 +715,9 @@ class NetworkManagementToolV5:
         top_frame = tk.Frame(win)
         top_frame.pack(fill="x", pady=5)
         
-        tk.Label(top_frame, text=f"解析完成，共找到 {len(status_data)} 台设备", 
-                font=("微软雅黑", 12, "bold")).pack(side="left", padx=10)
+        count_label = tk.Label(top_frame, text=f"正在解析 0/{len(log_files)} 个日志文件...",
+                               font=("微软雅黑", 12, "bold"))
+        count_label.pack(side="left", padx=10)
 
         def export_parsed_data_to_csv():
             save_path = filedialog.asksaveasfilename(
@@ -1402,8 +761,6 @@ class NetworkManagementToolV5:
                         pass
             return -score
 
-        status_data.sort(key=abnormal_score)
-
         # 显示结果表格
         columns = ("设备名", "时间", "厂商", "CPU使用率", "内存使用率", "温度状态", "电源状态", "风扇状态", "运行时间")
         tree_frame = tk.Frame(win)
@@ -1415,10 +772,6 @@ class NetworkManagementToolV5:
             tree.heading(col, text=col)
             tree.column(col, width=110, anchor='center')
 
-        for item in status_data:
-            values = [item.get(col, 'N/A') for col in columns]
-            tree.insert('', 'end', values=values)
-        
         # 添加滚动条
         vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
         vsb.pack(side='right', fill='y')
@@ -1426,6 +779,117 @@ class NetworkManagementToolV5:
         
         tree.pack(fill='both', expand=True)
 
+        def insert_rows(rows):
+            if not win.winfo_exists():
+                return
+            status_data.extend(rows)
+            for item in rows:
+                tree.insert('', 'end', values=[item.get(col, 'N/A') for col in columns])
+            count_label.config(text=f"正在解析 {len(status_data)}/{len(log_files)} 个日志文件...")
+
+        cached = [0]
+
+        def finish_parse(error=None):
+            if not win.winfo_exists():
+                return
+            if error is not None:
+                messagebox.showerror("解析失败", f"解析设备状态时发生错误: {error}", parent=win)
+            elif not status_data:
+                messagebox.showwarning("解析结果", "未找到可解析的日志文件或解析结果为空！", parent=win)
+            # 全部解析完成后按异常优先重新排序
+            status_data.sort(key=abnormal_score)
+            tree.delete(*tree.get_children())
+            for item in status_data:
+                tree.insert('', 'end', values=[item.get(col, 'N/A') for col in columns])
+            count_label.config(text=f"解析完成，共找到 {len(status_data)} 台设备（其中 {cached[0]} 个日志未变化，取自缓存）")
+
+        def parse_worker():
+            cache = parse_cache.open_cache(self.parse_cache_path)
+            try:
+                rows = parse_logs(found_path, log_files, cache=cache,
+                                  on_rows=lambda rows: self.root.after(0, lambda rows=rows: insert_rows(rows)))
+            except Exception as e:
+                self.root.after(0, lambda e=e: finish_parse(e))
+                return
+            finally:
+                if cache is not None:
+                    cached[0] = cache.hits
+                    cache.close()
+            self.root.after(0, finish_parse)
+            # 解析结果写入运行历史索引，“历史状态”中直接显示，不需要重新解析
+            try:
+                with run_index.RunIndex(self.run_index_path) as index:
+                    index.record_health(rows)
+            except Exception as e:
+                print(f"写入运行历史索引失败: {e}")
+
+        threading.Thread(target=parse_worker, daemon=True).start()
+
+    def show_run_history(self):
+        """从运行历史索引显示每台设备最近的备份/巡检结果与健康指标，或最近的失败记录"""
+        try:
+            index = run_index.RunIndex(self.run_index_path)
+            status_rows = index.latest_status()
+        except Exception as e:
+            messagebox.showerror("历史状态", f"读取运行历史索引失败: {e}")
+            return
+
+        win = tk.Toplevel(self.root)
+        win.title("设备历史状态")
+        win.geometry("1200x600")
+        top_frame = tk.Frame(win)
+        top_frame.pack(fill="x", pady=5)
+        count_label = tk.Label(top_frame, font=("微软雅黑", 12, "bold"))
+        count_label.pack(side="left", padx=10)
+
+        tree_frame = tk.Frame(win)
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        tree = ttk.Treeview(tree_frame, show='headings')
+        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+        vsb.pack(side='right', fill='y')
+        tree.configure(yscrollcommand=vsb.set)
+        tree.pack(fill='both', expand=True)
+
+        def result_text(ok):
+            return '' if ok is None else ('成功' if ok else '失败')
+
+        def fill(columns, rows):
+            tree.delete(*tree.get_children())
+            tree.configure(columns=columns)
+            for col in columns:
+                tree.heading(col, text=col)
+                tree.column(col, width=110, anchor='center')
+            for values in rows:
+                tree.insert('', 'end', values=[v if v is not None else '' for v in values])
+
+        def show_status():
+            columns = ("设备名", "IP", "厂商", "最近备份", "备份结果", "最近成功备份", "最近巡检", "巡检结果",
+                       "CPU使用率", "内存使用率", "温度状态", "电源状态", "风扇状态")
+            fill(columns, [(r['name'], r['ip'], r['vendor'], r['backup_time'], result_text(r['backup_ok']),
+                            r['backup_last_ok'], r['inspect_time'], result_text(r['inspect_ok']),
+                            r['cpu'], r['mem'], r['temp'], r['power'], r['fan']) for r in status_rows])
+            count_label.config(text=f"共 {len(status_rows)} 台设备（{self.run_index_path}）")
+
+        def show_failures():
+            try:
+                rows = index.failures()
+            except Exception as e:
+                messagebox.showerror("历史状态", f"读取运行历史索引失败: {e}", parent=win)
+                return
+            fill(("时间", "任务", "设备名", "IP", "耗时(秒)", "错误", "任务目录"),
+                 [(r['finished'], jobs.JOBS[r['kind']][0], r['name'], r['ip'], r['duration'], r['error'],
+                   r['folder']) for r in rows])
+            count_label.config(text=f"最近 {len(rows)} 条失败记录")
+
+        def close():
+            index.close()
+            win.destroy()
+
+        tk.Button(top_frame, text="最新状态", command=show_status, font=("微软雅黑", 10)).pack(side="right", padx=10)
+        tk.Button(top_frame, text="最近失败", command=show_failures, font=("微软雅黑", 10)).pack(side="right", padx=10)
+        win.protocol("WM_DELETE_WINDOW", close)
+        show_status()
+
     # 管理功能实现
     def import_manage_devices(self):
         file_path = filedialog.askopenfilename(title="选择设备CSV文件", filetypes=[("CSV文件", "*.csv")])
@@ -1435,6 +899,7 @@ class NetworkManagementToolV5:
                 if not self.manage_device_list:
                     messagebox.showwarning("导入失败", "设备列表为空！")
                     return
+                self._index_devices(self.manage_device_list, 'manage')
                 self.current_account_list = []
                 self.account_tree.delete(*self.account_tree.get_children())
                 for dev in self.manage_device_list:
@@ -1463,237 +928,101 @@ class NetworkManagementToolV5:
         self.status_canvas.create_arc(40, 40, 200, 200, start=angle_online, extent=angle_offline, fill="#f4cccc", outline="")
         self.status_canvas.create_oval(80, 80, 160, 160, fill="#f7fbff", outline="")
         self.status_canvas.create_text(120, 120, text=f"在线: {online}\n离线: {offline}", font=("微软雅黑", 15, "bold"), fill="#007acc")
-        self.status_label.config(text=f"设备总数: {total}，在线: {online}，离线: {offline}")
+        text = f"设备总数: {total}，在线: {online}，离线: {offline}"
+        availability = self.monitor_history.availability(since=time.time() - self.monitor_trend_window)
+        if availability is not None:
+            text += f"\n近{self.monitor_trend_window // 60}分钟可用率: {availability:.1f}%"
+        self.status_label.config(text=text)
+        self.draw_monitor_trend()
+
+    def draw_monitor_trend(self):
+        """绘制整体可用率（实线）与平均延迟（虚线）趋势"""
+        canvas = getattr(self, 'trend_canvas', None)
+        if canvas is None or not canvas.winfo_exists():
+            return
+        canvas.delete("all")
+        width, left, top, bottom = 360, 44, 30, 180
+        canvas.create_text(left, 12, anchor="w", text=f"近{self.monitor_trend_window // 60}分钟可用率/延迟趋势",
+                           font=("微软雅黑", 10, "bold"), fill="#007acc")
+        canvas.create_line(left, bottom, width - 10, bottom, fill="#b3d7f5")
+        canvas.create_line(left, top, left, bottom, fill="#b3d7f5")
+        canvas.create_text(left - 4, top, anchor="e", text="100%", font=("微软雅黑", 8), fill="#666666")
+        canvas.create_text(left - 4, bottom, anchor="e", text="0%", font=("微软雅黑", 8), fill="#666666")
+        timeline = self.monitor_history.timeline(since=time.time() - self.monitor_trend_window)
+        if len(timeline) < 2:
+            canvas.create_text((left + width) / 2, (top + bottom) / 2, text="暂无历史数据", font=("微软雅黑", 10), fill="#999999")
+            return
+        step = (width - 10 - left) / (len(timeline) - 1)
+        points = []
+        for i, (start, availability, rtt) in enumerate(timeline):
+            points += [left + i * step, bottom - availability / 100 * (bottom - top)]
+        canvas.create_line(*points, fill="#6fa8dc", width=2)
+        rtts = [rtt for start, availability, rtt in timeline if rtt is not None]
+        if len(rtts) >= 2:
+            max_rtt = max(rtts) or 1
+            points = []
+            for i, (start, availability, rtt) in enumerate(timeline):
+                if rtt is not None:
+                    points += [left + i * step, bottom - rtt / max_rtt * (bottom - top)]
+            canvas.create_line(*points, fill="#e69138", dash=(4, 2))
+            canvas.create_text(width - 10, top - 10, anchor="e", text=f"延迟峰值 {max_rtt:.0f}ms",
+                               font=("微软雅黑", 8), fill="#e69138")
 
     def show_all_device_status(self):
         """显示所有设备的详细状态信息"""
         from tkinter import messagebox
         try:
-            # 动态查找 extract_device_status.py
-            possible_paths = []
-            # PyInstaller打包后的临时目录
-            if hasattr(sys, '_MEIPASS'):
-                possible_paths.append(os.path.join(sys._MEIPASS, 'extract_device_status.py'))
-            # 当前文件同目录
-            if '__file__' in globals():
-                possible_paths.append(os.path.join(os.path.dirname(__file__), 'extract_device_status.py'))
-            # 当前工作目录
-            possible_paths.append(os.path.abspath('extract_device_status.py'))
-            # 程序所在目录
-            if hasattr(sys, 'executable') and sys.executable:
-                exe_dir = os.path.dirname(sys.executable)
-                possible_paths.append(os.path.join(exe_dir, 'extract_device_status.py'))
-            # 脚本所在目录的上级目录
-            possible_paths.append(os.path.join(os.getcwd(), '..', 'extract_device_status.py'))
-            possible_paths.append(os.path.join(os.getcwd(), 'extract_device_status.py'))
-            
-            found_path = None
-            for p in possible_paths:
-                if os.path.isfile(p):
-                    found_path = p
-                    break
-            # 设备厂商命令字典
-            vendor_cmds = {
-                'huawei': [
-                    'display cpu-usage',
-                    'display memory-usage',
-                    'display temperature',
-                    'display power',
-                    'display fan'
-                ],
-                'h3c': [
-                    'display cpu-usage',
-                    'display cpu',
-                    'display memory',
-                    'display temperature all',
-                    'display power',
-                    'display fan'
-                ],
-                'cisco': [
-                    'show processes cpu',
-                    'show processes memory',
-                    'show environment temperature',
-                    'show environment power',
-                    'show environment fan'
-                ],
-                'ruijie': [
-                    'show cpu',
-                    'show memory',
-                    'show temperature',
-                    'show power',
-                    'show fan'
-                ]
-            }
-            def safe_vendor(v):
-                v = (v or '').lower()
-                if 'huawei' in v:
-                    return 'huawei'
-                if 'h3c' in v:
-                    return 'h3c'
-                if 'cisco' in v:
-                    return 'cisco'
-                if 'ruijie' in v or '锐捷' in v:
-                    return 'ruijie'
-                return 'huawei'  # 默认
+            # 解析模块只加载一次，文件修改后自动重新加载
+            try:
+                extract_module = get_extract_module()
+            except Exception:
+                extract_module = None
             # 进度窗口
             progress = tk.Toplevel(self.root)
             progress.title("设备状态采集进度")
             label = tk.Label(progress, text="正在采集设备状态...", font=("微软雅黑", 12))
             label.pack(padx=20, pady=10)
-            progress.update()
             result = []
-            total = len(self.device_list)
-            for idx, dev in enumerate(self.device_list):
-                name = dev.get('name') or dev.get('设备名') or dev.get('设备名称') or dev.get('主机名')
-                ip = dev.get('ip') or dev.get('IP')
-                vendor = (dev.get('vendor') or dev.get('厂商') or '').strip()
-                username = dev.get('username') or dev.get('用户名') or 'admin'
-                password = dev.get('password') or dev.get('密码') or ''
-                port = int(dev.get('port') or dev.get('端口') or 22)
-                status = '离线'
-                label.config(text=f"[{idx+1}/{total}] {name} ({ip}) 状态采集中...")
-                progress.update()
-                output_all = ''
-                try:
-                    ssh = paramiko.SSHClient()
-                    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                    ssh.connect(str(ip), port=port, username=username, password=password, timeout=10, allow_agent=False, look_for_keys=False)
-                    chan = ssh.invoke_shell()
-                    time.sleep(1)
-                    prompt_list = ['#', '>', '$']
-                    login_output = ''
-                    login_timeout = time.time() + 20
-                    while True:
-                        time.sleep(0.12)
-                        if chan.recv_ready():
-                            data = chan.recv(65535).decode(errors='ignore')
-                            login_output += data
-                            lines = data.strip().splitlines()
-                            if lines:
-                                last_line = lines[-1].strip()
-                                if any(last_line.endswith(p) for p in prompt_list):
-                                    break
-                        if time.time() > login_timeout:
-                            break
-                    
-                    vendor_key = safe_vendor(vendor)
-                    cmds = vendor_cmds.get(vendor_key, vendor_cmds['huawei'])
-                    for cmd in cmds:
-                        if not cmd.endswith('\n'):
-                            cmd += '\n'
-                        chan.send(cmd.encode())
-                        time.sleep(0.5)
-                        cmd_output = ''
-                        last_data_time = time.time()
-                        empty_count = 0
-                        max_empty = 50
-                        yn_pattern = re.compile(r'(yes\s*/\s*no|no\s*/\s*yes|y\s*/\s*n|n\s*/\s*y|\[[yY]/[nN]\]|\([yY]/[nN]\)|\[[yY][eE][sS]/[nN][oO]\]|\([yY][eE][sS]/[nN][oO]\)|[yY][eE][sS]\?|[nN][oO]\?|[yY][nN]\?|[yY][eE][sS]/[nN][oO]|[yY][nN])', re.IGNORECASE)
-                        while True:
-                            time.sleep(0.12)
-                            if chan.recv_ready():
-                                data = chan.recv(65535).decode(errors='ignore')
-                                cmd_output += data
-                                last_data_time = time.time()
-                                # 处理分页符：发送空格键继续分页
-                                if '---- More ----' in data or '--More--' in data:
-                                    chan.send(b' ')
-                                    time.sleep(0.06)
-                                    continue
-                                # Y/N自动应答
-                                if yn_pattern.search(data):
-                                    chan.send(b'n\n')
-                                    time.sleep(0.15)
-                                lines = data.strip().splitlines()
-                                if lines:
-                                    last_line = lines[-1].strip()
-                                    if any(last_line.endswith(p) for p in prompt_list):
-                                        break
-                            else:
-                                empty_count += 1
-                                if empty_count >= max_empty or (time.time() - last_data_time > 8):
-                                    break
-                        output_all += f"\n{cmd.strip()}\n{cmd_output}"
-                    
-                    ssh.close()
-                    status = '在线'
-                except Exception as e:
-                    output_all += f"\n[ERROR] {e}"
-                    status = '离线'
-                # 解析状态（严格对标extract_device_status.py和标准文档，字段名与汇总一致）
-                vendor_detected = vendor
-                info = {}
-                
-                # 优先使用extract_device_status.py解析
-                try:
-                    if found_path is not None:
-                        spec = importlib.util.spec_from_file_location("extract_device_status", found_path)
-                        if spec is not None and spec.loader is not None:
-                            extract_module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(extract_module)
-                            vendor_detected = extract_module.detect_vendor(output_all)
-                            info = extract_module.extract_info(output_all, vendor_detected)
-                except Exception:
-                    pass
-                
-                # 如果extract_device_status.py未能提取到有效信息，使用简化的状态解析
-                if not info or all(not info.get(k) for k in ['cpu', 'mem', 'temp', 'power', 'fan']):
-                    info = self._parse_device_status_fallback(output_all, vendor_detected, status)
-                
-                # 确保所有字段都有值，解析失败时填充N/A
-                cpu = str(info.get('cpu', '')).strip()
-                mem = str(info.get('mem', '')).strip()
-                temp = str(info.get('temp', '')).strip()
-                power = str(info.get('power', '')).strip()
-                fan = str(info.get('fan', '')).strip()
-                uptime = str(info.get('uptime', '')).strip()
-                
-                # 对于在线设备，如果字段为空则填充N/A；对于离线设备，保持空值
-                if status == '在线':
-                    if not cpu:
-                        cpu = 'N/A'
-                    if not mem:
-                        mem = 'N/A'
-                    if not temp:
-                        temp = 'N/A'
-                    if not power:
-                        power = 'N/A'
-                    if not fan:
-                        fan = 'N/A'
-                    if not uptime:
-                        uptime = 'N/A'
-                
-                row = {
-                    '设备名': name,
-                    'IP': ip,
-                    '厂商': vendor_detected,
-                    '状态': status,
-                    'CPU': cpu,
-                    '内存': mem,
-                    '温度': temp,
-                    '电源': power,
-                    '风扇': fan,
-                    '运行时间': uptime
-                }
-                result.append(row)
-            progress.destroy()
-            # 异常优先排序
-            def abnormal_score(row):
-                score = 0
-                if row['状态'] != '在线':
-                    score += 10
-                for k in ['CPU', '内存', '温度', '电源', '风扇']:
-                    v = str(row.get(k, ''))
-                    if v and (('异常' in v) or ('告警' in v) or ('高' in v) or ('坏' in v) or ('down' in v.lower()) or ('fail' in v.lower())):
-                        score += 5
-                return -score
-            result.sort(key=abnormal_score)
-            # 更新表格表头和内容
-            self.tree['columns'] = ("设备名", "IP", "厂商", "状态", "CPU", "内存", "温度", "电源", "风扇", "运行时间")
-            for col in ("设备名", "IP", "厂商", "状态", "CPU", "内存", "温度", "电源", "风扇", "运行时间"):
+            devices = list(self.device_list)
+            total = len(devices)
+            settings = self._job_settings()
+            concurrency = max(1, settings.max_concurrent_devices)
+            # 更新表格表头，清空旧数据后每完成一台设备插入一行
+            self.tree['columns'] = jobs.STATUS_COLUMNS
+            for col in jobs.STATUS_COLUMNS:
                 self.tree.heading(col, text=col)
                 self.tree.column(col, anchor="center", width=110)
-            self.monitor_results = result  # 保存详细结果
-            self.update_tree(result)
+            self.update_tree([])
+
+            def add_row(idx, row):
+                result.append(row)
+                if row['IP']:
+                    self.monitor_history.record(row['IP'], row['状态'] == '在线',
+                                                cpu=timeseries.parse_percent(row['CPU']),
+                                                mem=timeseries.parse_percent(row['内存']))
+                self._tree_updater().update_rows([row], keys=[idx])
+                if progress.winfo_exists():
+                    label.config(text=f"[{len(result)}/{total}] {row['设备名']} ({row['IP']}) 采集完成，并发数 {concurrency}")
+
+            def finish(rows):
+                if progress.winfo_exists():
+                    progress.destroy()
+                # 全部完成后按异常优先排序
+                self.monitor_results = [row for idx, row in rows]  # 保存详细结果
+                self.monitor_keys = [idx for idx, row in rows]
+                self.update_tree(self.monitor_results, self.monitor_keys)
+
+            def collect_all():
+                # 采集在后台线程进行（实现见 jobs.collect_status），界面保持响应
+                rows = []
+                try:
+                    rows = jobs.collect_status(
+                        devices, settings, extract_module=extract_module, fallback=self._parse_device_status_fallback,
+                        on_row=lambda idx, row: self.root.after(0, lambda: add_row(idx, row)))
+                finally:
+                    self.root.after(0, lambda: finish(rows))
+
+            threading.Thread(target=collect_all, daemon=True).start()
         except Exception as e:
             messagebox.showerror("设备状态采集失败", f"采集设备状态时发生错误: {e}")
 
@@ -1723,26 +1052,15 @@ class NetworkManagementToolV5:
             except Exception as e:
                 messagebox.showerror("导出失败", f"导出数据失败: {e}")
 
-    def update_tree(self, data):
-        """更新表格数据"""
-        # 清空现有数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        # 插入新数据
-        for row in data:
-            values = [
-                row.get('设备名', ''),
-                row.get('IP', ''),
-                row.get('厂商', ''),
-                row.get('状态', ''),
-                row.get('CPU', ''),
-                row.get('内存', ''),
-                row.get('温度', ''),
-                row.get('电源', ''),
-                row.get('风扇', ''),
-                row.get('运行时间', '')
-            ]
-            self.tree.insert("", "end", values=values)
+    def update_tree(self, data, keys=None):
+        """更新表格数据：按设备序号（keys，未指定时按设备IP）只更新有变化的行，保留滚动位置与选中项"""
+        self._tree_updater().set_rows(data, keys)
+
+    def _tree_updater(self):
+        """当前表格的增量更新器（切换模块后表格会重建）"""
+        if self.tree_updater is None or self.tree_updater.tree is not self.tree:
+            self.tree_updater = TreeDiffUpdater(self.tree, ("设备名", "IP", "厂商", "状态", "CPU", "内存", "温度", "电源", "风扇", "运行时间"))
+        return self.tree_updater
 
     def export_backup_template(self):
         """导出备份模板"""
@@ -1857,10 +1175,21 @@ class NetworkManagementToolV5:
         )
         if save_path:
             try:
+                since = time.time() - self.monitor_trend_window
                 with open(save_path, 'w', newline='', encoding='utf-8-sig') as f:
-                    writer = csv.DictWriter(f, fieldnames=["设备名", "IP", "厂商", "状态", "CPU", "内存", "温度", "电源", "风扇"])
+                    writer = csv.DictWriter(f, fieldnames=["设备名", "IP", "厂商", "状态", "CPU", "内存", "温度", "电源", "风扇", "运行时间",
+                                                           "可用率", "状态变化次数", "平均延迟(ms)", "最大延迟(ms)", "采样次数"])
                     writer.writeheader()
-                    writer.writerows(self.monitor_results)
+                    for row in self.monitor_results:
+                        # 可用率与延迟统计来自监控历史，不需要重新扫描日志
+                        summary = self.monitor_history.summary(row.get('IP'), since=since)
+                        writer.writerow(dict(row, **{
+                            "可用率": '' if summary['availability'] is None else f"{summary['availability']:.1f}%",
+                            "状态变化次数": summary['changes'],
+                            "平均延迟(ms)": '' if summary['avg_rtt'] is None else f"{summary['avg_rtt']:.1f}",
+                            "最大延迟(ms)": '' if summary['max_rtt'] is None else f"{summary['max_rtt']:.1f}",
+                            "采样次数": summary['samples']
+                        }))
                 self.root.after(0, lambda: messagebox.showinfo("导出成功", f"监控日志已导出到: {save_path}"))
             except Exception as e:
                 self.root.after(0, lambda: messagebox.showerror("导出失败", f"导出监控日志失败: {e}"))
@@ -2310,7 +1639,25 @@ class NetworkManagementToolV6(NetworkManagementToolV5):
         super().__init__(root)
         self.root.title("网络管理工具V6")
 
+# 启动耗时测量（bench_startup.py）：环境变量为文件路径时，首个窗口绘制完成后写入时间戳并退出
+STARTUP_PROBE_ENV = 'NETTOOL_STARTUP_PROBE'
+
+
+def _report_first_paint(root, path):
+    root.update_idletasks()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'{time.time():.6f}')
+    root.destroy()
+
+
 if __name__ == '__main__':
+    # 打包为 exe 后解析进程池需要
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = NetworkManagementToolV6(root)
+    probe_path = os.environ.get(STARTUP_PROBE_ENV)
+    if probe_path:
+        root.after(0, _report_first_paint, root, probe_path)
     root.mainloop()
+    if app.index_writer is not None:
+        app.index_writer.close()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监控调度模块 - monitor_scheduler.py
+持续监控时按设备各自的探测间隔调度（heapq 按下一次探测时间排序）：
+首次探测失败、状态刚变化或近期反复变化（抖动）的设备按最短间隔探测；
+持续在线的设备间隔逐步加倍直到上限，持续离线的设备从最短间隔起同样逐步加倍（上限较低，恢复后能较快发现），
+整段网络长期不可达时不会一直按最短间隔重复探测；每次间隔加入随机抖动，探测在时间上均匀分散，
+不会整批设备同时到期。
+"""
+
+import heapq
+import random
+import time
+from collections import deque
+
+# 刚失败/状态变化/抖动设备的探测间隔（秒）
+DEFAULT_MIN_INTERVAL = 5
+# 首次在线及恢复稳定后的探测间隔（秒）
+DEFAULT_BASE_INTERVAL = 30
+# 持续在线设备的探测间隔上限（秒）
+DEFAULT_MAX_INTERVAL = 300
+# 持续离线设备的探测间隔上限（秒）
+DEFAULT_MAX_DOWN_INTERVAL = 120
+# 间隔随机抖动比例：实际间隔在 interval × (1 ± jitter) 内均匀分布
+DEFAULT_JITTER = 0.5
+# 最近 FLAP_WINDOW 次探测中状态变化达到 FLAP_CHANGES 次即视为抖动
+FLAP_WINDOW = 10
+FLAP_CHANGES = 2
+
+
+class MonitorScheduler:
+    """
+    设备探测调度器
+    用法:
+        scheduler = MonitorScheduler(len(targets))
+        while monitoring:
+            for idx in scheduler.due(time.time()):
+                scheduler.record(idx, probe(targets[idx]), time.time())
+            time.sleep(scheduler.next_due() - time.time())
+    """
+
+    def __init__(self, count, min_interval=DEFAULT_MIN_INTERVAL, base_interval=DEFAULT_BASE_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, backoff=2.0, jitter=DEFAULT_JITTER, start=None, rng=None,
+                 max_down_interval=DEFAULT_MAX_DOWN_INTERVAL):
+        self.min_interval = min_interval
+        self.base_interval = max(base_interval, min_interval)
+        self.max_interval = max(max_interval, self.base_interval)
+        self.max_down_interval = min(max(max_down_interval, min_interval), self.max_interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        start = time.time() if start is None else start
+        self._interval = [0.0] * count
+        self._last = [None] * count  # 上一次探测结果，None 表示尚未探测
+        self._changes = [deque(maxlen=FLAP_WINDOW) for _ in range(count)]
+        self._next = [start] * count
+        self._heap = [(start, idx) for idx in range(count)]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._next)
+
+    def due(self, now):
+        """取出所有到期的设备序号（同一设备只返回一次，取出后需调用 record）"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, idx = heapq.heappop(self._heap)
+            if when == self._next[idx]:
+                due.append(idx)
+                self._next[idx] = None
+        return due
+
+    def next_due(self):
+        """最近一次到期时间，没有待探测设备时返回 None"""
+        while self._heap and self._heap[0][0] != self._next[self._heap[0][1]]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def is_flapping(self, idx):
+        return sum(self._changes[idx]) >= FLAP_CHANGES
+
+    def interval(self, idx):
+        """当前探测间隔（不含抖动）"""
+        return self._interval[idx]
+
+    def record(self, idx, ok, now):
+        """记录探测结果并安排下一次探测，返回本次安排的间隔（秒）"""
+        last = self._last[idx]
+        changed = last is not None and ok != last
+        self._changes[idx].append(changed)
+        self._last[idx] = ok
+        if changed or self.is_flapping(idx) or (not ok and last is None):
+            interval = self.min_interval
+        elif not ok:
+            # 持续离线：从最短间隔起逐步退避
+            interval = min(self.max_down_interval, self._interval[idx] * self.backoff)
+        elif last is None or self._interval[idx] < self.base_interval:
+            interval = self.base_interval
+        else:
+            interval = min(self.max_interval, self._interval[idx] * self.backoff)
+        self._interval[idx] = interval
+        delay = interval * (1 + self._rng.uniform(-self.jitter, self.jitter))
+        return self.schedule(idx, now + delay) - now
+
+    def schedule(self, idx, when):
+        """指定设备的下一次探测时间（覆盖之前的安排）"""
+        self._next[idx] = when
+        heapq.heappush(self._heap, (when, idx))
+        return when
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出清理模块 - output_cleaner.py
+去除ANSI控制符、退格符、分页符遗留与Y/N应答残留，同时保留原始缩进和列对齐。
+clean_output() 一次性清理完整文本；StreamCleaner 按数据块增量清理，两者共用同一实现，
+内存中只保留未完成的最后一行。
+
+性能要点：用一个合并的触发正则单次扫描全文，只有命中的行（含分页符、'/'、连续空白、
+空行或孤立的 Y/N 应答）才逐行处理，其余普通行原样整段复制；
+控制符清理仅在文本中出现对应字符时执行。
+"""
+
+import re
+
+ANSI_REGEX = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+ANSI_SIMPLE_REGEX = re.compile(r'\x1b\[[0-9]*[A-Za-z]')
+BACKSPACE_REGEX = re.compile(r'(\x08)+')
+# 锐捷设备的 "BS" 退格残留，\s* 可能跨越多行
+BS_REGEX = re.compile(r'(\bBS\b\s*)+')
+
+PAGINATION_PATTERNS = [
+    r'---- More ----', r'--More--', r'<--- More --->', r'--- More ---',
+    r'Press any key to continue', r'Press SPACE to continue', r'Press Q to quit',
+    r'More:', r'\(more\)', r'\[more\]', r'---- more ----', r'--more--',
+    r'\(MORE\)', r'\[MORE\]', r'-- More --', r'---More---'
+]
+# 按列表顺序逐个查找（与旧实现的优先级一致），只在行内出现分页符时使用
+PAGINATION_REGEXES = [re.compile(p, re.IGNORECASE) for p in PAGINATION_PATTERNS]
+# 任一分页符：search 用于快速判断，fullmatch 用于判断整行是否为纯分页符
+ANY_PAGINATION_REGEX = re.compile('(?:' + '|'.join(PAGINATION_PATTERNS) + ')', re.IGNORECASE)
+
+YN_RESIDUE_REGEXES = [
+    (re.compile(r'\(y/n\):\s*[nNyY]\s*$', re.IGNORECASE), '(y/n):'),
+    (re.compile(r'\(yes/no\):\s*(yes|no)\s*$', re.IGNORECASE), '(yes/no):'),
+    (re.compile(r'\[Y/N\]:\s*[nNyY]\s*$', re.IGNORECASE), '[Y/N]:'),
+]
+YN_ANSWERS = ('n', 'N', 'y', 'Y')
+# 行首8个以上空格后为命令/任务/表格内容时，判定为分页符遗留的异常缩进
+ABNORMAL_LEADING_REGEX = re.compile(r'[A-Z0-9]+\s+\d+%|[A-Z][A-Z0-9_]+\s+|\w+\s+\w+\s+:')
+WIDE_SPACES_REGEX = re.compile(r' {8,}')
+
+# 需要逐行处理的行：含分页符关键字(more/press)、'/'(Y/N残留)、连续8个空白，
+# 以及空行和只有一个 Y/N 字符的行；其余行清理前后完全相同
+LINE_TRIGGER_REGEX = re.compile(r'more|press|/|[^\S\n]{8}|^[^\S\n]*(?:[nNyY][^\S\n]*)?$',
+                                re.IGNORECASE | re.MULTILINE)
+
+
+def last_line(text):
+    """返回文本最后一个非空行（通常为设备提示符），文本为空时返回空字符串"""
+    text = (text or '').strip()
+    return text.splitlines()[-1].strip() if text else ''
+
+
+def clean_line(line):
+    """
+    清理单行：返回清理后的行；纯分页符行与孤立的Y/N应答返回 None（整行丢弃）
+    """
+    cleaned_line = line
+    if ANY_PAGINATION_REGEX.search(line):
+        if ANY_PAGINATION_REGEX.fullmatch(line.strip()):
+            return None
+        for regex in PAGINATION_REGEXES:
+            match = regex.search(cleaned_line)
+            if match:
+                before_clean = cleaned_line[:match.start()].rstrip()
+                after_clean = cleaned_line[match.end():].lstrip()
+                if after_clean.strip():
+                    cleaned_line = after_clean
+                elif before_clean.strip():
+                    cleaned_line = before_clean
+                else:
+                    cleaned_line = ''
+                break
+    # 清理Y/N自动应答残留（仅清理明显的孤立应答字符）
+    if cleaned_line.strip() in YN_ANSWERS:
+        return None
+    if '/' in cleaned_line:
+        for regex, replacement in YN_RESIDUE_REGEXES:
+            cleaned_line = regex.sub(replacement, cleaned_line)
+    # V13增强：智能处理行首异常空格（分页符遗留）
+    content_after_spaces = cleaned_line.lstrip()
+    if len(cleaned_line) - len(content_after_spaces) >= 8 and ABNORMAL_LEADING_REGEX.match(content_after_spaces):
+        cleaned_line = content_after_spaces
+    # V13增强：行内异常空格压缩（分页符遗留），超过8个连续空格压缩为2个空格
+    if '        ' in cleaned_line:
+        cleaned_line = WIDE_SPACES_REGEX.sub('  ', cleaned_line)
+    # 只清理行尾过多的空格（超过10个连续空格的行尾）
+    stripped = cleaned_line.rstrip()
+    if len(cleaned_line) - len(stripped) >= 10:
+        cleaned_line = stripped
+    return cleaned_line
+
+
+def clean_output(text):
+    """
+    V13增强版输出清理函数，智能处理分页符遗留的异常空格，同时保留原始缩进和列对齐
+    """
+    if not text:
+        return text
+    out = []
+    cleaner = StreamCleaner(out.append)
+    cleaner.feed(text)
+    cleaner.close()
+    return ''.join(out)
+
+
+class StreamCleaner:
+    """
+    增量清理器：feed() 接收原始数据块，清理后的文本通过 write(str) 输出，close() 结束
+    prompt 不为空时，在首个非空行不是该提示符时把提示符补在开头
+    只在收到完整行后处理；"BS" 残留可能延续到后续数据时暂缓处理，保证与整体清理结果一致
+    """
+
+    def __init__(self, write, prompt=''):
+        self._write = write
+        self._prompt = prompt or None
+        self._raw = []  # 尚未收到换行符的原始数据块
+        self._pending = ''  # 已去除控制符、可能与后续数据连成 BS 残留的部分
+        self._line = ''  # 已统一换行符、尚未收到行尾的部分
+        self._out = []  # 待写出的清理结果（决定是否补提示符之前一直暂存）
+        self._consecutive_empty = 0
+        self._started = False  # 是否已输出过行（之后的行前需要补换行符）
+        self._last_char = ''
+
+    def feed(self, data):
+        if not data:
+            return
+        cut = data.rfind('\n') + 1
+        if cut == 0:
+            self._raw.append(data)
+            return
+        self._raw.append(data[:cut])
+        text = ''.join(self._raw)
+        self._raw = [data[cut:]] if cut < len(data) else []
+        self._process(text, final=False)
+
+    def close(self):
+        """处理剩余数据，补齐结尾换行符"""
+        text = ''.join(self._raw)
+        self._raw = []
+        self._process(text, final=True)
+        if self._last_char and self._last_char != '\n':
+            self._out.append('\n')
+            self._last_char = '\n'
+        if self._prompt is not None:
+            # 输出中没有任何非空行
+            self._release(True)
+        self._flush()
+
+    def _process(self, text, final):
+        # ANSI 序列与退格符不跨行，完整行上处理即可
+        if '\x1b' in text:
+            text = ANSI_REGEX.sub('', text)
+            text = ANSI_SIMPLE_REGEX.sub('', text)
+        if '\x08' in text:
+            text = BACKSPACE_REGEX.sub('', text)
+        text = self._pending + text
+        self._pending = ''
+        if 'BS' in text:
+            if not final:
+                # 最后一段 BS 残留若延伸到末尾，可能与后续数据连成一段，留到下次处理
+                last_match = None
+                for last_match in BS_REGEX.finditer(text):
+                    pass
+                if last_match is not None and last_match.end() == len(text):
+                    text, self._pending = text[:last_match.start()], text[last_match.start():]
+            text = BS_REGEX.sub('', text)
+        if '\r' in text:
+            # 末尾的 \r 可能与后续的 \n 组成一个换行
+            if not final and text.endswith('\r'):
+                text, self._pending = text[:-1], '\r' + self._pending
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        text = self._line + text
+        if final:
+            self._line = ''
+        else:
+            cut = text.rfind('\n')
+            if cut < 0:
+                self._line = text
+                return
+            text, self._line = text[:cut], text[cut + 1:]
+        self._process_lines(text)
+        self._flush()
+
+    def _process_lines(self, text):
+        """处理以换行符分隔的若干完整行（text.split('\n') 的每一项为一行）"""
+        pos = 0
+        for match in LINE_TRIGGER_REGEX.finditer(text):
+            start = match.start()
+            if start < pos:
+                # 与已处理的行同属一行
+                continue
+            line_start = text.rfind('\n', 0, start) + 1
+            line_end = text.find('\n', start)
+            if line_end < 0:
+                line_end = len(text)
+            if line_start > pos:
+                # 两个待处理行之间的普通行原样输出
+                self._add_plain_lines(text[pos:line_start - 1])
+            self._add_line(text[line_start:line_end])
+            pos = line_end + 1
+        if pos <= len(text):
+            self._add_plain_lines(text[pos:])
+
+    def _add_plain_lines(self, lines):
+        """输出一段不需要清理的普通行（均为非空行）"""
+        self._consecutive_empty = 0
+        if self._started:
+            self._out.append('\n')
+        self._started = True
+        self._out.append(lines)
+        self._last_char = lines[-1]
+        if self._prompt is not None:
+            self._check_prompt(lines)
+
+    def _add_line(self, line):
+        cleaned_line = clean_line(line)
+        if cleaned_line is None:
+            return
+        if not cleaned_line.strip():
+            self._consecutive_empty += 1
+            if self._consecutive_empty > 2:
+                return
+        else:
+            self._consecutive_empty = 0
+        if self._started:
+            self._out.append('\n')
+            self._last_char = '\n'
+        self._started = True
+        if cleaned_line:
+            self._out.append(cleaned_line)
+            self._last_char = cleaned_line[-1]
+            if self._prompt is not None and cleaned_line.strip():
+                self._check_prompt(cleaned_line)
+
+    def _check_prompt(self, text):
+        """首个非空行已确定：不是提示符时在输出开头补上提示符"""
+        first_line = text.split('\n', 1)[0].lstrip().splitlines()[0].strip()
+        self._release(first_line != self._prompt)
+
+    def _release(self, add_prompt):
+        if add_prompt:
+            self._out.insert(0, f"{self._prompt}\n")
+        self._prompt = None
+
+    def _flush(self):
+        if self._prompt is None and self._out:
+            out, self._out = self._out, []
+            self._write(''.join(out))
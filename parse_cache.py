@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志解析缓存 - parse_cache.py
+持久保存每个巡检日志的解析结果（extract_device_status.parse_log_file 返回的设备状态），
+以 (日志路径, 文件大小, 修改时间, 解析模块版本) 为键：再次解析同一目录时只有新增或修改过的日志需要重新解析，
+其余日志只需一次 stat 与一次批量查询。解析模块版本为 extract_device_status.py 内容的摘要，修改解析规则后缓存自动失效。
+归档内的条目（<归档.zip>/<条目名>）按归档文件的大小与修改时间判断是否变化。
+    cache = open_cache()
+    rows = log_parse_pool.parse_logs(module_path, log_files, cache=cache)
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+
+import run_index
+from log_archive import split_entry_path
+
+CACHE_FILENAME = 'parse_cache.db'
+# 单条查询最多包含的路径数（SQLite 参数个数上限）
+QUERY_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_cache (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    row TEXT NOT NULL
+);
+"""
+
+_versions = {}
+
+
+def default_path():
+    """默认缓存路径：与运行历史索引同在程序所在目录"""
+    return os.path.join(os.path.dirname(run_index.default_path()), CACHE_FILENAME)
+
+
+def parser_version(module_path):
+    """解析模块版本：文件内容的 SHA-256（按路径与修改时间缓存，文件不变时不重复计算）"""
+    key = (os.path.abspath(module_path), os.path.getmtime(module_path))
+    if key not in _versions:
+        with open(module_path, 'rb') as f:
+            _versions[key] = hashlib.sha256(f.read()).hexdigest()[:16]
+    return _versions[key]
+
+
+def file_signature(path):
+    """日志文件的 (大小, 修改时间纳秒)；归档内条目取归档文件的；文件不存在时返回 None"""
+    archive, entry = split_entry_path(path)
+    try:
+        st = os.stat(archive or path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class ParseCache:
+    """
+    日志解析缓存（SQLite，单线程使用）
+    lookup 返回缓存命中的设备状态与需要重新解析的日志；store 保存新的解析结果
+    hits / misses 统计本实例的命中与未命中次数
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(self.path)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def lookup(self, log_files, version):
+        """
+        返回 (命中的设备状态列表, {需要解析的日志路径: 文件签名})，命中结果的 '时间' 更新为本次解析时间
+        """
+        signatures = {path: file_signature(path) for path in log_files}
+        paths = list(signatures)
+        cached = {}
+        for i in range(0, len(paths), QUERY_BATCH):
+            batch = paths[i:i + QUERY_BATCH]
+            cached.update((row[0], row[1:]) for row in self._conn.execute(
+                f'SELECT path, size, mtime, version, row FROM parse_cache WHERE path IN ({",".join("?" * len(batch))})',
+                batch))
+        now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        hits = []
+        misses = {}
+        for path, signature in signatures.items():
+            entry = cached.get(path)
+            if signature is not None and entry is not None and entry[:3] == (signature[0], signature[1], version):
+                row = json.loads(entry[3])
+                row['时间'] = now
+                hits.append(row)
+            else:
+                misses[path] = signature
+        self.hits += len(hits)
+        self.misses += len(misses)
+        return hits, misses
+
+    def store(self, entries, version):
+        """保存解析结果，entries 为 [(日志路径, 文件签名, 设备状态), ...]（签名为 None 的跳过）"""
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO parse_cache (path, size, mtime, version, row) VALUES (?, ?, ?, ?, ?)',
+                [(path, signature[0], signature[1], version, json.dumps(row, ensure_ascii=False))
+                 for path, signature, row in entries if signature is not None])
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute('DELETE FROM parse_cache')
+
+
+def open_cache(path=None):
+    """打开解析缓存；无法打开（如程序目录只读）时返回 None，调用方不使用缓存"""
+    try:
+        return ParseCache(path)
+    except (sqlite3.Error, OSError) as e:
+        print(f"打开解析缓存失败，不使用缓存: {e}")
+        return None
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度消息泵 - progress_pump.py
+工作线程调用 post(通道, 文本) 把进度事件放入队列（线程安全，不直接操作界面）；
+界面线程按固定帧率取出队列中的全部事件，同一通道的文本合并为一次插入，
+文本框只保留最近 max_lines 行，高并发时界面刷新开销与事件数量无关。
+"""
+
+from queue import Empty
+
+# 刷新间隔（毫秒）
+FRAME_MS = 100
+# 每帧最多处理的事件数，超出的留到下一帧
+MAX_EVENTS_PER_FRAME = 10000
+# 文本框保留的最大行数
+MAX_LINES = 2000
+
+
+class TextSink:
+    """
+    把合并后的文本追加到 tk.Text（只读文本框），超过 max_lines 时删除最旧的行
+    get_widget() 返回当前的文本框（切换模块后文本框会重建），不存在时返回 None
+    """
+
+    def __init__(self, get_widget, max_lines=MAX_LINES):
+        self.get_widget = get_widget
+        self.max_lines = max_lines
+
+    def write(self, text):
+        widget = self.get_widget()
+        if widget is None or not widget.winfo_exists():
+            return
+        # 用户向上翻看时不自动滚动到底部
+        at_bottom = widget.yview()[1] >= 0.999
+        widget.config(state="normal")
+        widget.insert("end", text)
+        lines = int(widget.index("end-1c").split('.')[0])
+        if lines > self.max_lines:
+            widget.delete("1.0", f"{lines - self.max_lines + 1}.0")
+        widget.config(state="disabled")
+        if at_bottom:
+            widget.see("end")
+
+
+class ProgressPump:
+    """
+    进度消息泵
+    用法:
+        pump = ProgressPump(root, queue)
+        pump.register('backup', TextSink(lambda: self.backup_progress_text))
+        pump.start()
+        pump.post('backup', "[1/10] 开始备份...\\n")    # 任意线程
+    """
+
+    def __init__(self, root, queue, frame_ms=FRAME_MS, max_events_per_frame=MAX_EVENTS_PER_FRAME):
+        self.root = root
+        self.queue = queue
+        self.frame_ms = frame_ms
+        self.max_events_per_frame = max_events_per_frame
+        self._sinks = {}
+        self._running = False
+
+    def register(self, channel, sink):
+        self._sinks[channel] = sink
+
+    def post(self, channel, text):
+        """投递一条进度文本（线程安全）"""
+        self.queue.put((channel, text))
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.frame_ms, self._run_frame)
+
+    def stop(self):
+        self._running = False
+
+    def _run_frame(self):
+        if not self._running:
+            return
+        try:
+            self.drain()
+        finally:
+            self.root.after(self.frame_ms, self._run_frame)
+
+    def drain(self):
+        """取出队列中的事件，按通道合并后写出，返回处理的事件数"""
+        batches = {}
+        count = 0
+        while count < self.max_events_per_frame:
+            try:
+                channel, text = self.queue.get_nowait()
+            except Empty:
+                break
+            batches.setdefault(channel, []).append(text)
+            count += 1
+        for channel, texts in batches.items():
+            sink = self._sinks.get(channel)
+            if sink is None:
+                continue
+            try:
+                sink.write(''.join(texts))
+            except Exception as e:
+                print(f"进度显示更新失败({channel}): {e}")
+        return count
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提示符匹配模块 - prompt_matcher.py
+每个厂商在导入时预编译一个合并正则（分页符 + Y/N 确认提示），
+读取循环中只扫描输出末尾的一小段，不再对每一行逐个比较分页符列表
+"""
+
+import re
+
+# 扫描结果
+PAGER = 'pager'
+YN = 'yn'
+PROMPT = 'prompt'
+
+# 只检查输出末尾的这么多字符（分页符、确认提示、提示符都出现在末尾）
+TAIL_SIZE = 512
+
+# 提示符结尾字符
+PROMPT_CHARS = ('#', '>', '$')
+
+# 未取得设备提示符时，用于排除配置行的关键字
+CONFIG_KEYWORDS = ['interface', 'vlan', 'route', 'access', 'trunk']
+
+# 各厂商分页符
+VENDOR_PAGINATION_INDICATORS = {
+    # 华为设备分页符
+    'huawei': [
+        '---- More ----', '--More--', '<--- More --->', '--- More ---',
+        'Press any key to continue', 'Press SPACE to continue', 'Press Q to quit',
+        '按任意键继续', '按空格键继续', '按Q键退出',
+    ],
+    # 华三设备分页符
+    'h3c': [
+        '---- More ----', '--More--', 'More:', '(more)', '[more]',
+        '---- more ----', '--more--', '(MORE)', '[MORE]', '-- More --', '---More---',
+    ],
+    # 思科设备分页符
+    'cisco': [
+        '--More--', 'Press any key to continue', 'Press SPACE for more',
+        '-- More --', '<spacebar> for more', 'q to quit',
+    ],
+    # 锐捷设备分页符
+    'ruijie': [
+        '---- More ----', '--More--', 'More...', '(More)', '[More]',
+        'Press any key to continue', 'Press SPACE to continue',
+    ],
+}
+
+# 其他厂商通用分页符（所有厂商都检测）
+COMMON_PAGINATION_INDICATORS = [
+    'Continue?', 'More (Press SPACE)', 'More (Press any key)',
+    '继续？', '更多(按空格键)', '更多(按任意键)'
+]
+
+# 全部分页符（厂商未知时使用）
+PAGINATION_INDICATORS = [p for ps in VENDOR_PAGINATION_INDICATORS.values() for p in ps] + COMMON_PAGINATION_INDICATORS
+
+# 登录阶段所有厂商的Y/N检测模式（通用匹配）
+LOGIN_YN_PATTERNS = [
+    # 华为设备常见登录Y/N提示
+    r'Change now\?\s*\[Y/N\][:：]\s*$',  # Change now? [Y/N]:
+    r'password needs to be changed.*\[Y/N\][:：]\s*$',  # password needs to be changed. Change now? [Y/N]:
+    r'Do you want to change.*\[Y/N\][:：]\s*$',  # Do you want to change the password? [Y/N]:
+    # 思科设备常见登录Y/N提示
+    r'Would you like to enter the initial configuration dialog\?\s*\[yes/no\][:：]\s*$',
+    r'Would you like to terminate autoinstall\?\s*\[yes\][:：]\s*$',
+    # 华三设备常见登录Y/N提示
+    r'Save\?\s*\[Y/N\][:：]\s*$',  # Save? [Y/N]:
+    r'Continue\?\s*\[Y/N\][:：]\s*$',  # Continue? [Y/N]:
+    # 锐捷设备常见登录Y/N提示
+    r'Enter the password\?\s*\[yes/no\][:：]\s*$',  # Enter the password? [yes/no]:
+    # 通用Y/N模式（登录阶段）
+    r'\w+\?\s*\[Y/N\][:：]\s*$',  # 任何问题? [Y/N]:
+    r'\w+\?\s*\[yes/no\][:：]\s*$',  # 任何问题? [yes/no]:
+]
+
+# 命令执行阶段的Y/N应答模式（严格匹配行尾的确认提示）
+COMMAND_YN_PATTERNS = [
+    r'\(y/n\)[:：]\s*$',  # (y/n):
+    r'\(yes/no\)[:：]\s*$',  # (yes/no):
+    r'\[[yY]/[nN]\][:：]\s*$',  # [y/n]:
+    r'\([yY]/[nN]\)[:：]\s*$',  # (y/n):
+    r'\[[yY][eE][sS]/[nN][oO]\][:：]\s*$',  # [yes/no]:
+    r'\([yY][eE][sS]/[nN][oO]\)[:：]\s*$',  # (yes/no):
+    r'continue\s*\?\s*\([yY]/[nN]\)[:：]\s*$',  # continue? (y/n):
+    r'sure\s*\?\s*\([yY]/[nN]\)[:：]\s*$',  # sure? (y/n):
+]
+
+
+class PromptMatcher:
+    """
+    预编译的末尾匹配器
+    scan() 对输出的最后一行依次判断：分页符 -> Y/N 确认提示 -> 设备提示符
+    """
+
+    def __init__(self, pagers, yn_patterns, tail_size=TAIL_SIZE):
+        self.tail_size = tail_size
+        # 去重后按长度降序，保证较长的分页符优先匹配
+        pagers = sorted(set(p.strip() for p in pagers), key=len, reverse=True)
+        pager_alt = '|'.join(re.escape(p) for p in pagers) or '(?!)'
+        yn_alt = '|'.join(f'(?:{p})' for p in yn_patterns)
+        # 分页符必须独占最后一行（行首行尾只允许空白），避免误判配置内容
+        self._regex = re.compile(
+            rf'^[ \t\r]*(?P<pager>{pager_alt})[ \t\r]*$|(?P<yn>{yn_alt})',
+            re.IGNORECASE
+        )
+
+    def scan(self, text, prompt_regex=None, check_pager=True):
+        """
+        检查 text 的最后一行，返回 PAGER / YN / PROMPT 或 None
+        prompt_regex 为登录后学到的设备提示符；为 None 时使用保守的启发式判断
+        """
+        tail = text[-self.tail_size:].rstrip()
+        if not tail:
+            return None
+        last_line = tail[tail.rfind('\n') + 1:]
+        match = self._regex.search(last_line)
+        if match:
+            if match.group('yn') is not None:
+                return YN
+            if check_pager:
+                return PAGER
+        last_line = last_line.strip()
+        if prompt_regex is not None:
+            return PROMPT if prompt_regex.match(last_line) else None
+        # 提示符通常较短，且不包含配置关键字
+        if (last_line.endswith(PROMPT_CHARS) and 1 < len(last_line) < 80 and
+                not any(keyword in last_line.lower() for keyword in CONFIG_KEYWORDS)):
+            return PROMPT
+        return None
+
+
+def get_matcher(vendor):
+    """返回厂商对应的预编译匹配器（vendor 为 huawei/h3c/cisco/ruijie，未知厂商使用全部分页符）"""
+    return MATCHERS.get(vendor, MATCHERS[''])
+
+
+# 导入时为每个厂商构建一次
+MATCHERS = {
+    vendor: PromptMatcher(pagers + COMMON_PAGINATION_INDICATORS, COMMAND_YN_PATTERNS)
+    for vendor, pagers in VENDOR_PAGINATION_INDICATORS.items()
+}
+MATCHERS[''] = PromptMatcher(PAGINATION_INDICATORS, COMMAND_YN_PATTERNS)
+
+# 登录阶段：只检测Y/N提示与提示符
+LOGIN_MATCHER = PromptMatcher([], LOGIN_YN_PATTERNS)
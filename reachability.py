@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可达性探测模块 - reachability.py
+基于 asyncio 的非阻塞 TCP 连接探测，在单个线程内同时探测数千个 ip:端口，
+同时进行中的连接数由 asyncio.Semaphore 限制；记录每个目标的建连耗时(RTT)。
+"""
+
+import asyncio
+import time
+
+# 默认同时进行中的连接数上限
+DEFAULT_MAX_IN_FLIGHT = 1000
+# 默认单个目标的连接超时（秒）
+DEFAULT_TIMEOUT = 3
+# 设备未填写端口时探测的端口（SSH）
+DEFAULT_PORT = 22
+
+
+def device_targets(devices):
+    """设备列表 -> [(ip, 端口), ...]，端口缺失或无法解析时使用 SSH 端口"""
+    targets = []
+    for dev in devices:
+        ip = dev.get('ip') or dev.get('IP')
+        try:
+            port = int(dev.get('port') or dev.get('端口') or DEFAULT_PORT)
+        except ValueError:
+            port = DEFAULT_PORT
+        targets.append((ip, port))
+    return targets
+
+
+async def probe(host, port, timeout=DEFAULT_TIMEOUT):
+    """探测单个目标，返回 (是否可达, RTT毫秒, 错误信息)"""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except asyncio.TimeoutError:
+        return False, None, '连接超时'
+    except (OSError, ValueError) as e:
+        return False, None, str(e) or e.__class__.__name__
+    rtt = (time.perf_counter() - start) * 1000
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True, rtt, ''
+
+
+async def _sweep(targets, timeout, max_in_flight, on_result):
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+    results = [None] * len(targets)
+
+    async def probe_target(idx, host, port):
+        async with semaphore:
+            if not host:
+                return idx, (False, None, '缺少IP地址')
+            return idx, await probe(host, port, timeout)
+
+    tasks = [probe_target(idx, host, port) for idx, (host, port) in enumerate(targets)]
+    for future in asyncio.as_completed(tasks):
+        idx, result = await future
+        results[idx] = result
+        if on_result:
+            on_result(idx, result)
+    return results
+
+
+def sweep(targets, timeout=DEFAULT_TIMEOUT, max_in_flight=DEFAULT_MAX_IN_FLIGHT, on_result=None):
+    """
+    并发探测 [(ip, 端口), ...]（阻塞直到全部完成，应在后台线程中调用）
+    on_result(序号, (是否可达, RTT毫秒, 错误信息)) 每个目标完成时回调
+    返回与 targets 顺序一致的结果列表
+    """
+    return asyncio.run(_sweep(targets, timeout, max_in_flight, on_result))
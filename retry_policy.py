@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连接重试策略模块 - retry_policy.py
+连接/登录阶段的失败按类别（超时、认证失败、连接中断）归类，
+批量任务结束时只对可重试的失败设备按指数退避 + 随机抖动再次尝试。
+"""
+
+import asyncio
+import random
+import socket
+import sys
+
+# 失败类别
+TIMEOUT = 'timeout'
+AUTH = 'auth'
+RESET = 'reset'
+OTHER = 'other'
+
+# 错误信息前缀，同时用于汇总日志展示与结果回传后的类别识别
+KIND_LABELS = {
+    TIMEOUT: '连接超时',
+    AUTH: '认证失败',
+    RESET: '连接中断',
+    OTHER: '连接失败',
+}
+
+# 各类别默认最多重试次数（仍受 max_retries 限制）
+DEFAULT_RETRIES_BY_KIND = {
+    TIMEOUT: 3,
+    RESET: 3,
+    AUTH: 1,  # 认证失败多为账号问题，只重试一次（应对AAA服务器偶发超时），避免账号被锁定
+    OTHER: 0,
+}
+
+
+class ConnectError(Exception):
+    """连接或登录阶段失败，kind 为失败类别"""
+
+    def __init__(self, kind, message):
+        super().__init__(f"{KIND_LABELS[kind]}: {message}")
+        self.kind = kind
+
+
+class CommandTimeout(ConnectError):
+    """
+    命令未出现结束提示符（通道关闭或超时），输出不完整：
+    通道已关闭归为连接中断，否则归为超时，与连接阶段的失败一样按类别重试
+    """
+
+    def __init__(self, cmd, closed, timeout=None):
+        if closed:
+            message = f"命令 {cmd} 未执行完成，通道已关闭"
+        else:
+            message = f"命令 {cmd} 未执行完成，等待设备提示符超时（总超时 {timeout} 秒）"
+        super().__init__(RESET if closed else TIMEOUT, message)
+        self.cmd = cmd
+
+
+def classify_error(exc):
+    """将连接/登录阶段的异常归类为 TIMEOUT / AUTH / RESET / OTHER"""
+    if isinstance(exc, ConnectError):
+        return exc.kind
+    if isinstance(exc, (socket.timeout, TimeoutError, asyncio.TimeoutError)):
+        return TIMEOUT
+    # SSH 库在首次连接时才导入；尚未导入的库不可能抛出异常，无需为归类而导入
+    paramiko = sys.modules.get('paramiko')
+    asyncssh = sys.modules.get('asyncssh')
+    if paramiko is not None and isinstance(exc, paramiko.AuthenticationException):
+        return AUTH
+    if asyncssh is not None:
+        if isinstance(exc, asyncssh.PermissionDenied):
+            return AUTH
+        if isinstance(exc, (asyncssh.ConnectionLost, asyncssh.DisconnectError)):
+            return RESET
+    if isinstance(exc, (ConnectionError, EOFError)):
+        return RESET
+    if paramiko is None:
+        return OTHER
+    if isinstance(exc, paramiko.ssh_exception.NoValidConnectionsError):
+        return RESET
+    if isinstance(exc, paramiko.SSHException):
+        message = str(exc).lower()
+        # 如 "Error reading SSH protocol banner"：对端在握手中途断开
+        if 'banner' in message or 'reset' in message or 'closed' in message:
+            return RESET
+        if 'timed out' in message or 'timeout' in message:
+            return TIMEOUT
+    return OTHER
+
+
+def failure_kind(errmsg):
+    """根据结果中的错误信息前缀识别失败类别；非连接阶段的失败返回 None"""
+    for kind, label in KIND_LABELS.items():
+        if errmsg and errmsg.startswith(label + ':'):
+            return kind
+    return None
+
+
+class RetryPolicy:
+    """
+    指数退避重试策略
+    第 n 次重试前等待 min(max_delay, base_delay * 2^(n-1))，再叠加 ±jitter 比例的随机抖动，
+    避免大量设备在同一时刻重新连接
+    """
+
+    def __init__(self, max_retries=3, base_delay=2.0, max_delay=60.0, jitter=0.3, retries_by_kind=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retries_by_kind = dict(DEFAULT_RETRIES_BY_KIND)
+        if retries_by_kind:
+            self.retries_by_kind.update(retries_by_kind)
+
+    def retries_for(self, kind):
+        """该类别允许的最多重试次数"""
+        return min(self.max_retries, self.retries_by_kind.get(kind, 0))
+
+    def should_retry(self, errmsg, attempt):
+        """第 attempt 次尝试（从1开始）失败后是否还应重试"""
+        kind = failure_kind(errmsg)
+        return kind is not None and attempt <= self.retries_for(kind)
+
+    def backoff(self, attempt):
+        """第 attempt 次重试前的等待秒数（带抖动）"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行历史索引 - run_index.py
+内嵌 SQLite 数据库，记录设备清单、每次备份/巡检任务、每台设备的结果（成功/失败、耗时、日志路径、配置摘要）
+与解析出的健康指标（CPU、内存、温度、电源、风扇、运行时间）。
+批量任务中设备完成时结果交给后台写入线程（IndexWriter），解析健康指标后分批提交（WAL 模式，界面可同时读取），
+“设备最近一次成功备份”“最近的失败”“全部设备的最新状态”均走索引查询，不需要遍历任务目录或重新解析日志。
+    索引 = RunIndex(default_path())
+    run_id = 索引.start_run('backup', 任务目录, 设备数)
+    索引.record_result(run_id, device, {'ok': True, 'logfile': ..., 'duration': 3.2})
+    写入线程 = IndexWriter(索引, run_id); 写入线程.put(device, entry); 写入线程.close()   # 批量任务中使用
+    索引.finish_run(run_id, 成功数, 失败数, 总耗时)
+    索引.latest_status()            # 每台设备最近的备份/巡检结果与健康指标
+"""
+
+import datetime
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+DB_FILENAME = 'network_tools_history.db'
+SCHEMA_VERSION = 1
+# 其他连接正在写入时等待的秒数
+BUSY_TIMEOUT = 10
+# 后台写入线程每批最多提交的结果数，以及收到第一条结果后最多等待凑批的秒数
+WRITE_BATCH_SIZE = 100
+WRITE_BATCH_WAIT = 0.5
+
+# 健康指标列 -> 解析结果（extract_device_status.parse_log_file）中的字段
+HEALTH_FIELDS = [
+    ('vendor', '厂商'),
+    ('cpu', 'CPU使用率'),
+    ('mem', '内存使用率'),
+    ('temp', '温度状态'),
+    ('power', '电源状态'),
+    ('fan', '风扇状态'),
+    ('uptime', '运行时间'),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    ip TEXT NOT NULL DEFAULT '',
+    vendor TEXT,
+    port TEXT,
+    source TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    UNIQUE (name, ip)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    folder TEXT,
+    started TEXT NOT NULL,
+    finished TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    fail INTEGER NOT NULL DEFAULT 0,
+    duration REAL,
+    engine TEXT,
+    concurrency INTEGER,
+    summary_log TEXT,
+    manifest TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_kind_started ON runs (kind, started);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    device_id INTEGER NOT NULL REFERENCES devices (id),
+    kind TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    finished TEXT NOT NULL,
+    duration REAL,
+    logfile TEXT,
+    blob TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS results_device ON results (device_id, kind, finished);
+CREATE INDEX IF NOT EXISTS results_failed ON results (ok, finished);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE TABLE IF NOT EXISTS health (
+    id INTEGER PRIMARY KEY,
+    device_id INTEGER NOT NULL REFERENCES devices (id),
+    result_id INTEGER REFERENCES results (id),
+    parsed TEXT NOT NULL,
+    logfile TEXT,
+    vendor TEXT,
+    cpu TEXT,
+    mem TEXT,
+    temp TEXT,
+    power TEXT,
+    fan TEXT,
+    uptime TEXT
+);
+CREATE INDEX IF NOT EXISTS health_device ON health (device_id, parsed);
+"""
+
+# 每台设备最近一次备份、巡检结果与健康指标（子查询均按 (device_id, ...) 索引倒序取第一条）
+LATEST_STATUS_SQL = """
+SELECT d.name, d.ip, d.vendor, d.source, d.last_seen,
+       b.finished AS backup_time, b.ok AS backup_ok, b.logfile AS backup_file, b.error AS backup_error,
+       (SELECT finished FROM results WHERE device_id = d.id AND kind = 'backup' AND ok = 1
+        ORDER BY finished DESC, id DESC LIMIT 1) AS backup_last_ok,
+       i.finished AS inspect_time, i.ok AS inspect_ok, i.logfile AS inspect_file, i.error AS inspect_error,
+       h.parsed AS health_time, h.cpu, h.mem, h.temp, h.power, h.fan, h.uptime
+FROM devices d
+LEFT JOIN results b ON b.id = (SELECT id FROM results WHERE device_id = d.id AND kind = 'backup'
+                               ORDER BY finished DESC, id DESC LIMIT 1)
+LEFT JOIN results i ON i.id = (SELECT id FROM results WHERE device_id = d.id AND kind = 'inspect'
+                               ORDER BY finished DESC, id DESC LIMIT 1)
+LEFT JOIN health h ON h.id = (SELECT id FROM health WHERE device_id = d.id ORDER BY parsed DESC, id DESC LIMIT 1)
+ORDER BY d.name, d.ip
+"""
+
+RESULT_COLUMNS = """
+r.id, r.run_id, r.kind, r.ok, r.finished, r.duration, r.logfile, r.blob, r.error, d.name, d.ip, ru.folder
+"""
+
+
+def default_path():
+    """默认数据库路径：程序所在目录（打包为 exe 时为 exe 所在目录）"""
+    if getattr(sys, 'frozen', False):
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, DB_FILENAME)
+
+
+def device_name(device):
+    return (device.get('name') or device.get('设备名') or device.get('设备名称') or device.get('主机名')
+            or 'unknown').strip()
+
+
+def device_ip(device):
+    return (device.get('ip') or device.get('IP') or '').strip()
+
+
+def _now():
+    return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class RunIndex:
+    """
+    运行历史索引（多线程安全：一个连接 + 锁，每次写入立即提交）
+    设备以 (设备名, IP) 区分；只有设备名时（如按日志文件名解析的健康指标）归到最近出现的同名设备
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _device_id(self, device, source=None, now=None):
+        """查找或登记设备，返回设备 id（调用方持有锁并在事务中）"""
+        now = now or _now()
+        name = device_name(device)
+        ip = device_ip(device)
+        vendor = (device.get('vendor') or device.get('厂商') or '').strip() or None
+        port = str(device.get('port') or '').strip() or None
+        cur = self._conn.cursor()
+        if ip:
+            row = cur.execute('SELECT id FROM devices WHERE name = ? AND ip = ?', (name, ip)).fetchone()
+        else:
+            row = cur.execute('SELECT id FROM devices WHERE name = ? ORDER BY last_seen DESC, id DESC LIMIT 1',
+                              (name,)).fetchone()
+        if row is None:
+            cur.execute('INSERT INTO devices (name, ip, vendor, port, source, first_seen, last_seen) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)', (name, ip, vendor, port, source, now, now))
+            return cur.lastrowid
+        cur.execute('UPDATE devices SET vendor = COALESCE(?, vendor), port = COALESCE(?, port), '
+                    'source = COALESCE(?, source), last_seen = ? WHERE id = ?',
+                    (vendor, port, source, now, row['id']))
+        return row['id']
+
+    def upsert_devices(self, devices, source=None):
+        """登记设备清单（导入 CSV 时调用），source 为来源（monitor/backup/inspect/manage），返回设备数"""
+        now = _now()
+        with self._lock, self._conn:
+            for device in devices:
+                self._device_id(device, source, now)
+        return len(devices)
+
+    def start_run(self, kind, folder, total, engine=None, concurrency=None):
+        """登记一次批量任务，返回任务 id"""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                'INSERT INTO runs (kind, folder, started, total, engine, concurrency) VALUES (?, ?, ?, ?, ?, ?)',
+                (kind, folder, _now(), total, engine, concurrency))
+            return cur.lastrowid
+
+    def record_result(self, run_id, device, entry, health=None):
+        """
+        记录一台设备的结果（立即提交），返回结果 id
+        entry 为 jobs.run_job 的单台结果 {'ok', 'logfile', 'error', 'duration', 'blob'}；
+        health 为该设备日志的解析结果（可选）
+        """
+        return self.record_results(run_id, [(device, entry, health)])[0]
+
+    def record_results(self, run_id, rows):
+        """记录多台设备的结果（一个事务提交），rows 为 [(device, entry, health), ...]，返回结果 id 列表"""
+        now = _now()
+        ids = []
+        with self._lock, self._conn:
+            kind = self._conn.execute('SELECT kind FROM runs WHERE id = ?', (run_id,)).fetchone()['kind']
+            for device, entry, health in rows:
+                device_id = self._device_id(device, now=now)
+                cur = self._conn.execute(
+                    'INSERT INTO results (run_id, device_id, kind, ok, finished, duration, logfile, blob, error) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (run_id, device_id, kind, 1 if entry.get('ok') else 0, now, entry.get('duration'),
+                     entry.get('logfile') or None, entry.get('blob'), entry.get('error') or None))
+                ids.append(cur.lastrowid)
+                if health:
+                    self._insert_health(device_id, health, entry.get('logfile'), cur.lastrowid, now)
+        return ids
+
+    def _insert_health(self, device_id, row, logfile, result_id, now):
+        values = [row.get(key) for column, key in HEALTH_FIELDS]
+        self._conn.execute(
+            f'INSERT INTO health (device_id, result_id, parsed, logfile, {", ".join(c for c, k in HEALTH_FIELDS)}) '
+            f'VALUES (?, ?, ?, ?, {", ".join("?" * len(HEALTH_FIELDS))})',
+            [device_id, result_id, now, logfile] + values)
+
+    def record_health(self, rows, source=None):
+        """
+        记录解析出的健康指标，rows 为 extract_device_status.parse_log_file 的结果列表
+        （按 '设备名' 归到设备；行中有 'logfile' 时一并记录）
+        """
+        now = _now()
+        with self._lock, self._conn:
+            for row in rows:
+                device_id = self._device_id({'name': row.get('设备名')}, source, now)
+                self._insert_health(device_id, row, row.get('logfile'), None, now)
+        return len(rows)
+
+    def finish_run(self, run_id, success, fail, duration, summary_log=None, manifest=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE runs SET finished = ?, success = ?, fail = ?, duration = ?, summary_log = ?, manifest = ? '
+                'WHERE id = ?', (_now(), success, fail, round(duration, 3), summary_log, manifest, run_id))
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def recent_runs(self, kind=None, limit=20):
+        """最近的批量任务（新的在前）"""
+        where = 'WHERE kind = ?' if kind else ''
+        params = (kind, limit) if kind else (limit,)
+        return self._query(f'SELECT * FROM runs {where} ORDER BY started DESC, id DESC LIMIT ?', params)
+
+    def device_history(self, name, kind=None, limit=50):
+        """一台设备（按设备名，含不同 IP）的历史结果（新的在前）"""
+        sql = (f'SELECT {RESULT_COLUMNS} FROM devices d JOIN results r ON r.device_id = d.id '
+               f'JOIN runs ru ON ru.id = r.run_id WHERE d.name = ?')
+        params = [name]
+        if kind:
+            sql += ' AND r.kind = ?'
+            params.append(kind)
+        return self._query(sql + ' ORDER BY r.finished DESC, r.id DESC LIMIT ?', params + [limit])
+
+    def last_success(self, name, kind='backup'):
+        """设备最近一次成功的结果，没有时返回 None"""
+        rows = self._query(f'SELECT {RESULT_COLUMNS} FROM devices d JOIN results r ON r.device_id = d.id '
+                           f'JOIN runs ru ON ru.id = r.run_id WHERE d.name = ? AND r.kind = ? AND r.ok = 1 '
+                           f'ORDER BY r.finished DESC, r.id DESC LIMIT 1', (name, kind))
+        return rows[0] if rows else None
+
+    def failures(self, kind=None, since=None, limit=200):
+        """最近的失败结果（新的在前），since 为 'YYYY-MM-DD HH:MM:SS' 起始时间"""
+        sql = (f'SELECT {RESULT_COLUMNS} FROM results r JOIN devices d ON d.id = r.device_id '
+               f'JOIN runs ru ON ru.id = r.run_id WHERE r.ok = 0')
+        params = []
+        if since:
+            sql += ' AND r.finished >= ?'
+            params.append(since)
+        if kind:
+            sql += ' AND r.kind = ?'
+            params.append(kind)
+        return self._query(sql + ' ORDER BY r.finished DESC, r.id DESC LIMIT ?', params + [limit])
+
+    def latest_status(self):
+        """全部设备的最新状态：最近一次备份/巡检结果、最近一次成功备份时间与最新健康指标"""
+        return self._query(LATEST_STATUS_SQL)
+
+
+class IndexWriter:
+    """
+    批量任务的后台写入线程：设备完成时只把结果放入队列，由本线程解析健康指标（parse(日志路径)）并分批提交，
+    设备完成回调（异步引擎中在事件循环线程）不做 CPU 解析与同步数据库写入
+    解析或写入失败时回调 on_error(文本)，不影响设备与任务的结果
+    index 为 RunIndex，或索引文件路径（由本线程打开，close 时关闭；界面导入设备时不在界面线程打开数据库）
+    用法:
+        writer = IndexWriter(index, run_id, parse=module.parse_log_file, on_error=print)
+        writer.put(device, entry)
+        writer.put_devices(devices, 'backup')    # 登记导入的设备清单
+        writer.close()      # 写完队列中剩余的结果
+    """
+
+    def __init__(self, index, run_id=None, parse=None, on_error=None, batch_size=WRITE_BATCH_SIZE,
+                 batch_wait=WRITE_BATCH_WAIT):
+        self._path = None if isinstance(index, RunIndex) else index
+        self.index = None if self._path is not None else index
+        self.run_id = run_id
+        self.parse = parse
+        self.on_error = on_error
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.written = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='run-index-writer', daemon=True)
+        self._thread.start()
+
+    def put(self, device, entry):
+        self._queue.put(('result', device, entry))
+
+    def put_devices(self, devices, source=None):
+        self._queue.put(('devices', list(devices), source))
+
+    def close(self):
+        """等待队列中的结果全部写入后结束线程（可重复调用）"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._path is not None and self.index is not None:
+            self.index.close()
+            self.index = None
+
+    def _open(self):
+        """按路径打开的索引在本线程首次写入时打开，打开失败时本批不写入"""
+        if self.index is None:
+            try:
+                self.index = RunIndex(self._path)
+            except Exception as e:
+                self._error(f"打开运行历史索引失败: {e}")
+        return self.index
+
+    def _error(self, text):
+        if self.on_error is not None:
+            self.on_error(text)
+
+    def _run(self):
+        done = False
+        while not done:
+            item = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.batch_wait
+            # 收到第一条结果后在 batch_wait 内继续凑批，队列中已有的结果直接并入
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            else:
+                done = True
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        index = self._open()
+        if index is None:
+            return
+        rows = []
+        for kind, first, second in batch:
+            if kind == 'devices':
+                devices, source = first, second
+                try:
+                    index.upsert_devices(devices, source)
+                except Exception as e:
+                    self._error(f"登记设备失败（{len(devices)} 台设备未记录）: {e}")
+                continue
+            device, entry = first, second
+            health = None
+            if self.parse is not None and entry.get('ok') and entry.get('logfile'):
+                try:
+                    health = self.parse(entry['logfile'])
+                except Exception as e:
+                    self._error(f"解析 {entry['logfile']} 失败: {e}")
+            rows.append((device, entry, health))
+        if not rows:
+            return
+        try:
+            index.record_results(self.run_id, rows)
+        except Exception as e:
+            self._error(f"写入运行历史索引失败（{len(rows)} 台设备的结果未记录）: {e}")
+        else:
+            self.written += len(rows)
+            self.batches += 1
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步采集引擎测试脚本 - 使用进程内 asyncssh 服务器模拟华为设备验证 async_engine
+未安装 asyncssh 时跳过
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import time
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import async_engine
+import jobs
+from device_log import DeviceLogWriter
+from timing import read_records
+
+PROMPT = '<HUAWEI>'
+
+
+class FakeDevice:
+    """模拟华为设备：登录后输出提示符，按行回应命令，并统计同时在线的会话数"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    async def handle(self, process):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            process.stdout.write(f"Info: The max number of VTY users is 5.\r\n{PROMPT}")
+            while True:
+                line = await process.stdin.readline()
+                if not line:
+                    break
+                cmd = line.strip()
+                await asyncio.sleep(0.05)
+                if cmd == 'display current-configuration':
+                    body = '#\r\nsysname HUAWEI\r\n#\r\ninterface Vlanif1\r\n#\r\nreturn'
+                else:
+                    body = ''
+                process.stdout.write(f"{cmd}\r\n{body}\r\n{PROMPT}" if body else f"{cmd}\r\n{PROMPT}")
+        except Exception:
+            pass
+        finally:
+            with self.lock:
+                self.active -= 1
+            process.exit(0)
+
+
+async def start_server(device):
+    import asyncssh
+
+    class Server(asyncssh.SSHServer):
+        def begin_auth(self, username):
+            return True
+
+        def password_auth_supported(self):
+            return True
+
+        def validate_password(self, username, password):
+            return True
+
+    server = await asyncssh.create_server(
+        Server, '127.0.0.1', 0, server_host_keys=[asyncssh.generate_private_key('ssh-ed25519')],
+        process_factory=device.handle, encoding='utf-8')
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_run_batch():
+    """测试批量采集：并发上限、日志回调与结果顺序"""
+    print("测试异步批量采集...")
+    if not async_engine.is_available():
+        print("未安装 asyncssh，跳过")
+        return
+    device = FakeDevice()
+    loop = asyncio.new_event_loop()
+    server, port = loop.run_until_complete(start_server(device))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        devices = [{'name': f'sw{i}', 'ip': '127.0.0.1', 'port': port, 'vendor': 'huawei',
+                    'username': 'admin', 'password': 'x'} for i in range(12)]
+        folder = tempfile.mkdtemp()
+        done = []
+        results = async_engine.run_batch(
+            devices, lambda dev: ['display current-configuration'],
+            lambda dev: DeviceLogWriter(os.path.join(folder, dev['name'] + '.log')), max_concurrent=4,
+            on_done=lambda idx, dev, result: done.append(idx))
+        assert all(r[0] for r in results), results
+        assert [os.path.basename(r[1]) for r in results] == [f'sw{i}.log' for i in range(12)]
+        assert sorted(done) == list(range(12))
+        assert device.peak <= 4, device.peak
+        with open(results[0][1], encoding='utf-8') as f:
+            log = f.read()
+        assert log.startswith(f"{PROMPT}\ndisplay current-configuration\n")
+        assert 'interface Vlanif1' in log and log.rstrip().endswith(PROMPT)
+        print("✅ 异步批量采集测试通过")
+    finally:
+        server.close()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+
+def test_connect_failure():
+    """测试连接失败时返回失败结果而不是抛出异常"""
+    print("测试连接失败处理...")
+    if not async_engine.is_available():
+        print("未安装 asyncssh，跳过")
+        return
+    results = async_engine.run_batch(
+        [{'name': 'down', 'ip': '127.0.0.1', 'port': 1}], lambda dev: ['display version'],
+        lambda dev: None, connect_timeout=5)
+    ok, logfile, errmsg, duration = results[0]
+    assert not ok and errmsg
+    print("✅ 连接失败处理测试通过")
+
+
+def test_job_timing():
+    """测试批量备份的阶段耗时记录：异步引擎与线程池(paramiko)记录相同的阶段"""
+    print("测试阶段耗时记录...")
+    if not async_engine.is_available():
+        print("未安装 asyncssh，跳过")
+        return
+    device = FakeDevice()
+    loop = asyncio.new_event_loop()
+    server, port = loop.run_until_complete(start_server(device))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        devices = [{'name': f'sw{i}', 'ip': '127.0.0.1', 'port': port, 'vendor': 'huawei',
+                    'username': 'admin', 'password': 'x'} for i in range(2)]
+        for use_async in (True, False):
+            settings = jobs.JobSettings(use_async_engine=use_async, max_retries=0)
+            summary = jobs.run_job('backup', devices, tempfile.mkdtemp(), settings)
+            assert summary['success'] == 2, summary
+            records = read_records(summary['timing_log'])
+            assert sorted(r['device'] for r in records) == ['sw0', 'sw1']
+            for record in records:
+                assert record['ok'] and record['vendor'] == 'huawei' and record['attempt'] == 1
+                names = [entry['phase'] for entry in record['phases']]
+                assert names == ['tcp_connect', 'ssh_kex', 'ssh_auth', 'login', 'no_paging', 'command',
+                                 'disconnect'], names
+                assert all('seconds' in entry and 'incomplete' not in entry for entry in record['phases'])
+                command = record['phases'][5]
+                assert command['detail'] == 'display current-configuration'
+                assert command['chars'] > 0 and command['chunks'] > 0 and command['pages'] == 0
+                assert 0 <= command['write_seconds'] <= command['seconds']
+            with open(summary['summary_log'], encoding='utf-8') as f:
+                text = f.read()
+            assert '阶段耗时合计' in text and '[huawei] display current-configuration: 2 次' in text
+            assert '效率提升' not in text
+        # 等待模拟设备处理完客户端断开，避免停止事件循环时遗留未结束的会话任务
+        deadline = time.time() + 5
+        while device.active and time.time() < deadline:
+            time.sleep(0.05)
+        print("✅ 阶段耗时记录测试通过")
+    finally:
+        server.close()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+
+def test_job_settings_concurrency():
+    """测试异步引擎未设置会话上限时按并发设备数，设置后按上限；未启用时始终按并发设备数"""
+    print("测试采集引擎并发数...")
+    # 默认使用线程池，并发数为 max_concurrent_devices
+    settings = jobs.JobSettings()
+    assert not settings.use_async() and settings.concurrency() == 5
+    settings = jobs.JobSettings(max_concurrent_devices=4, use_async_engine=True, async_max_concurrent=None)
+    assert settings.concurrency() == 4
+    settings.async_max_concurrent = 20
+    assert settings.concurrency() == (20 if async_engine.is_available() else 4)
+    settings.use_async_engine = False
+    assert settings.concurrency() == 4 and settings.engine_name() == "线程池"
+    print("✅ 采集引擎并发数测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("异步采集引擎 - 功能测试")
+    print("=" * 50)
+
+    if not async_engine.is_available():
+        print("未安装 asyncssh，跳过测试")
+        return True
+
+    tests = [
+        test_run_batch,
+        test_connect_failure,
+        test_job_timing,
+        test_job_settings_concurrency
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置库测试脚本 - 验证按规范化内容去重保存（忽略易变行）、清单记录，
+以及经由模拟设备的两次备份中第二次只写入发生变化的配置
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import async_engine
+import jobs
+from backup_store import STORE_DIRNAME, ConfigStore, config_digest
+from device_simulator import SimulatedDevice
+
+CONFIG = "!\nhostname SW1\n!\ninterface GigabitEthernet0/1\n description uplink\n!\nend\n"
+
+
+def write_config(store, name, text):
+    with store.log_writer({'name': name}) as writer:
+        writer.start_command(0, 'show running-config', 'SW1#')
+        writer.feed(text)
+        writer.end_command()
+    return writer
+
+
+def test_dedup():
+    """测试内容相同（仅易变行、行尾空白不同）的配置只保存一份"""
+    print("测试配置去重...")
+    store = ConfigStore(os.path.join(tempfile.mkdtemp(), STORE_DIRNAME))
+    first = write_config(store, 'SW1', "! Last configuration change at 10:00:00 UTC Mon Jul 1 2025\n" + CONFIG)
+    second = write_config(store, 'SW1', "! Last configuration change at 03:00:00 UTC Wed Jul 3 2025\n"
+                          + CONFIG.replace('uplink', 'uplink   ').replace('\n', '\r\n'))
+    third = write_config(store, 'SW1', CONFIG.replace('uplink', 'to-core'))
+    assert first.new and not second.new and third.new
+    assert first.digest == second.digest != third.digest
+    assert first.path == second.path and os.path.isfile(first.path)
+    assert store.written == 2 and store.reused == 1
+    with open(first.path, encoding='utf-8') as f:
+        assert config_digest(f) == first.digest
+    assert 'description uplink' in store.read(first.digest)
+    assert store.digest_of(third.path) == third.digest and store.digest_of('SW1.log') is None
+    # 会话中途失败：不完整的配置不写入配置库
+    try:
+        with store.log_writer({'name': 'SW2'}) as writer:
+            writer.start_command(0, 'show running-config', 'SW2#')
+            writer.feed("!\nhostname SW2\n")
+            raise ConnectionResetError('session closed')
+    except ConnectionResetError:
+        pass
+    assert writer.path == '' and writer.digest is None
+    assert store.written == 2 and store.reused == 1
+    print("✅ 配置去重测试通过")
+
+
+def test_backup_runs():
+    """测试两次备份：设备间相同的配置共用一份，第二次只写入发生变化的配置，清单按设备记录摘要"""
+    print("测试配置库备份...")
+    output = tempfile.mkdtemp()
+    settings = jobs.JobSettings(use_async_engine=False, max_retries=0, config_store=True)
+    with SimulatedDevice('huawei', config_lines=60) as huawei, SimulatedDevice('cisco', config_lines=60) as cisco:
+        devices = [huawei.device('HW1'), huawei.device('HW2'), cisco.device('CS1')]
+        first = jobs.run_job('backup', devices, output, settings)
+        assert first['success'] == 3 and first['store'] == os.path.join(output, STORE_DIRNAME)
+        cisco.config = cisco.config.replace('description to-access-1\n', 'description to-core\n')
+        second = jobs.run_job('backup', devices, output, settings)
+    assert second['success'] == 3
+    assert [name for name in os.listdir(second['folder']) if name.endswith('.log')] == \
+        [os.path.basename(second['summary_log'])]
+    store = ConfigStore(first['store'])
+    assert second['manifest'] in store.manifests()
+    blobs = {entry['name']: entry['blob'] for entry in store.load_manifest(second['manifest'])['devices']}
+    old = {entry['name']: entry['blob'] for entry in first['devices']}
+    assert blobs['HW1'] == blobs['HW2'] == old['HW1'] and blobs['CS1'] != old['CS1']
+    assert 'description to-core' in store.read(blobs['CS1'])
+    with open(second['summary_log'], encoding='utf-8') as f:
+        assert '新写入 1 份配置' in f.read()
+    print("✅ 配置库备份测试通过")
+
+
+def test_truncated_backup():
+    """测试会话在配置输出中途断开：设备记为失败，不完整的配置不写入配置库"""
+    print("测试中途断开的配置库备份...")
+    output = tempfile.mkdtemp()
+    with SimulatedDevice('huawei', config_lines=200, drop_after_lines=30) as sim:
+        devices = [sim.device('HW1'), sim.device('HW2')]
+        for use_async in ([False, True] if async_engine.is_available() else [False]):
+            settings = jobs.JobSettings(use_async_engine=use_async, max_retries=0, config_store=True)
+            summary = jobs.run_job('backup', devices, output, settings)
+            assert summary['success'] == 0 and summary['fail'] == 2, summary['devices']
+            assert all('通道已关闭' in d['error'] and not d['blob'] for d in summary['devices']), summary['devices']
+            store = ConfigStore(summary['store'])
+            assert not any(files for root, dirs, files in os.walk(os.path.join(summary['store'], 'objects')))
+            assert not any(e['ok'] for e in store.load_manifest(summary['manifest'])['devices'])
+    print("✅ 中途断开的配置库备份测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("配置库 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_dedup,
+        test_backup_runs,
+        test_truncated_backup
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通道读取测试脚本 - 使用本地 socketpair 模拟设备验证 ChannelReader
+"""
+
+import sys
+import os
+import socket
+import threading
+import time
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from channel_reader import ChannelReader, build_prompt_regex
+
+
+def test_prompt_regex():
+    """测试提示符正则"""
+    print("测试提示符正则...")
+    regex = build_prompt_regex('<HUAWEI>')
+    assert regex.match('<HUAWEI>')
+    assert regex.match('[HUAWEI]')
+    assert not regex.match('#')
+    assert not regex.match(' description to HUAWEI')
+    regex = build_prompt_regex('Switch#')
+    assert regex.match('Switch(config)#')
+    assert build_prompt_regex('#') is None
+    print("✅ 提示符正则测试通过")
+
+
+def test_read_until_prompt():
+    """测试出现提示符后立即返回，不等待静默超时"""
+    print("测试提示符检测...")
+    a, b = socket.socketpair()
+    try:
+        reader = ChannelReader(a)
+
+        def device():
+            b.recv(1024)
+            b.sendall('display version\r\nVRP (R) software\r\n'.encode())
+            time.sleep(0.05)
+            b.sendall('华为\r\n<HUAWEI>'.encode())
+
+        threading.Thread(target=device, daemon=True).start()
+        reader.send('display version\n')
+        start = time.time()
+        output, prompt_seen = reader.read_until(lambda d: d.rstrip().endswith('<HUAWEI>'), idle_timeout=5,
+                                                total_timeout=10)
+        assert time.time() - start < 1.0
+        assert prompt_seen and 'VRP' in output and output.rstrip().endswith('<HUAWEI>')
+        print("✅ 提示符检测测试通过")
+    finally:
+        a.close()
+        b.close()
+
+
+def test_read_until_idle_and_reply():
+    """测试Y/N应答与静默超时"""
+    print("测试Y/N应答与静默超时...")
+    a, b = socket.socketpair()
+    try:
+        reader = ChannelReader(a)
+        b.sendall(b'Change now? [Y/N]:')
+
+        def on_chunk(data):
+            if '[Y/N]' in data:
+                reader.send(b'n\n')
+            return False
+
+        # 静默超时结束：没有出现提示符
+        assert reader.read_until(on_chunk, idle_timeout=0.2, total_timeout=5) == ('Change now? [Y/N]:', False)
+        assert b.recv(16) == b'n\n'
+        print("✅ Y/N应答与静默超时测试通过")
+    finally:
+        a.close()
+        b.close()
+
+
+def main():
+    """运行所有测试"""
+    print("通道读取 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_prompt_regex,
+        test_read_until_prompt,
+        test_read_until_idle_and_reply
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
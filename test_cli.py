@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行入口测试脚本 - 验证设备CSV读取（GBK 兼容）、无界面备份/监控/解析的 JSON 汇总与退出码，以及 SSH 库的延迟导入
+"""
+
+import sys
+import os
+import io
+import json
+import socket
+import subprocess
+import tempfile
+import contextlib
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+import jobs
+
+CSV_HEADER = "name,ip,username,password,port,vendor,description,cmd1,cmd2\n"
+
+
+def closed_port():
+    """返回一个本机未监听的端口"""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def write_csv(text, encoding='utf-8'):
+    path = os.path.join(tempfile.mkdtemp(), 'devices.csv')
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(text)
+    return path
+
+
+def run_cli(argv):
+    """运行命令行，返回 (退出码, JSON 汇总)"""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        code = cli.main(argv + ['-q'])
+    text = out.getvalue()
+    return code, json.loads(text) if text else None
+
+
+def test_load_devices():
+    """测试设备CSV读取：GBK 编码回退与巡检命令列"""
+    print("测试设备CSV读取...")
+    path = write_csv(CSV_HEADER + "核心交换机,10.0.0.1,admin,pw,22,huawei,核心,display cpu-usage, display fan \n",
+                     encoding='gbk')
+    devices = jobs.open_csv_compat(path)
+    assert devices[0]['name'] == '核心交换机'
+    devices = jobs.load_inspect_devices(path)
+    assert devices[0]['cmds'] == ['display cpu-usage', 'display fan']
+    assert jobs.inspect_commands(devices[0]) == ['display cpu-usage', 'display fan']
+    assert jobs.backup_commands(devices[0]) == ['display current-configuration']
+    print("✅ 设备CSV读取测试通过")
+
+
+def test_backup_failures():
+    """测试无界面备份：连接失败的设备计入失败，写出汇总日志，退出码为 1"""
+    print("测试无界面备份...")
+    port = closed_port()
+    path = write_csv(CSV_HEADER + f"SW1,127.0.0.1,admin,pw,{port},huawei,,,\n"
+                     f"SW2,127.0.0.1,admin,pw,{port},cisco,,,\n")
+    output = tempfile.mkdtemp()
+    code, summary = run_cli(['backup', path, '-o', output, '--retries', '0', '--timeout', '2'])
+    assert code == cli.EXIT_FAILED
+    assert summary['total'] == 2 and summary['fail'] == 2 and summary['success'] == 0
+    # 默认使用线程池；异步引擎与其会话上限需要显式指定
+    assert summary['engine'] == '线程池' and summary['concurrency'] == 5
+    settings = cli._job_settings(cli.build_parser().parse_args(['inspect', path, '--async', '-c', '20']))
+    assert settings.use_async_engine and settings.concurrency() == 20
+    settings = cli._job_settings(cli.build_parser().parse_args(['inspect', path, '--async', '--async-limit', '500']))
+    assert settings.async_max_concurrent == 500 and settings.max_concurrent_devices == 5
+    assert sorted(d['name'] for d in summary['devices']) == ['SW1', 'SW2']
+    with open(summary['summary_log'], encoding='utf-8') as f:
+        text = f.read()
+    assert '失败: 2 台' in text and text.count('[FAILED]') == 2
+    print("✅ 无界面备份测试通过")
+
+
+def test_monitor_and_usage():
+    """测试单次监控的在线统计与输入错误的退出码"""
+    print("测试无界面监控...")
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    open_port = server.getsockname()[1]
+    path = write_csv(CSV_HEADER + f"UP,127.0.0.1,a,b,{open_port},huawei,,,\nDOWN,127.0.0.2,a,b,{closed_port()},huawei,,,\n")
+    try:
+        code, summary = run_cli(['monitor', path, '--timeout', '1'])
+    finally:
+        server.close()
+    assert code == cli.EXIT_FAILED
+    assert summary['online'] == 1 and summary['offline'] == 1
+    assert [d['online'] for d in summary['devices']] == [True, False]
+    assert summary['devices'][0]['availability'] == 100.0
+
+    err = io.StringIO()
+    with contextlib.redirect_stderr(err):
+        code, summary = run_cli(['monitor', os.path.join(tempfile.mkdtemp(), 'missing.csv')])
+    assert code == cli.EXIT_USAGE and summary is None
+    print("✅ 无界面监控测试通过")
+
+
+def test_parse():
+    """测试日志目录解析与 CSV 输出"""
+    print("测试无界面日志解析...")
+    folder = tempfile.mkdtemp()
+    for n in range(3):
+        with open(os.path.join(folder, f'SW{n}_20250702_100000.log'), 'w', encoding='utf-8') as f:
+            f.write(f"<SW{n}>\ndisplay cpu-usage\nCPU usage in the last 5 seconds: {n + 10}%\n<SW{n}>\n")
+    csv_path = os.path.join(folder, 'status.csv')
+    json_path = os.path.join(folder, 'summary.json')
+    cache_path = os.path.join(tempfile.mkdtemp(), 'parse_cache.db')
+    code = cli.main(['parse', folder, '--csv', csv_path, '--workers', '1', '--json', json_path, '-q',
+                     '--cache', cache_path])
+    assert code == cli.EXIT_OK
+    with open(json_path, encoding='utf-8') as f:
+        summary = json.load(f)
+    assert summary['files'] == 3 and summary['parsed'] == 3 and summary['exit_code'] == 0
+    assert sorted(row['设备名'] for row in summary['devices']) == ['SW0', 'SW1', 'SW2']
+    with open(csv_path, encoding='utf-8-sig') as f:
+        assert len(f.read().strip().splitlines()) == 4
+    print("✅ 无界面日志解析测试通过")
+
+
+def test_deferred_imports():
+    """测试导入命令行与批量任务模块时不加载 SSH 库（首次连接时才加载）"""
+    print("测试延迟导入...")
+    code = ("import sys; sys.path.insert(0, %r); import cli, jobs; "
+            "print([m for m in ('paramiko', 'asyncssh', 'extract_device_status') if m in sys.modules])"
+            % os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]', output
+    print("✅ 延迟导入测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("命令行入口 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_load_devices,
+        test_backup_failures,
+        test_monitor_and_usage,
+        test_parse,
+        test_deferred_imports
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置变化比较测试脚本 - 验证忽略易变行的摘要比较、只对变化设备生成差异（含多进程），
+上一次备份的自动查找，以及备份结束时自动生成的变化报告与命令行 diff
+"""
+
+import sys
+import os
+import io
+import json
+import tempfile
+import contextlib
+import time
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+import config_diff
+import jobs
+from backup_store import ConfigStore
+from device_simulator import SimulatedDevice
+
+CONFIG = ("Building configuration...\n\n! Last configuration change at {stamp}\n!\nhostname {name}\n!\n"
+          "ntp clock-period {period}\n!\ninterface GigabitEthernet0/1\n description {desc}\n!\nend\n")
+
+
+def write_run(parent, run, devices, stamp, period):
+    folder = os.path.join(parent, run)
+    os.makedirs(folder)
+    for name, desc in devices.items():
+        with open(os.path.join(folder, f'{name}_{run[7:]}.log'), 'w', encoding='utf-8') as f:
+            f.write(CONFIG.format(stamp=stamp, name=name, period=period, desc=desc))
+    with open(os.path.join(folder, f'backup_summary_{run[7:]}.log'), 'w', encoding='utf-8') as f:
+        f.write("全部设备并发自动备份完成。\n")
+    return folder
+
+
+def test_diff_folders():
+    """测试普通备份目录：时间戳/ntp 行不算变化，只有描述变化的设备生成差异"""
+    print("测试备份目录比较...")
+    parent = tempfile.mkdtemp()
+    old_devices = {f'SW{i:03d}': 'uplink' for i in range(80)}
+    new_devices = dict(old_devices, SW007='to-core', SW999='uplink')
+    del new_devices['SW010']
+    old = write_run(parent, 'backup_20250701_020000', old_devices, '02:00:00 UTC Tue Jul 1 2025', 17179869)
+    new = write_run(parent, 'backup_20250702_020000', new_devices, '02:00:00 UTC Wed Jul 2 2025', 17179902)
+    os.makedirs(os.path.join(parent, 'backup_20250630_020000'))
+    assert config_diff.previous_run(new) == old and config_diff.previous_run(old) is None
+
+    for workers in (1, 2):
+        result = config_diff.diff_runs(new, old, workers=workers)
+        assert [name for name, added, removed, diff in result['changed']] == ['SW007']
+        assert len(result['unchanged']) == 78
+        assert result['added'] == ['SW999'] and result['removed'] == ['SW010']
+    name, added, removed, diff = result['changed'][0]
+    assert (added, removed) == (1, 1)
+    assert '+ description to-core' in diff and '- description uplink' in diff
+    assert not any('Last configuration change' in line or 'clock-period' in line for line in diff)
+
+    result, report = config_diff.compare_with_previous(new)
+    assert report == os.path.join(new, 'config_changes_backup_20250702_020000.txt')
+    with open(report, encoding='utf-8') as f:
+        text = f.read()
+    assert '变化 1 台，未变化 78 台，新增 1 台，缺失 1 台' in text
+    assert '[变化] SW007  +1 -1' in text and '[新增] SW999' in text and '[缺失] SW010' in text
+    assert result['errors'] == []
+
+    # 同名设备（如两台 IP 不同的设备同名）无法对应：不参与比较，记入 errors
+    with open(os.path.join(new, 'SW020_20250702_020000_2.log'), 'w', encoding='utf-8') as f:
+        f.write(CONFIG.format(stamp='-', name='SW020', period=1, desc='other'))
+    result = config_diff.diff_runs(new, old, workers=1)
+    assert result['errors'] == [('SW020', config_diff.DUPLICATE_ERROR)]
+    assert len(result['unchanged']) == 77 and 'SW020' not in result['removed']
+    assert '无法比较 1 台' in config_diff.summary_line(result)
+    print("✅ 备份目录比较测试通过")
+
+
+def test_backup_job_changes():
+    """测试配置库备份结束时自动与上一次比较，以及命令行 diff 比较两份清单"""
+    print("测试备份后的配置变化报告...")
+    output = tempfile.mkdtemp()
+    settings = jobs.JobSettings(use_async_engine=False, max_retries=0, config_store=True)
+    with SimulatedDevice('huawei', config_lines=60) as huawei, SimulatedDevice('cisco', config_lines=60) as cisco:
+        devices = [huawei.device('HW1'), cisco.device('CS1')]
+        first = jobs.run_job('backup', devices, output, settings)
+        cisco.config = cisco.config.replace(' switchport access vlan 20\n', ' switchport access vlan 99\n', 1)
+        time.sleep(1.1)  # 任务目录与清单按秒命名
+        second = jobs.run_job('backup', devices, output, settings)
+    assert first['changes'] is None
+    changes = second['changes']
+    assert [(c['name'], c['added'], c['removed']) for c in changes['changed']] == [('CS1', 1, 1)]
+    assert changes['unchanged'] == 1 and changes['old'] == first['manifest']
+    with open(second['summary_log'], encoding='utf-8') as f:
+        assert '配置变化: 变化 1 台，未变化 1 台' in f.read()
+    with open(changes['report'], encoding='utf-8') as f:
+        assert '+ switchport access vlan 99' in f.read()
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        code = cli.main(['diff', second['manifest'], first['manifest'], '--report',
+                         os.path.join(output, 'diff.txt'), '-q'])
+    summary = json.loads(out.getvalue())
+    assert code == cli.EXIT_OK and summary['changed'][0]['name'] == 'CS1'
+    assert os.path.isfile(os.path.join(output, 'diff.txt'))
+
+    # 配置库文件缺失：该设备无法比较，命令行返回失败
+    blob = [d['blob'] for d in second['devices'] if d['name'] == 'CS1'][0]
+    os.remove(ConfigStore(second['store']).blob_path(blob))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        code = cli.main(['diff', second['manifest'], first['manifest'], '--report',
+                         os.path.join(output, 'diff.txt'), '-q'])
+    summary = json.loads(out.getvalue())
+    assert code == cli.EXIT_FAILED and summary['changed'] == [] and summary['unchanged'] == 1
+    assert [e['name'] for e in summary['errors']] == ['CS1']
+    print("✅ 备份后的配置变化报告测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("配置变化比较 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_diff_folders,
+        test_backup_job_changes
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+设备会话测试脚本 - 使用本地 socketpair 模拟设备验证 DeviceSession 的命令读取，以及经由模拟设备的连接阶段计时
+"""
+
+import sys
+import os
+import socket
+import tempfile
+import threading
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from channel_reader import ChannelReader, build_prompt_regex
+from device_session import DeviceSession
+from device_log import DeviceLogWriter
+from device_simulator import SimulatedDevice
+from retry_policy import AUTH, ConnectError
+
+
+def make_session(sock, prompt='<HUAWEI>', vendor='huawei'):
+    """跳过SSH握手，直接在 socket 上构造已登录的会话"""
+    session = DeviceSession({'name': 'sw1', 'ip': '127.0.0.1', 'vendor': vendor})
+    session.reader = ChannelReader(sock)
+    session.login_output = f"Info: welcome\r\n{prompt}"
+    session.prompt = prompt
+    session.prompt_regex = build_prompt_regex(prompt)
+    return session
+
+
+def serve(sock, replies):
+    """模拟设备：每收到一次输入，依次发送 replies 中的下一段内容"""
+    def run():
+        for reply in replies:
+            if not sock.recv(1024):
+                return
+            sock.sendall(reply.encode('utf-8'))
+    threading.Thread(target=run, daemon=True).start()
+
+
+def test_run_with_pagination():
+    """测试分页符自动翻页和提示符结束检测"""
+    print("测试分页与提示符检测...")
+    a, b = socket.socketpair()
+    try:
+        session = make_session(a)
+        serve(b, [
+            "display current-configuration\r\n#\r\nsysname HUAWEI\r\n  ---- More ----",
+            "\r\n#\r\ninterface Vlanif1\r\n#\r\nreturn\r\n<HUAWEI>",
+        ])
+        output = session.run('display current-configuration')
+        assert 'interface Vlanif1' in output
+        assert output.rstrip().endswith('<HUAWEI>')
+        print("✅ 分页与提示符检测测试通过")
+    finally:
+        a.close()
+        b.close()
+
+
+def test_run_many_with_yn():
+    """测试命令阶段Y/N自动应答与多命令执行"""
+    print("测试Y/N应答与多命令执行...")
+    a, b = socket.socketpair()
+    try:
+        session = make_session(a, prompt='Switch#', vendor='cisco')
+        serve(b, [
+            "clear counters\r\nClear counters on all interfaces (y/n):",
+            "n\r\nSwitch#",
+            "show clock\r\n10:00:00 UTC\r\nSwitch#",
+        ])
+        results = session.run_many(['clear counters', 'show clock'])
+        assert [cmd for cmd, _ in results] == ['clear counters', 'show clock']
+        assert results[0][1].rstrip().endswith('Switch#')
+        assert '10:00:00' in results[1][1]
+        print("✅ Y/N应答与多命令执行测试通过")
+    finally:
+        a.close()
+        b.close()
+
+
+def test_setup_terminal():
+    """测试关闭分页命令：被拒绝时依次尝试下一条，被接受后停止分页检测"""
+    print("测试关闭终端分页...")
+    a, b = socket.socketpair()
+    try:
+        session = make_session(a, prompt='<SW>', vendor='')
+        serve(b, [
+            "screen-length 0 temporary\r\n              ^\r\n"
+            "% Unrecognized command found at '^' position.\r\n<SW>",
+            "screen-length disable\r\n<SW>",
+        ])
+        assert session.setup_terminal()
+        assert session.no_paging_command == 'screen-length disable'
+        assert session.paging_disabled
+        print("✅ 关闭终端分页测试通过")
+    finally:
+        a.close()
+        b.close()
+
+
+def test_stream_many():
+    """测试流式执行：输出直接写入日志，每条命令前补上一条命令结束时的提示符"""
+    print("测试流式写入日志...")
+    a, b = socket.socketpair()
+    try:
+        session = make_session(a)
+        serve(b, [
+            "display version\r\nVRP (R) software\r\n<HUAWEI>",
+            "display clock\r\n2025-07-02 10:00:00\r\n[HUAWEI]",
+        ])
+        path = os.path.join(tempfile.mkdtemp(), 'sw1.log')
+        with DeviceLogWriter(path) as writer:
+            assert session.stream_many(['display version', 'display clock'], writer) is None
+        with open(path, encoding='utf-8') as f:
+            log = f.read()
+        assert log == ("<HUAWEI>\ndisplay version\nVRP (R) software\n<HUAWEI>\n"
+                       "<HUAWEI>\ndisplay clock\n2025-07-02 10:00:00\n[HUAWEI]\n"), repr(log)
+        print("✅ 流式写入日志测试通过")
+    finally:
+        a.close()
+        b.close()
+
+
+def test_handshake_phases():
+    """测试连接阶段计时：TCP 建连、密钥交换、认证分别记录；密码错误归类为认证失败"""
+    print("测试握手计时...")
+    with SimulatedDevice('huawei', username='admin', password='secret') as sim:
+        with DeviceSession(sim.device('sw1')) as session:
+            assert session.prompt == '<SIM-HUAWEI>'
+        names = [entry['phase'] for entry in session.timing.phases]
+        assert names == ['tcp_connect', 'ssh_kex', 'ssh_auth', 'login', 'no_paging', 'disconnect'], names
+        session = DeviceSession(sim.device('sw2', password='wrong'))
+        try:
+            session.open()
+            assert False, '密码错误应连接失败'
+        except ConnectError as e:
+            assert e.kind == AUTH, e
+        assert session.transport is None
+        assert [entry['phase'] for entry in session.timing.phases][:3] == ['tcp_connect', 'ssh_kex', 'ssh_auth']
+    print("✅ 握手计时测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("设备会话 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_run_with_pagination,
+        test_run_many_with_yn,
+        test_setup_terminal,
+        test_stream_many,
+        test_handshake_phases
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -71,6 +71,68 @@ def test_main_syntax():
         print(f"❌ 主程序语法错误: {e}")
         return False
 
+def test_collect_status():
+    """测试设备状态并发采集（jobs.collect_status，使用假会话，不连接设备）"""
+    print("测试设备状态并发采集...")
+    import threading
+    import time
+    import jobs
+
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+
+    class FakeSession:
+        def __init__(self, dev, **kwargs):
+            self.dev = dev
+            assert kwargs == jobs.STATUS_SESSION_TIMEOUTS
+
+        def __enter__(self):
+            if self.dev['name'].startswith('down'):
+                raise OSError('connection refused')
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            return self
+
+        def __exit__(self, *exc):
+            with lock:
+                state['active'] -= 1
+            return False
+
+        def run_many(self, cmds):
+            time.sleep(0.02)
+            bad = self.dev['name'] == 'bad'
+            return [(cmd, 'FAN fail' if bad and 'fan' in cmd else 'CPU 5%') for cmd in cmds]
+
+    def fallback(output, vendor, status):
+        return {'cpu': '5%', 'fan': '异常' if 'FAN fail' in output else '正常'}
+
+    devices = [{'name': f'sw{i}', 'ip': f'10.0.0.{i}', 'vendor': 'huawei'} for i in range(6)]
+    devices.insert(2, {'name': 'down1', 'ip': '10.0.1.1', 'vendor': 'h3c'})
+    devices.insert(5, {'name': 'bad', 'ip': '10.0.1.2', 'vendor': 'cisco'})
+    seen = []
+    rows = jobs.collect_status(devices, jobs.JobSettings(max_concurrent_devices=2),
+                               on_row=lambda idx, row: seen.append(idx), fallback=fallback,
+                               session_factory=FakeSession)
+    # 每台设备回调一次，并发数不超过设置
+    assert sorted(seen) == list(range(len(devices)))
+    assert 1 <= state['peak'] <= 2
+    # 离线设备在前、有异常的在线设备其次，其余按设备顺序
+    assert [idx for idx, row in rows] == [2, 5, 0, 1, 3, 4, 6, 7]
+    down = rows[0][1]
+    assert down['状态'] == '离线' and down['IP'] == '10.0.1.1' and down['CPU'] == '5%'
+    assert rows[1][1]['风扇'] == '异常' and rows[1][1]['状态'] == '在线'
+    assert rows[2][1]['运行时间'] == 'N/A'
+
+    # 解析回调出错时该设备按离线行返回，不影响其他设备
+    def broken(output, vendor, status):
+        raise ValueError('broken parser')
+    rows = jobs.collect_status(devices[:2], jobs.JobSettings(max_concurrent_devices=1),
+                               fallback=broken, session_factory=FakeSession)
+    assert [(idx, row['设备名'], row['状态']) for idx, row in rows] == [(0, 'sw0', '离线'), (1, 'sw1', '离线')]
+    print("✅ 设备状态并发采集测试通过")
+    return True
+
 def main():
     """运行所有测试"""
     print("网络管理工具V6 - 功能测试")
@@ -79,7 +141,8 @@ def main():
     tests = [
         test_main_syntax,
         test_main_module_imports,
-        test_extract_module
+        test_extract_module,
+        test_collect_status
     ]
     
     passed = 0
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志归档测试脚本 - 验证设备日志压缩写入 zip 归档（每台设备一个条目）、同名条目处理，
+以及解析模块直接读取归档内的单个条目
+"""
+
+import sys
+import os
+import tempfile
+import zipfile
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import jobs
+from device_simulator import SimulatedDevice
+from extract_loader import get_extract_module
+from log_archive import LogArchive, read_entry, split_entry_path
+from log_parse_pool import parse_logs
+
+LOG = "<SW1>\ndisplay cpu-usage\nCPU usage in the last 5 seconds: 15%\n<SW1>\n"
+
+
+def test_archive_entries():
+    """测试归档条目：同名设备自动加序号，条目路径可直接读取与解析"""
+    print("测试日志归档条目...")
+    path = os.path.join(tempfile.mkdtemp(), 'inspect_logs.zip')
+    with LogArchive(path) as archive:
+        writers = []
+        for text in (LOG, LOG.replace('15%', '25%')):
+            with archive.log_writer({'name': 'SW1'}, headers=True) as writer:
+                writer.start_command(0, 'display cpu-usage', '<SW1>')
+                writer.feed(text)
+                writer.end_command()
+            writers.append(writer)
+    first, second = writers[0].path, writers[1].path
+    assert first != second and split_entry_path(second)[1].endswith('_2.log')
+    assert archive.entries == 2 and archive.raw_bytes > 0
+    with zipfile.ZipFile(path) as zf:
+        assert all(info.compress_type == zipfile.ZIP_DEFLATED for info in zf.infolist())
+    assert '===== 命令 1: display cpu-usage =====' in read_entry(first)
+    assert '25%' in read_entry(second) and '25%' not in read_entry(first)
+
+    module = get_extract_module()
+    assert sorted(module.find_log_files(os.path.dirname(path))) == sorted([first, second])
+    assert module.parse_log_file(second)['CPU使用率'] == '25%'
+    # 共用已打开的归档：解析模块与 read_entry 读取结果一致
+    archives = {}
+    try:
+        assert module.read_log_file(first, archives) == read_entry(first)
+        assert read_entry(second, archives) == module.read_log_file(second)
+        assert list(archives) == [path]
+    finally:
+        for zf in archives.values():
+            zf.close()
+    print("✅ 日志归档条目测试通过")
+
+
+def test_inspect_archive():
+    """测试巡检写入归档：任务目录只有一个归档，解析进程池直接解析归档中的条目"""
+    print("测试巡检日志归档...")
+    with SimulatedDevice('huawei', config_lines=400) as sim:
+        devices = [sim.device(f'SW{i}', cmds=['display cpu-usage', 'display current-configuration'])
+                   for i in range(3)]
+        settings = jobs.JobSettings(use_async_engine=False, max_retries=0, archive_logs=True)
+        summary = jobs.run_job('inspect', devices, tempfile.mkdtemp(), settings)
+    assert summary['success'] == 3 and summary['archive'].endswith('.zip')
+    assert sorted(os.listdir(summary['folder'])) == sorted(
+        os.path.basename(p) for p in (summary['archive'], summary['summary_log'], summary['timing_log']))
+    entries = [device['logfile'] for device in summary['devices']]
+    assert all(split_entry_path(entry)[0] == summary['archive'] for entry in entries)
+    raw = sum(len(read_entry(entry).encode('utf-8')) for entry in entries)
+    assert os.path.getsize(summary['archive']) * 4 < raw
+
+    module = get_extract_module()
+    log_files = [f for f in module.find_log_files(summary['folder']) if f.endswith('.log')]
+    assert sorted(entries) == sorted(f for f in log_files if f.startswith(summary['archive']))
+    rows = parse_logs(module.__file__, entries, max_workers=1)
+    assert sorted(row['设备名'] for row in rows) == ['SW0', 'SW1', 'SW2']
+    assert all(row['CPU使用率'] == '12%' for row in rows), rows
+    print("✅ 巡检日志归档测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("日志归档 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_archive_entries,
+        test_inspect_archive
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志并行解析测试脚本 - 验证解析模块缓存加载、多进程分组解析结果与单进程解析一致且按组逐批返回
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import log_parse_pool
+from log_parse_pool import parse_logs, make_chunks, map_chunks
+from extract_loader import load_extract_module, get_extract_module
+
+EXTRACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extract_device_status.py')
+
+HUAWEI_LOG = """
+===== 命令 1: display cpu-usage =====
+<SW{n}>
+CPU usage in the last 5 seconds: {cpu}%
+===== 命令 2: display memory-usage =====
+Memory usage: 45%
+<SW{n}>
+"""
+
+
+def make_logs(count):
+    folder = tempfile.mkdtemp()
+    for n in range(count):
+        with open(os.path.join(folder, f'SW{n}_20250702_100000.log'), 'w', encoding='utf-8') as f:
+            f.write(HUAWEI_LOG.format(n=n, cpu=n % 100))
+    return folder
+
+
+def strip_time(rows):
+    return sorted((tuple((k, v) for k, v in row.items() if k != '时间') for row in rows))
+
+
+def test_cached_loader():
+    """测试解析模块只加载一次，文件修改后重新加载"""
+    print("测试解析模块缓存加载...")
+    module = get_extract_module()
+    assert module is not None and hasattr(module, 'parse_log_chunk')
+    assert get_extract_module() is module
+
+    path = os.path.join(tempfile.mkdtemp(), 'extract_device_status.py')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("VERSION = 1\n")
+    first = get_extract_module(path)
+    assert first.VERSION == 1 and get_extract_module(path) is first
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("VERSION = 2\n")
+    mtime = os.path.getmtime(path) + 1
+    os.utime(path, (time.time(), mtime))
+    second = get_extract_module(path)
+    assert second is not first and second.VERSION == 2
+    # 恢复为程序目录下的解析模块
+    assert get_extract_module(module.__file__).__file__ == module.__file__
+    print("✅ 解析模块缓存加载测试通过")
+
+
+def test_chunks():
+    """测试工作单元切分"""
+    print("测试工作单元切分...")
+    items = list(range(100))
+    chunks = make_chunks(items, 2)
+    assert sum(chunks, []) == items
+    assert len(chunks) == 8 and max(len(c) for c in chunks) == 13
+    assert make_chunks(items, 1, chunk_size=40) == [items[:40], items[40:80], items[80:]]
+    assert make_chunks([], 4) == []
+    print("✅ 工作单元切分测试通过")
+
+
+def test_parallel_matches_serial():
+    """测试多进程解析与单进程解析结果一致，并逐组回调"""
+    print("测试多进程解析...")
+    folder = make_logs(20)
+    module = load_extract_module(EXTRACT_PATH)
+    log_files = module.find_log_files(folder)
+    expected = strip_time(module.parse_log_files(folder))
+    assert len(expected) == 20
+
+    batches = []
+    rows = parse_logs(EXTRACT_PATH, log_files, on_rows=batches.append, max_workers=2, chunk_size=3)
+    assert strip_time(rows) == expected
+    assert len(batches) == 7 and sum(len(b) for b in batches) == 20
+
+    batches = []
+    rows = parse_logs(EXTRACT_PATH, log_files, on_rows=batches.append, max_workers=1, chunk_size=8)
+    assert strip_time(rows) == expected
+    assert [len(b) for b in batches] == [8, 8, 4]
+
+    # 解析缓存使用的按路径对应结果与普通工作单元共用同一个解析循环
+    keyed = log_parse_pool.parse_chunk_keyed(module, log_files + [os.path.join(folder, 'missing.log')])
+    assert [path for path, row in keyed] == log_files
+    assert strip_time(row for path, row in keyed) == expected
+    print("✅ 多进程解析测试通过")
+
+
+def square_chunk(items):
+    return [(i, i * i) for i in items]
+
+
+def test_map_chunks():
+    """测试通用分块并行：结果完整，进程池不可用时回调 on_fallback 并在当前进程完成"""
+    print("测试通用分块并行...")
+    expected = [(i, i * i) for i in range(100)]
+    assert sorted(map_chunks(square_chunk, range(100), workers=2)) == expected
+    assert map_chunks(square_chunk, range(10), workers=2, min_parallel=64) == expected[:10]
+    assert map_chunks(square_chunk, [], workers=2) == []
+
+    class BrokenPool:
+        def __init__(self, *args, **kwargs):
+            raise OSError('no process pool')
+
+    errors = []
+    original = log_parse_pool.ProcessPoolExecutor
+    log_parse_pool.ProcessPoolExecutor = BrokenPool
+    try:
+        assert sorted(map_chunks(square_chunk, range(100), workers=2, on_fallback=errors.append)) == expected
+    finally:
+        log_parse_pool.ProcessPoolExecutor = original
+    assert [str(e) for e in errors] == ['no process pool']
+    print("✅ 通用分块并行测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("日志并行解析 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_cached_loader,
+        test_chunks,
+        test_parallel_matches_serial,
+        test_map_chunks
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监控调度测试脚本 - 验证自适应探测间隔、抖动识别与探测时间均匀分散
+"""
+
+import sys
+import os
+import random
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from monitor_scheduler import MonitorScheduler
+
+
+def test_adaptive_intervals():
+    """测试刚失败设备频繁探测、稳定在线/离线设备逐步退避、抖动设备保持最短间隔"""
+    print("测试自适应探测间隔...")
+    scheduler = MonitorScheduler(3, min_interval=5, base_interval=30, max_interval=120, jitter=0, start=0,
+                                 max_down_interval=60)
+    assert scheduler.due(0) == [0, 1, 2]
+    assert scheduler.due(0) == []
+
+    # 设备0稳定在线：30 -> 60 -> 120 -> 120
+    now = 0
+    for expected in [30, 60, 120, 120]:
+        assert scheduler.record(0, True, now) == expected
+        now += expected
+    # 设备1持续离线：从最短间隔起逐步加倍，直到离线上限
+    now = 0
+    for expected in [5, 10, 20, 40, 60, 60]:
+        assert scheduler.record(1, False, now) == expected
+        now += expected
+    # 恢复在线后先按最短间隔确认，再回到基础间隔；再次离线时立即按最短间隔（近期反复变化，不退避）
+    assert scheduler.record(1, True, now) == 5
+    assert scheduler.record(1, True, now + 5) == 30
+    assert scheduler.record(1, False, now + 35) == 5
+    assert scheduler.record(1, False, now + 40) == 5
+    # 设备2反复上下线：变化停止后仍按最短间隔探测，直到移出观察窗口
+    for i, ok in enumerate([True, False, True, True, True]):
+        interval = scheduler.record(2, ok, i)
+    assert scheduler.is_flapping(2) and interval == 5
+    for i in range(10):
+        interval = scheduler.record(2, True, 10 + i)
+    assert not scheduler.is_flapping(2) and interval > 5
+    print("✅ 自适应探测间隔测试通过")
+
+
+def test_due_order_and_spread():
+    """测试按到期时间取出设备，且加入抖动后探测在时间上分散"""
+    print("测试探测时间分散...")
+    scheduler = MonitorScheduler(1000, min_interval=5, base_interval=30, max_interval=300, start=0,
+                                 rng=random.Random(3))
+    for idx in scheduler.due(0):
+        scheduler.record(idx, True, 0)
+    assert scheduler.due(14.9) == []
+    assert 15 <= scheduler.next_due() < 16
+    # 基础间隔 30 秒、抖动 ±50%：15~45 秒内每 5 秒到期的设备数大致相同
+    buckets = [len(scheduler.due(t)) for t in range(20, 50, 5)]
+    assert sum(buckets) == 1000
+    assert all(130 <= count <= 200 for count in buckets), buckets
+    # 重新安排会覆盖旧的到期时间
+    scheduler.schedule(0, 100)
+    scheduler.schedule(0, 60)
+    assert scheduler.due(100) == [0]
+    assert scheduler.next_due() is None
+    print("✅ 探测时间分散测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("监控调度 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_adaptive_intervals,
+        test_due_order_and_spread
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出清理测试脚本 - 验证流式清理与整体清理结果一致、黄金样本逐字节一致、日志流式写入与中途断开时保留部分输出
+"""
+
+import sys
+import os
+import random
+import tempfile
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from output_cleaner import StreamCleaner, clean_output, last_line
+from device_log import DeviceLogWriter, safe_filename
+
+SAMPLE = (
+    "display current-configuration\r\n"
+    "#\r\n sysname HUAWEI\r\n#\r\n"
+    "  ---- More ----\x1b[42D                                          \x1b[42D"
+    " interface GigabitEthernet0/0/1\r\n  port link-type trunk\r\n"
+    "\r\n\r\n\r\n\r\n"
+    "BS BS\r\n BS\r\nBSinterface\r\n"
+    "Clear counters? (y/n): n\r\n"
+    "n\r\n"
+    "          TASK          10%      \r\n"
+    "return\r\n<HUAWEI>"
+)
+
+
+def format_command_output(raw_output, prev_raw_output):
+    """参照实现：整体清理单条命令的输出，并在开头补上上一段输出末尾的提示符"""
+    output = clean_output(raw_output)
+    prompt = last_line(prev_raw_output)
+    if prompt:
+        cleaned_lines = output.strip().splitlines()
+        if not cleaned_lines or cleaned_lines[0].strip() != prompt:
+            output = f"{prompt}\n{output}"
+    return output
+
+
+def stream(text, prompt, sizes):
+    out = []
+    cleaner = StreamCleaner(out.append, prompt)
+    pos = 0
+    for size in sizes:
+        cleaner.feed(text[pos:pos + size])
+        pos += size
+    cleaner.feed(text[pos:])
+    cleaner.close()
+    return ''.join(out)
+
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_cleaner')
+
+
+def test_stream_matches_whole():
+    """测试任意数据块切分下流式清理与整体清理结果逐字节一致"""
+    print("测试流式清理一致性...")
+    rng = random.Random(7)
+    for prev in ['', '<HUAWEI>', 'display version\r\n<HUAWEI>\r\n']:
+        expected = format_command_output(SAMPLE, prev)
+        assert stream(SAMPLE, last_line(prev), []) == expected
+        for _ in range(300):
+            sizes = [rng.randint(1, 12) for _ in range(len(SAMPLE) // 4)]
+            assert stream(SAMPLE, last_line(prev), sizes) == expected
+    assert stream('', '<SW>', []) == format_command_output('', '<SW>')
+    print("✅ 流式清理一致性测试通过")
+
+
+def test_golden_corpus():
+    """测试清理结果与黄金样本（旧版实现的输出，由 bench_cleaner.py --write-golden 生成）逐字节一致"""
+    print("测试黄金样本...")
+    rng = random.Random(8)
+    names = sorted(f[:-4] for f in os.listdir(GOLDEN_DIR) if f.endswith('.raw'))
+    assert names
+    for name in names:
+        with open(os.path.join(GOLDEN_DIR, name + '.raw'), encoding='utf-8', newline='') as f:
+            raw = f.read()
+        with open(os.path.join(GOLDEN_DIR, name + '.clean'), encoding='utf-8', newline='') as f:
+            expected = f.read()
+        assert clean_output(raw) == expected, name
+        for _ in range(20):
+            sizes = [rng.randint(1, 64) for _ in range(len(raw) // 16)]
+            assert stream(raw, '', sizes) == expected, name
+    print(f"✅ 黄金样本测试通过（{len(names)} 个样本）")
+
+
+def test_log_writer_partial_output():
+    """测试会话中途异常时已接收的输出保留在日志中"""
+    print("测试中途断开保留部分输出...")
+    path = os.path.join(tempfile.mkdtemp(), 'sw1.log')
+    try:
+        with DeviceLogWriter(path, headers=True) as writer:
+            writer.start_command(0, 'display version', '<SW>')
+            writer.feed('display version\r\nVRP (R) software\r\n')
+            writer.end_command()
+            writer.start_command(1, 'display current-configuration', '<SW>')
+            writer.feed('display current-configuration\r\n#\r\nsysname SW\r\ninterf')
+            raise EOFError('session closed')
+    except EOFError:
+        pass
+    with open(path, encoding='utf-8') as f:
+        log = f.read()
+    assert log.startswith("\n===== 命令 1: display version =====\n<SW>\ndisplay version\nVRP (R) software\n")
+    assert "===== 命令 2: display current-configuration =====" in log
+    assert log.endswith("sysname SW\ninterf\n")
+    # 设备名中的非法字符（含 DEL 控制符）替换为下划线，与旧版文件名规则一致
+    assert safe_filename('SW\x7f1/核心:A-B_C') == 'SW_1_核心_A-B_C'
+    print("✅ 中途断开保留部分输出测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("输出清理 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_stream_matches_whole,
+        test_golden_corpus,
+        test_log_writer_partial_output
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
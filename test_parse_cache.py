@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志解析缓存测试脚本 - 验证再次解析时只解析新增或修改过的日志（含多进程与归档条目），
+解析模块修改后缓存失效，以及命令行 parse 使用缓存
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import time
+import zipfile
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+from log_parse_pool import parse_logs
+from extract_loader import load_extract_module
+from log_archive import archive_entry_path
+from parse_cache import ParseCache
+
+EXTRACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extract_device_status.py')
+
+HUAWEI_LOG = """
+===== 命令 1: display cpu-usage =====
+<SW{n}>
+CPU usage in the last 5 seconds: {cpu}%
+===== 命令 2: display memory-usage =====
+Memory usage: 45%
+<SW{n}>
+"""
+
+
+def write_log(path, n, cpu):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HUAWEI_LOG.format(n=n, cpu=cpu))
+
+
+def make_logs(count):
+    folder = tempfile.mkdtemp()
+    for n in range(count):
+        write_log(os.path.join(folder, f'SW{n}_20250702_100000.log'), n, n % 100)
+    return folder
+
+
+def cpu_by_device(rows):
+    return {row['设备名']: row['CPU使用率'] for row in rows}
+
+
+def test_incremental_parse():
+    """测试未变化的日志取缓存结果，修改/新增的日志与解析模块变化后重新解析"""
+    print("测试增量解析...")
+    folder = make_logs(40)
+    log_files = load_extract_module(EXTRACT_PATH).find_log_files(folder)
+    cache_path = os.path.join(tempfile.mkdtemp(), 'parse_cache.db')
+    with ParseCache(cache_path) as cache:
+        first = parse_logs(EXTRACT_PATH, log_files, max_workers=1, cache=cache)
+        assert (cache.hits, cache.misses) == (0, 40)
+
+    # 新打开：缓存已持久化，进程池路径下同样只解析变化的日志
+    changed = os.path.join(folder, 'SW3_20250702_100000.log')
+    write_log(changed, 3, 97)
+    os.utime(changed, ns=(time.time_ns(), os.stat(changed).st_mtime_ns + 10 ** 9))
+    added = os.path.join(folder, 'SW99_20250702_100000.log')
+    write_log(added, 99, 55)
+    batches = []
+    with ParseCache(cache_path) as cache:
+        second = parse_logs(EXTRACT_PATH, log_files + [added], on_rows=batches.append, max_workers=2,
+                            chunk_size=1, cache=cache)
+        assert (cache.hits, cache.misses) == (39, 2)
+    assert len(batches[0]) == 39
+    expected = dict(cpu_by_device(first), SW3='97%', SW99='55%')
+    assert cpu_by_device(second) == expected and len(second) == 41
+
+    # 解析模块内容变化（版本不同）：全部重新解析
+    module_path = os.path.join(tempfile.mkdtemp(), 'extract_device_status.py')
+    shutil.copy(EXTRACT_PATH, module_path)
+    with open(module_path, 'a', encoding='utf-8') as f:
+        f.write("\n# 解析规则已更新\n")
+    with ParseCache(cache_path) as cache:
+        third = parse_logs(module_path, log_files + [added], max_workers=1, cache=cache)
+        assert (cache.hits, cache.misses) == (0, 41) and cpu_by_device(third) == expected
+    print("✅ 增量解析测试通过")
+
+
+def test_archive_and_cli():
+    """测试归档条目按归档文件判断变化，命令行 parse 报告缓存命中数"""
+    print("测试归档条目缓存与命令行解析...")
+    folder = tempfile.mkdtemp()
+    archive = os.path.join(folder, 'inspect_logs_20250702_100000.zip')
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for n in range(3):
+            zf.writestr(f'SW{n}_20250702_100000.log', HUAWEI_LOG.format(n=n, cpu=20 + n))
+    write_log(os.path.join(folder, 'SW9_20250702_100000.log'), 9, 90)
+    entries = [archive_entry_path(archive, f'SW{n}_20250702_100000.log') for n in range(3)]
+    cache_path = os.path.join(tempfile.mkdtemp(), 'parse_cache.db')
+    with ParseCache(cache_path) as cache:
+        rows = parse_logs(EXTRACT_PATH, entries, max_workers=1, cache=cache)
+        assert cpu_by_device(rows) == {'SW0': '20%', 'SW1': '21%', 'SW2': '22%'}
+        parse_logs(EXTRACT_PATH, entries, max_workers=1, cache=cache)
+        assert (cache.hits, cache.misses) == (3, 3)
+
+    json_path = os.path.join(tempfile.mkdtemp(), 'summary.json')
+    args = ['parse', folder, '--workers', '1', '--cache', cache_path, '--json', json_path, '-q']
+    for expected_cached in (3, 4):
+        assert cli.main(args) == cli.EXIT_OK
+        with open(json_path, encoding='utf-8') as f:
+            summary = json.load(f)
+        assert summary['parsed'] == 4 and summary['cached'] == expected_cached
+    assert cli.main(args + ['--no-cache']) == cli.EXIT_OK
+    with open(json_path, encoding='utf-8') as f:
+        assert json.load(f)['cached'] == 0
+    print("✅ 归档条目缓存与命令行解析测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("日志解析缓存 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_incremental_parse,
+        test_archive_and_cli
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
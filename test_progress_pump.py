@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度消息泵测试脚本 - 验证多线程投递、按通道合并写入与文本框行数上限
+使用 FakeRoot/FakeText 代替 Tk 控件（无需图形界面）
+"""
+
+import sys
+import os
+import threading
+from queue import Queue
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from progress_pump import ProgressPump, TextSink
+
+
+class FakeRoot:
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+
+class FakeText:
+    """实现 TextSink 用到的 tk.Text 接口（行号从1开始，文本末尾总有一个换行）"""
+
+    def __init__(self):
+        self.text = ''
+        self.inserts = 0
+        self.state = 'disabled'
+
+    def winfo_exists(self):
+        return True
+
+    def yview(self):
+        return (0.0, 1.0)
+
+    def config(self, state):
+        self.state = state
+
+    def insert(self, index, text):
+        assert self.state == 'normal'
+        self.text += text
+        self.inserts += 1
+
+    def index(self, index):
+        return f"{self.text.count(chr(10)) + 1}.0"
+
+    def delete(self, start, end):
+        line = int(end.split('.')[0])
+        self.text = self.text.split('\n', line - 1)[-1]
+
+    def see(self, index):
+        pass
+
+
+def test_coalesce_and_cap():
+    """测试多线程投递的事件按帧合并写入，且文本框只保留最近的行"""
+    print("测试进度事件合并...")
+    root = FakeRoot()
+    backup, inspect = FakeText(), FakeText()
+    pump = ProgressPump(root, Queue())
+    pump.register('backup', TextSink(lambda: backup, max_lines=100))
+    pump.register('inspect', TextSink(lambda: inspect, max_lines=100))
+    pump.start()
+
+    def worker(n):
+        for i in range(250):
+            pump.post('backup', f"[{n}] line {i}\n")
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    pump.post('inspect', "开始巡检\n")
+    pump.post('unknown', "忽略\n")
+
+    # 一帧处理完全部 1002 个事件，每个通道只插入一次
+    root.callbacks.pop(0)()
+    assert backup.inserts == 1 and inspect.inserts == 1
+    assert inspect.text == "开始巡检\n" and backup.state == 'disabled'
+    lines = backup.text.splitlines()
+    assert len(lines) == 99
+    assert all(' line ' in line for line in lines)
+    # 下一帧已安排且队列为空
+    assert len(root.callbacks) == 1 and pump.drain() == 0
+    pump.stop()
+    root.callbacks.pop(0)()
+    assert root.callbacks == []
+    print("✅ 进度事件合并测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("进度消息泵 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_coalesce_and_cap
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提示符匹配测试脚本 - 验证预编译 PromptMatcher 的分页符、Y/N 与提示符识别
+"""
+
+import sys
+import os
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from channel_reader import build_prompt_regex
+from prompt_matcher import PAGER, YN, PROMPT, LOGIN_MATCHER, get_matcher
+
+
+def test_pager_detection():
+    """测试分页符只在独占最后一行时识别"""
+    print("测试分页符识别...")
+    matcher = get_matcher('huawei')
+    assert matcher.scan("sysname SW\r\n  ---- More ----") == PAGER
+    assert matcher.scan(" description ---- More ---- link\r\n") != PAGER
+    assert matcher.scan("sysname SW\r\n  ---- More ----", check_pager=False) is None
+    # 未知厂商使用全部分页符
+    assert get_matcher('').scan("x\r\n -- More -- ") == PAGER
+    print("✅ 分页符识别测试通过")
+
+
+def test_yn_and_prompt():
+    """测试Y/N确认提示与提示符识别"""
+    print("测试Y/N与提示符识别...")
+    matcher = get_matcher('cisco')
+    assert matcher.scan("Clear counters on all interfaces (y/n):") == YN
+    assert LOGIN_MATCHER.scan("The password needs to be changed. Change now? [Y/N]: ") == YN
+    regex = build_prompt_regex('Switch#')
+    assert matcher.scan("show clock\r\n10:00 UTC\r\nSwitch#", regex) == PROMPT
+    assert matcher.scan("show clock\r\n10:00 UTC\r\n", regex) is None
+    # 未取得提示符时，配置行不会被误判为提示符
+    assert matcher.scan("show run\r\ninterface Gi0/1 #") is None
+    assert matcher.scan("show clock\r\nSwitch#") == PROMPT
+    print("✅ Y/N与提示符识别测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("提示符匹配 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_pager_detection,
+        test_yn_and_prompt
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可达性探测测试脚本 - 验证并发探测结果、RTT 记录与同时进行中的连接数上限
+"""
+
+import sys
+import os
+import socket
+import threading
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import reachability
+
+
+def open_listener():
+    """本地监听端口，返回 (socket, 端口)"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(512)
+    return server, server.getsockname()[1]
+
+
+def closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_sweep_results():
+    """测试在线/离线判断、RTT 与结果顺序"""
+    print("测试并发探测结果...")
+    server, port = open_listener()
+    try:
+        targets = [('127.0.0.1', port), ('127.0.0.1', closed_port()), (None, 22), ('127.0.0.1', port)]
+        seen = []
+        results = reachability.sweep(targets, timeout=2, max_in_flight=2,
+                                     on_result=lambda idx, result: seen.append(idx))
+    finally:
+        server.close()
+    assert sorted(seen) == [0, 1, 2, 3]
+    assert results[0][0] and results[0][1] is not None and results[0][1] >= 0
+    assert results[3][0]
+    assert not results[1][0] and results[1][1] is None and results[1][2]
+    assert results[2] == (False, None, '缺少IP地址')
+    print("✅ 并发探测结果测试通过")
+
+
+def test_in_flight_cap():
+    """测试同时进行中的连接数不超过上限"""
+    print("测试并发连接上限...")
+    server, port = open_listener()
+    lock = threading.Lock()
+    state = {'current': 0, 'peak': 0}
+    original = reachability.asyncio.open_connection
+
+    async def counting_open_connection(host, port):
+        with lock:
+            state['current'] += 1
+            state['peak'] = max(state['peak'], state['current'])
+        try:
+            await reachability.asyncio.sleep(0.01)
+            return await original(host, port)
+        finally:
+            with lock:
+                state['current'] -= 1
+
+    reachability.asyncio.open_connection = counting_open_connection
+    try:
+        results = reachability.sweep([('127.0.0.1', port)] * 60, timeout=2, max_in_flight=8)
+    finally:
+        reachability.asyncio.open_connection = original
+        server.close()
+    assert all(ok for ok, rtt, error in results)
+    assert state['peak'] == 8
+    print("✅ 并发连接上限测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("可达性探测 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_sweep_results,
+        test_in_flight_cap
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连接重试测试脚本 - 验证失败归类、退避时间与批量任务末尾的失败设备重试
+"""
+
+import sys
+import os
+import socket
+import tempfile
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import paramiko
+
+import async_engine
+from device_log import DeviceLogWriter
+from retry_policy import RetryPolicy, ConnectError, classify_error, failure_kind, TIMEOUT, AUTH, RESET, OTHER
+
+
+def test_classify_and_policy():
+    """测试失败归类与各类别的重试次数"""
+    print("测试失败归类与重试策略...")
+    assert classify_error(socket.timeout('timed out')) == TIMEOUT
+    assert classify_error(paramiko.AuthenticationException('Authentication failed.')) == AUTH
+    assert classify_error(ConnectionResetError(104, 'Connection reset by peer')) == RESET
+    assert classify_error(paramiko.SSHException('Error reading SSH protocol banner')) == RESET
+    assert classify_error(ValueError('bad')) == OTHER
+
+    err = ConnectError(RESET, 'Connection reset by peer')
+    assert failure_kind(str(err)) == RESET
+    assert failure_kind('命令执行失败') is None
+
+    policy = RetryPolicy(max_retries=2, base_delay=1, max_delay=3, jitter=0.5)
+    assert policy.should_retry(str(ConnectError(TIMEOUT, 'x')), 2)
+    assert not policy.should_retry(str(ConnectError(TIMEOUT, 'x')), 3)
+    assert policy.should_retry(str(ConnectError(AUTH, 'x')), 1)
+    assert not policy.should_retry(str(ConnectError(AUTH, 'x')), 2)
+    assert not policy.should_retry(str(ConnectError(OTHER, 'x')), 1)
+    assert not policy.should_retry('写入日志失败', 1)
+    for attempt in range(1, 6):
+        delay = policy.backoff(attempt)
+        base = min(3, 2 ** (attempt - 1))
+        assert base * 0.5 <= delay <= base * 1.5
+    print("✅ 失败归类与重试策略测试通过")
+
+
+class FlakySession:
+    """第一次连接时抛出连接中断，之后正常返回；auth 设备始终认证失败"""
+    attempts = {}
+
+    def __init__(self, device, **kwargs):
+        self.device = device
+        self.login_output = '<SW>'
+
+    async def __aenter__(self):
+        name = self.device['name']
+        FlakySession.attempts[name] = FlakySession.attempts.get(name, 0) + 1
+        if name == 'auth':
+            raise ConnectError(AUTH, 'Authentication failed.')
+        if FlakySession.attempts[name] == 1:
+            raise ConnectError(RESET, 'Connection reset by peer')
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def stream_many(self, cmds, writer):
+        for idx, cmd in enumerate(cmds):
+            writer.start_command(idx, cmd, self.login_output)
+            writer.feed(f"{cmd}\r\n<SW>")
+            writer.end_command()
+
+
+def test_batch_retry():
+    """测试批量任务只重试失败设备，且每台设备只回调一次最终结果"""
+    print("测试批量任务失败重试...")
+    FlakySession.attempts = {}
+    retried = []
+    done = []
+    folder = tempfile.mkdtemp()
+    results = async_engine.run_batch(
+        [{'name': 'sw1'}, {'name': 'auth'}], lambda dev: ['display version'],
+        lambda dev: DeviceLogWriter(os.path.join(folder, dev['name'] + '.log')),
+        retry_policy=RetryPolicy(max_retries=3, base_delay=0.01, jitter=0),
+        on_done=lambda idx, dev, result: done.append(dev['name']),
+        on_retry=lambda idx, dev, result, attempt, delay: retried.append((dev['name'], attempt)),
+        session_factory=FlakySession)
+    assert results[0][0] and os.path.basename(results[0][1]) == 'sw1.log'
+    assert not results[1][0] and failure_kind(results[1][2]) == AUTH
+    assert FlakySession.attempts == {'sw1': 2, 'auth': 2}
+    assert sorted(retried) == [('auth', 1), ('sw1', 1)]
+    assert sorted(done) == ['auth', 'sw1']
+    print("✅ 批量任务失败重试测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("连接重试 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_classify_and_policy,
+        test_batch_retry
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行历史索引测试脚本 - 验证设备登记、任务与逐台结果、健康指标的记录与索引查询，
+以及经由模拟设备的批量任务在每台设备完成时即写入索引
+"""
+
+import sys
+import os
+import io
+import json
+import sqlite3
+import tempfile
+import contextlib
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+import jobs
+from device_simulator import SimulatedDevice
+from run_index import IndexWriter, RunIndex
+
+DEVICES = [
+    {'name': 'SW1', 'ip': '10.0.0.1', 'vendor': 'huawei'},
+    {'name': 'SW2', 'ip': '10.0.0.2', 'vendor': 'cisco', 'port': '2222'},
+]
+
+
+def test_history_queries():
+    """测试最近成功备份、失败记录、设备历史与最新状态查询"""
+    print("测试运行历史索引查询...")
+    path = os.path.join(tempfile.mkdtemp(), 'history.db')
+    with RunIndex(path) as index:
+        assert index.upsert_devices(DEVICES, 'backup') == 2
+        first = index.start_run('backup', '/backup/backup_1', 2)
+        index.record_result(first, DEVICES[0], {'ok': True, 'logfile': '/backup/backup_1/SW1.log', 'duration': 1.5})
+        index.record_result(first, DEVICES[1], {'ok': True, 'logfile': '/backup/backup_1/SW2.log', 'duration': 2})
+        index.finish_run(first, 2, 0, 3.5)
+        second = index.start_run('backup', '/backup/backup_2', 2)
+        index.record_result(second, DEVICES[0], {'ok': True, 'logfile': '/backup/backup_2/SW1.log', 'duration': 1})
+        index.record_result(second, DEVICES[1], {'ok': False, 'error': 'Authentication failed', 'duration': 0.3})
+        inspect = index.start_run('inspect', '/inspect/inspect_1', 1)
+        index.record_result(inspect, DEVICES[0], {'ok': True, 'logfile': '/inspect/inspect_1/SW1.log'},
+                            health={'厂商': 'HUAWEI', 'CPU使用率': '12%', '内存使用率': '40%'})
+        # 按日志文件名解析的健康指标只有设备名，归到已登记的设备
+        index.record_health([{'设备名': 'SW2', '厂商': 'CISCO', 'CPU使用率': '95%', '风扇状态': '异常'}])
+
+    # 重新打开：数据已持久化
+    with RunIndex(path) as index:
+        assert index.last_success('SW2')['logfile'] == '/backup/backup_1/SW2.log'
+        assert index.last_success('SW1')['logfile'] == '/backup/backup_2/SW1.log'
+        assert index.last_success('SW2', kind='inspect') is None
+        failures = index.failures()
+        assert [(r['name'], r['error'], r['folder']) for r in failures] == [
+            ('SW2', 'Authentication failed', '/backup/backup_2')]
+        assert index.failures(kind='inspect') == []
+        assert [r['run_id'] for r in index.device_history('SW1')] == [inspect, second, first]
+        assert len(index.device_history('SW1', kind='backup', limit=1)) == 1
+        runs = index.recent_runs(kind='backup')
+        assert [r['id'] for r in runs] == [second, first] and runs[1]['success'] == 2 and runs[0]['finished'] is None
+        status = {r['name']: r for r in index.latest_status()}
+        assert len(status) == 2
+        assert status['SW1']['backup_ok'] == 1 and status['SW1']['cpu'] == '12%' and status['SW1']['inspect_ok'] == 1
+        assert status['SW2']['backup_ok'] == 0 and status['SW2']['backup_error'] == 'Authentication failed'
+        assert status['SW2']['backup_last_ok'] is not None and status['SW2']['inspect_time'] is None
+        assert status['SW2']['cpu'] == '95%' and status['SW2']['fan'] == '异常' and status['SW2']['ip'] == '10.0.0.2'
+    print("✅ 运行历史索引查询测试通过")
+
+
+def test_job_index():
+    """测试批量巡检/备份在每台设备完成时写入结果与健康指标，命令行 history 查询"""
+    print("测试批量任务写入运行历史索引...")
+    output = tempfile.mkdtemp()
+    path = os.path.join(output, 'history.db')
+    settings = jobs.JobSettings(use_async_engine=False, max_retries=0, run_index=path)
+    messages = []
+
+    with SimulatedDevice('huawei', config_lines=60) as sim:
+        devices = [sim.device('HW1', cmds=['display cpu-usage', 'display memory-usage']), sim.device('HW2')]
+        dead = SimulatedDevice('huawei')
+        dead.start()
+        devices.append(dead.device('HW3'))
+        dead.stop()
+        inspect = jobs.run_job('inspect', devices, output, settings, progress=messages.append)
+        backup = jobs.run_job('backup', devices[:2], output, settings)
+    assert inspect['index'] == path and inspect['success'] == 2 and inspect['fail'] == 1
+    # 任务返回时后台线程已写完全部结果（巡检 3 台 + 备份 2 台）
+    assert not [m for m in messages if '运行历史索引' in m], messages
+    with contextlib.closing(sqlite3.connect(path)) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM results').fetchone()[0] == 5
+
+    with RunIndex(path) as index:
+        status = {r['name']: r for r in index.latest_status()}
+        assert status['HW1']['cpu'] == '12%' and status['HW1']['inspect_ok'] == 1 and status['HW1']['backup_ok'] == 1
+        assert status['HW3']['inspect_ok'] == 0 and status['HW3']['cpu'] is None
+        logfiles = {d['name']: d['logfile'] for d in backup['devices']}
+        assert index.last_success('HW2')['logfile'] == logfiles['HW2']
+        runs = index.recent_runs()
+        assert [(r['kind'], r['success'], r['fail']) for r in runs] == [('backup', 2, 0), ('inspect', 2, 1)]
+        assert runs[1]['summary_log'] == inspect['summary_log']
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        code = cli.main(['history', '--index', path, '--failures', '-q'])
+    summary = json.loads(out.getvalue())
+    assert code == cli.EXIT_OK and [r['name'] for r in summary['rows']] == ['HW3']
+    print("✅ 批量任务写入运行历史索引测试通过")
+
+
+def test_index_writer():
+    """测试后台写入线程：分批提交、解析健康指标，解析或写入失败只回调 on_error"""
+    print("测试运行历史索引后台写入...")
+    path = os.path.join(tempfile.mkdtemp(), 'history.db')
+    errors = []
+
+    def parse(logfile):
+        if 'bad' in logfile:
+            raise ValueError('unreadable')
+        return {'CPU使用率': '7%'}
+
+    with RunIndex(path) as index:
+        run_id = index.start_run('inspect', '/inspect/inspect_1', 3)
+        writer = IndexWriter(index, run_id, parse=parse, on_error=errors.append, batch_wait=5)
+        writer.put(DEVICES[0], {'ok': True, 'logfile': '/inspect/SW1.log'})
+        writer.put(DEVICES[1], {'ok': True, 'logfile': '/inspect/bad.log'})
+        writer.put({'name': 'SW3'}, {'ok': False, 'error': 'timeout'})
+        writer.close()
+        writer.close()
+        # 队列中的结果一次提交（close 不等待 batch_wait）
+        assert writer.written == 3 and writer.batches == 1
+        assert errors == ['解析 /inspect/bad.log 失败: unreadable']
+        status = {r['name']: r for r in index.latest_status()}
+        assert status['SW1']['cpu'] == '7%' and status['SW2']['cpu'] is None and status['SW3']['inspect_ok'] == 0
+
+        # 写入失败（如磁盘已满）：结果不记录，线程继续处理后续批次
+        errors.clear()
+        writer = IndexWriter(index, run_id + 100, on_error=errors.append, batch_size=1)
+        writer.put(DEVICES[0], {'ok': True})
+        writer.put(DEVICES[1], {'ok': True})
+        writer.close()
+        assert writer.written == 0 and len(errors) == 2 and '写入运行历史索引失败' in errors[0]
+
+    # 按路径创建：导入的设备清单由写入线程打开索引并登记，close 时关闭索引
+    errors.clear()
+    path = os.path.join(tempfile.mkdtemp(), 'history.db')
+    writer = IndexWriter(path, on_error=errors.append)
+    writer.put_devices(DEVICES, 'manage')
+    writer.close()
+    assert writer.index is None and errors == [] and writer.written == 0
+    with RunIndex(path) as index:
+        assert sorted(r['name'] for r in index.latest_status()) == ['SW1', 'SW2']
+    writer = IndexWriter(os.path.join(path, 'history.db'), on_error=errors.append)
+    writer.put_devices(DEVICES, 'manage')
+    writer.close()
+    assert len(errors) == 1 and '打开运行历史索引失败' in errors[0]
+    print("✅ 运行历史索引后台写入测试通过")
+
+
+def test_job_index_unavailable():
+    """测试索引无法打开（目录不可写、文件损坏）时任务照常完成，只提示不记录历史"""
+    print("测试运行历史索引不可用...")
+    output = tempfile.mkdtemp()
+    blocker = os.path.join(output, 'not_a_dir')
+    with open(blocker, 'w') as f:
+        f.write('x')
+    corrupt = os.path.join(output, 'corrupt.db')
+    with open(corrupt, 'wb') as f:
+        f.write(b'this is not a sqlite database' * 100)
+    with SimulatedDevice('huawei', config_lines=20) as sim:
+        devices = [sim.device('HW1', cmds=['display cpu-usage'])]
+        for path in (os.path.join(blocker, 'history.db'), corrupt):
+            messages = []
+            settings = jobs.JobSettings(use_async_engine=False, max_retries=0, run_index=path)
+            summary = jobs.run_job('inspect', devices, output, settings, progress=messages.append)
+            assert summary['success'] == 1 and summary['fail'] == 0 and summary['index'] is None
+            assert any(m.startswith('打开运行历史索引失败') for m in messages), messages
+    print("✅ 运行历史索引不可用测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("运行历史索引 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_history_queries,
+        test_job_index,
+        test_index_writer,
+        test_job_index_unavailable
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
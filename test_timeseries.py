@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监控时序存储测试脚本 - 验证环形缓冲覆盖、溢出到磁盘后历史完整、可用率与趋势统计
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from timeseries import TimeSeriesStore, RingSeries, parse_percent
+
+
+def test_ring_buffer():
+    """测试写满后覆盖最旧样本，内存占用固定"""
+    print("测试环形缓冲...")
+    series = RingSeries(4)
+    assert series.last() is None
+    for i in range(6):
+        series.append(float(i), i % 2 == 0, rtt=i * 1.5 if i != 3 else None, cpu=10.0)
+    assert len(series) == 4
+    assert [s[0] for s in series.samples()] == [2.0, 3.0, 4.0, 5.0]
+    assert series.samples()[1] == (3.0, False, None, 10.0, None)
+    assert series.last() == (5.0, False, 7.5, 10.0, None)
+    assert [s[0] for s in series.samples(since=3.5)] == [4.0, 5.0]
+    assert series.nbytes() == 4 * 21
+    assert parse_percent('12%') == 12.0 and parse_percent(' 7.5 % ') == 7.5 and parse_percent('N/A') is None
+    print("✅ 环形缓冲测试通过")
+
+
+def test_spill_keeps_full_history():
+    """测试缓冲写满后溢出到磁盘，内存 + 磁盘历史完整且不重复"""
+    print("测试溢出到磁盘...")
+    folder = tempfile.mkdtemp()
+    store = TimeSeriesStore(capacity=8, spill_dir=folder)
+    for i in range(30):
+        store.record('10.0.0.1', i % 5 != 0, rtt=float(i), ts=1000.0 + i)
+    assert len(store.samples('10.0.0.1')) == 8
+    history = store.samples('10.0.0.1', include_spilled=True)
+    assert [s[0] for s in history] == [1000.0 + i for i in range(30)]
+    assert history[5] == (1005.0, False, 5.0, None, None)
+    store.flush()
+    store.flush()
+    assert [s[0] for s in store.samples('10.0.0.1', include_spilled=True)] == [1000.0 + i for i in range(30)]
+    assert os.path.exists(store.spill_path('10.0.0.1'))
+    print("✅ 溢出到磁盘测试通过")
+
+
+def test_summary_and_timeline():
+    """测试单台设备统计与整体趋势"""
+    print("测试可用率与趋势统计...")
+    store = TimeSeriesStore(bucket_seconds=60)
+    for i, ok in enumerate([True, True, False, False, True, True]):
+        store.record('sw1', ok, rtt=2.0 if ok else None, ts=i * 30.0)
+        store.record('sw2', True, rtt=4.0, ts=i * 30.0)
+    store.record('sw1', True, cpu=85.0, mem=40.0, ts=200.0)
+    summary = store.summary('sw1')
+    assert summary['samples'] == 7 and summary['changes'] == 2
+    assert round(summary['availability'], 1) == 71.4
+    assert summary['avg_rtt'] == 2.0 and summary['cpu'] == 85.0 and summary['mem'] == 40.0
+    assert store.summary('unknown')['availability'] is None
+    timeline = store.timeline()
+    assert [t[0] for t in timeline] == [0, 60, 120, 180]
+    assert [round(t[1]) for t in timeline] == [100, 50, 100, 100]
+    assert timeline[1][2] == 4.0 and timeline[3][2] is None
+    assert [t[0] for t in store.timeline(since=130)] == [120, 180]
+    assert round(store.availability(), 1) == round(100 * 11 / 13, 1)
+    print("✅ 可用率与趋势统计测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("监控时序存储 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_ring_buffer,
+        test_spill_keeps_full_history,
+        test_summary_and_timeline
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表格增量更新测试脚本 - 验证只对变化的行操作、行顺序调整与按帧分批执行
+使用记录操作的 FakeTree 代替 ttk.Treeview（无需图形界面）
+"""
+
+import sys
+import os
+
+# 添加当前目录到模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tree_updater import TreeDiffUpdater
+
+COLUMNS = ("设备名", "IP", "状态")
+
+
+class FakeTree:
+    """实现 TreeDiffUpdater 用到的 Treeview 接口，并统计行操作次数"""
+
+    def __init__(self):
+        self.items = {}
+        self.children = []
+        self.ops = {'insert': 0, 'item': 0, 'delete': 0, 'move': 0}
+        self.callbacks = []
+        self._next = 0
+
+    def insert(self, parent, index, values):
+        self._next += 1
+        iid = f'I{self._next}'
+        self.items[iid] = tuple(values)
+        self.children.append(iid)
+        self.ops['insert'] += 1
+        return iid
+
+    def item(self, iid, values):
+        self.items[iid] = tuple(values)
+        self.ops['item'] += 1
+
+    def delete(self, iid):
+        del self.items[iid]
+        self.children.remove(iid)
+        self.ops['delete'] += 1
+
+    def move(self, iid, parent, index):
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+        self.ops['move'] += 1
+
+    def get_children(self, parent=''):
+        return tuple(self.children)
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def winfo_exists(self):
+        return True
+
+    def run_frames(self):
+        frames = 0
+        while self.callbacks:
+            self.callbacks.pop(0)()
+            frames += 1
+        return frames
+
+    def rows(self):
+        return [self.items[iid] for iid in self.children]
+
+    def reset_ops(self):
+        for k in self.ops:
+            self.ops[k] = 0
+
+
+def make_rows(count, offline=()):
+    return [{'设备名': f'SW{i}', 'IP': f'10.0.{i // 256}.{i % 256}', '状态': '离线' if i in offline else '在线'}
+            for i in range(count)]
+
+
+def test_only_changed_rows():
+    """测试刷新只更新有变化的行"""
+    print("测试增量更新...")
+    tree = FakeTree()
+    updater = TreeDiffUpdater(tree, COLUMNS, max_ops_per_frame=1000)
+    rows = make_rows(2000)
+    updater.set_rows(rows)
+    updater.set_rows(rows)  # 同一帧内的多次刷新合并
+    assert tree.run_frames() == 2
+    assert tree.ops['insert'] == 2000 and len(tree.rows()) == 2000
+
+    tree.reset_ops()
+    updater.set_rows(make_rows(2000, offline={5, 1500}))
+    tree.run_frames()
+    assert tree.ops == {'insert': 0, 'item': 2, 'delete': 0, 'move': 0}
+    assert tree.rows()[5] == ('SW5', '10.0.0.5', '离线')
+
+    tree.reset_ops()
+    updater.update_rows([{'设备名': 'SW5', 'IP': '10.0.0.5', '状态': '在线'}, {'设备名': 'NEW', 'IP': '10.9.9.9'}])
+    tree.run_frames()
+    assert tree.ops == {'insert': 1, 'item': 1, 'delete': 0, 'move': 0}
+    assert tree.rows()[-1] == ('NEW', '10.9.9.9', '')
+    print("✅ 增量更新测试通过")
+
+
+def test_reorder_and_delete():
+    """测试排序变化只移动位置不对的行，缺失的行被删除"""
+    print("测试行顺序调整...")
+    tree = FakeTree()
+    updater = TreeDiffUpdater(tree, COLUMNS)
+    rows = make_rows(10)
+    updater.set_rows(rows)
+    updater.flush()
+    tree.reset_ops()
+    # 两台异常设备排到最前
+    reordered = [rows[7], rows[3]] + [r for i, r in enumerate(rows) if i not in (3, 7, 9)]
+    updater.set_rows(reordered)
+    updater.flush()
+    assert tree.rows() == [updater.row_values(r) for r in reordered]
+    assert tree.ops == {'insert': 0, 'item': 0, 'delete': 1, 'move': 2}
+    # 重复IP的行分别保留
+    updater.set_rows([{'设备名': 'A', 'IP': '1.1.1.1'}, {'设备名': 'B', 'IP': '1.1.1.1'}])
+    updater.flush()
+    assert tree.rows() == [('A', '1.1.1.1', ''), ('B', '1.1.1.1', '')]
+    print("✅ 行顺序调整测试通过")
+
+
+def test_stable_keys():
+    """测试指定 keys 时重复IP的行在多次调用间保持对应"""
+    print("测试稳定行键...")
+    tree = FakeTree()
+    updater = TreeDiffUpdater(tree, COLUMNS)
+    a = {'设备名': 'A', 'IP': '1.1.1.1', '状态': ''}
+    b = {'设备名': 'B', 'IP': '1.1.1.1', '状态': ''}
+    # 逐台追加：两台设备IP相同，按设备序号区分
+    updater.set_rows([])
+    updater.update_rows([dict(b, 状态='离线')], keys=[1])
+    updater.update_rows([dict(a, 状态='在线')], keys=[0])
+    updater.flush()
+    assert tree.rows() == [('B', '1.1.1.1', '离线'), ('A', '1.1.1.1', '在线')]
+    # 整表按同样的键排序后不删除重建
+    tree.reset_ops()
+    updater.set_rows([dict(a, 状态='在线'), dict(b, 状态='离线')], keys=[0, 1])
+    updater.flush()
+    assert tree.rows() == [('A', '1.1.1.1', '在线'), ('B', '1.1.1.1', '离线')]
+    assert tree.ops == {'insert': 0, 'item': 0, 'delete': 0, 'move': 1}
+    try:
+        updater.set_rows([a, b], keys=[0])
+        assert False, '键数量不一致应报错'
+    except ValueError:
+        pass
+    print("✅ 稳定行键测试通过")
+
+
+def main():
+    """运行所有测试"""
+    print("表格增量更新 - 功能测试")
+    print("=" * 50)
+
+    tests = [
+        test_only_changed_rows,
+        test_reorder_and_delete,
+        test_stable_keys
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} 失败: {e}")
+        print()
+
+    print(f"测试结果: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == '__main__':
+    main()
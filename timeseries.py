@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监控时序存储 - timeseries.py
+每台设备一个定长环形缓冲（array 存储：时间戳、在线、RTT、CPU%、内存%，每个样本约 21 字节），
+内存占用 = 设备数 × 容量 × 21 字节，与运行时长无关；
+指定 spill_dir 时，缓冲写满、即将覆盖最旧样本前整段追加写入 <spill_dir>/<设备>.csv，磁盘上保留完整历史。
+另按时间段汇总全部设备的可用率与平均 RTT，用于绘制整体趋势，不需要遍历所有样本。
+"""
+
+import csv
+import math
+import os
+import threading
+import time
+from array import array
+
+from device_log import safe_filename
+
+# 每台设备内存中保留的样本数
+DEFAULT_CAPACITY = 1024
+# 整体趋势的时间段长度（秒）与保留的时间段数
+DEFAULT_BUCKET_SECONDS = 60
+DEFAULT_BUCKETS = 1440
+
+SPILL_FIELDS = ['timestamp', 'up', 'rtt', 'cpu', 'mem']
+
+NAN = float('nan')
+
+
+def parse_percent(value):
+    """'12%'、'12.5 %' -> 12.0 / 12.5，无法解析时返回 None"""
+    text = str(value or '').strip().rstrip('%').strip()
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _value(v):
+    return None if math.isnan(v) else v
+
+
+def _format(v):
+    return '' if v is None else f'{v:.2f}'
+
+
+def _parse_float(text):
+    return float(text) if text else None
+
+
+class RingSeries:
+    """单台设备的环形缓冲，写满后覆盖最旧的样本"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = max(1, capacity)
+        self._ts = array('d')
+        self._up = array('b')
+        self._rtt = array('f')
+        self._cpu = array('f')
+        self._mem = array('f')
+        self._head = 0  # 写满后下一个写入位置（即最旧样本的位置）
+        self.spilled = 0  # 最旧的若干样本已写入磁盘
+
+    def __len__(self):
+        return len(self._ts)
+
+    def is_full(self):
+        return len(self._ts) >= self.capacity
+
+    def append(self, ts, up, rtt=None, cpu=None, mem=None):
+        values = (ts, 1 if up else 0, NAN if rtt is None else rtt, NAN if cpu is None else cpu,
+                  NAN if mem is None else mem)
+        columns = (self._ts, self._up, self._rtt, self._cpu, self._mem)
+        if not self.is_full():
+            for column, value in zip(columns, values):
+                column.append(value)
+            return
+        for column, value in zip(columns, values):
+            column[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self.spilled = max(0, self.spilled - 1)
+
+    def _order(self):
+        count = len(self._ts)
+        if not self.is_full():
+            return range(count)
+        return [(self._head + i) % self.capacity for i in range(count)]
+
+    def samples(self, since=None, skip=0):
+        """按时间顺序返回 [(时间戳, 是否在线, RTT, CPU%, 内存%), ...]，缺失值为 None"""
+        result = []
+        for pos in list(self._order())[skip:]:
+            ts = self._ts[pos]
+            if since is not None and ts < since:
+                continue
+            result.append((ts, bool(self._up[pos]), _value(self._rtt[pos]), _value(self._cpu[pos]),
+                           _value(self._mem[pos])))
+        return result
+
+    def last(self):
+        """最近一个样本，没有样本时返回 None"""
+        if not self._ts:
+            return None
+        pos = (self._head - 1) % self.capacity if self.is_full() else len(self._ts) - 1
+        return (self._ts[pos], bool(self._up[pos]), _value(self._rtt[pos]), _value(self._cpu[pos]),
+                _value(self._mem[pos]))
+
+    def nbytes(self):
+        return sum(column.itemsize * self.capacity for column in
+                   (self._ts, self._up, self._rtt, self._cpu, self._mem))
+
+
+class TimeSeriesStore:
+    """
+    全部设备的时序存储（线程安全），以设备 IP 为键
+    用法:
+        store = TimeSeriesStore(spill_dir='monitor_history')
+        store.record('10.0.0.1', True, rtt=1.8)
+        store.summary('10.0.0.1', since=time.time() - 86400)
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, spill_dir=None, bucket_seconds=DEFAULT_BUCKET_SECONDS,
+                 buckets=DEFAULT_BUCKETS):
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = buckets
+        self._series = {}
+        self._buckets = {}  # 时间段序号 -> [在线样本数, 样本数, RTT 合计, RTT 样本数]
+        self._lock = threading.Lock()
+
+    def keys(self):
+        with self._lock:
+            return list(self._series)
+
+    def record(self, key, up, rtt=None, cpu=None, mem=None, ts=None):
+        """记录一个样本"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = RingSeries(self.capacity)
+            if series.is_full() and series.spilled == 0 and self.spill_dir:
+                # 即将覆盖尚未写入磁盘的最旧样本，先整段写出
+                self._spill(key, series)
+            series.append(ts, up, rtt, cpu, mem)
+            self._add_to_bucket(ts, up, rtt)
+
+    def _add_to_bucket(self, ts, up, rtt):
+        index = int(ts // self.bucket_seconds)
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            bucket = self._buckets[index] = [0, 0, 0.0, 0]
+            if len(self._buckets) > self.max_buckets:
+                for old in sorted(self._buckets)[:len(self._buckets) - self.max_buckets]:
+                    del self._buckets[old]
+        bucket[0] += 1 if up else 0
+        bucket[1] += 1
+        if rtt is not None:
+            bucket[2] += rtt
+            bucket[3] += 1
+
+    def spill_path(self, key):
+        return os.path.join(self.spill_dir, f'{safe_filename(str(key))}.csv')
+
+    def _spill(self, key, series):
+        """把尚未写入磁盘的样本追加到溢出文件"""
+        samples = series.samples(skip=series.spilled)
+        if not samples:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self.spill_path(key)
+        new_file = not os.path.exists(path)
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(SPILL_FIELDS)
+            for ts, up, rtt, cpu, mem in samples:
+                writer.writerow([f'{ts:.3f}', 1 if up else 0, _format(rtt), _format(cpu), _format(mem)])
+        series.spilled = len(series)
+
+    def flush(self):
+        """把所有设备尚未写入磁盘的样本写出（停止监控或退出时调用）"""
+        if not self.spill_dir:
+            return
+        with self._lock:
+            for key, series in self._series.items():
+                self._spill(key, series)
+
+    def samples(self, key, since=None, include_spilled=False):
+        """设备的样本列表；include_spilled 时包含已写入磁盘的历史"""
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return []
+            memory = series.samples(since)
+            if not include_spilled or not self.spill_dir or not os.path.exists(self.spill_path(key)):
+                return memory
+            spilled = series.spilled
+            memory = series.samples(since, skip=spilled)
+            path = self.spill_path(key)
+        history = []
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                ts = float(row['timestamp'])
+                if since is not None and ts < since:
+                    continue
+                history.append((ts, row['up'] == '1', _parse_float(row['rtt']), _parse_float(row['cpu']),
+                                _parse_float(row['mem'])))
+        return history + memory
+
+    def summary(self, key, since=None):
+        """
+        设备在内存窗口内的统计：样本数、可用率(%)、状态变化次数、平均/最大 RTT、最近的 CPU%/内存%
+        没有样本时各项为 None
+        """
+        samples = self.samples(key, since)
+        result = {'samples': len(samples), 'availability': None, 'changes': 0, 'avg_rtt': None,
+                  'max_rtt': None, 'cpu': None, 'mem': None}
+        if not samples:
+            return result
+        result['availability'] = 100.0 * sum(1 for s in samples if s[1]) / len(samples)
+        result['changes'] = sum(1 for prev, cur in zip(samples, samples[1:]) if prev[1] != cur[1])
+        rtts = [s[2] for s in samples if s[2] is not None]
+        if rtts:
+            result['avg_rtt'] = sum(rtts) / len(rtts)
+            result['max_rtt'] = max(rtts)
+        for s in reversed(samples):
+            if result['cpu'] is None and s[3] is not None:
+                result['cpu'] = s[3]
+            if result['mem'] is None and s[4] is not None:
+                result['mem'] = s[4]
+        return result
+
+    def timeline(self, since=None):
+        """整体趋势：[(时间段开始时间, 可用率%, 平均RTT或None), ...]，按时间排序"""
+        with self._lock:
+            buckets = sorted(self._buckets.items())
+        result = []
+        for index, (up, total, rtt_sum, rtt_count) in buckets:
+            start = index * self.bucket_seconds
+            if since is not None and start + self.bucket_seconds <= since:
+                continue
+            result.append((start, 100.0 * up / total, rtt_sum / rtt_count if rtt_count else None))
+        return result
+
+    def availability(self, since=None):
+        """全部设备在时间段内的整体可用率(%)，没有样本时返回 None"""
+        with self._lock:
+            counts = [(up, total) for index, (up, total, rtt_sum, rtt_count) in self._buckets.items()
+                      if since is None or (index + 1) * self.bucket_seconds > since]
+        total = sum(c[1] for c in counts)
+        return 100.0 * sum(c[0] for c in counts) / total if total else None
+
+    def nbytes(self):
+        """环形缓冲的最大内存占用（字节）"""
+        with self._lock:
+            return sum(series.nbytes() for series in self._series.values())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+阶段耗时模块 - timing.py
+记录每台设备每次连接尝试的各阶段耗时（TCP连接、SSH密钥交换、认证、登录、关闭分页、逐条命令），
+命令阶段另记接收字符数、数据块数、翻页次数与清理写文件耗时；
+批量任务把每次尝试写成一行 JSON（<任务>_timing_<时间戳>.jsonl），并按阶段/厂商/命令汇总。
+    python timing.py backup_timing_20250702_100000.jsonl    # 输出汇总报告
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# 阶段名称（JSON 中使用英文键，报告中显示中文）
+PHASE_LABELS = {
+    'tcp_connect': 'TCP连接',
+    'ssh_kex': 'SSH密钥交换',
+    'ssh_auth': 'SSH认证',
+    'login': '登录等待提示符',
+    'no_paging': '关闭分页',
+    'command': '命令执行',
+    'disconnect': '断开连接',
+}
+# 命令阶段中清理并写入日志文件的耗时（包含在命令执行耗时内）
+WRITE_LABEL = '其中写文件'
+
+
+class SessionTiming:
+    """
+    单次连接尝试的阶段耗时
+    用法:
+        timing = SessionTiming()
+        with timing.phase('tcp_connect'):
+            sock = socket.create_connection(...)
+        entry = timing.begin('command', 'display version', chars=0)
+        ...
+        timing.end(entry)
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.phases = []
+        self._open = {}  # id(entry) -> 开始时间
+
+    def begin(self, name, detail=None, **counters):
+        """开始一个阶段，返回该阶段的记录（可在阶段进行中累加计数）"""
+        now = time.perf_counter()
+        entry = {'phase': name}
+        if detail:
+            entry['detail'] = detail
+        entry['offset'] = round(now - self._t0, 6)
+        entry.update(counters)
+        self.phases.append(entry)
+        self._open[id(entry)] = now
+        return entry
+
+    def end(self, entry):
+        if entry is None:
+            return None
+        start = self._open.pop(id(entry), None)
+        if start is not None:
+            entry['seconds'] = round(time.perf_counter() - start, 6)
+        return entry
+
+    @contextmanager
+    def phase(self, name, detail=None, **counters):
+        entry = self.begin(name, detail, **counters)
+        try:
+            yield entry
+        finally:
+            self.end(entry)
+
+    def finish(self):
+        """结束尚未结束的阶段（失败时中断的阶段标记 incomplete），返回总耗时"""
+        for entry in self.phases:
+            if id(entry) in self._open:
+                self.end(entry)
+                entry['incomplete'] = True
+        return time.perf_counter() - self._t0
+
+    def record(self, **fields):
+        """生成一行耗时记录：fields（设备、尝试次数、结果等）+ 开始时间、总耗时与各阶段"""
+        total = self.finish()
+        record = dict(fields)
+        record['start'] = round(self.started, 3)
+        record['total'] = round(total, 6)
+        record['phases'] = self.phases
+        return record
+
+
+class TimingLog:
+    """耗时记录文件（JSON Lines，线程安全），同时保留记录用于结束时汇总"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.records.append(record)
+            if self._file is not None:
+                self._file.write(line + '\n')
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(records):
+    """
+    汇总耗时记录：
+        phases   各阶段耗时合计（秒），另含 write 写文件耗时
+        vendors  厂商 -> {'attempts': 尝试次数, 'total': 合计秒数, 'phases': {阶段: 秒数}}
+        commands [(厂商, 命令, 执行次数, 合计秒数, 最长秒数, 翻页次数), ...] 按合计耗时降序
+    """
+    phases = {}
+    vendors = {}
+    commands = {}
+    for record in records:
+        vendor = record.get('vendor') or '-'
+        stats = vendors.setdefault(vendor, {'attempts': 0, 'total': 0.0, 'phases': {}})
+        stats['attempts'] += 1
+        stats['total'] += record.get('total', 0.0)
+        for entry in record.get('phases', []):
+            name = entry['phase']
+            seconds = entry.get('seconds', 0.0)
+            phases[name] = phases.get(name, 0.0) + seconds
+            stats['phases'][name] = stats['phases'].get(name, 0.0) + seconds
+            if name != 'command':
+                continue
+            phases['write'] = phases.get('write', 0.0) + entry.get('write_seconds', 0.0)
+            key = (vendor, entry.get('detail', ''))
+            count, total, longest, pages = commands.get(key, (0, 0.0, 0.0, 0))
+            commands[key] = (count + 1, total + seconds, max(longest, seconds), pages + entry.get('pages', 0))
+    command_list = sorted((key + value for key, value in commands.items()), key=lambda c: c[3], reverse=True)
+    return {'phases': phases, 'vendors': vendors, 'commands': command_list}
+
+
+def format_summary(summary, top=5):
+    """汇总结果 -> 文本行（用于汇总日志与命令行报告）"""
+    phases = summary['phases']
+    parts = [f"{PHASE_LABELS.get(name, name)} {phases[name]:.1f}秒" for name in PHASE_LABELS if name in phases]
+    if 'write' in phases:
+        parts.append(f"{WRITE_LABEL} {phases['write']:.1f}秒")
+    lines = [f"阶段耗时合计: {'，'.join(parts) if parts else '无'}"]
+    for vendor, stats in sorted(summary['vendors'].items(), key=lambda item: item[1]['total'], reverse=True):
+        lines.append(f"  厂商 {vendor}: {stats['attempts']} 次连接，合计 {stats['total']:.1f}秒")
+    if summary['commands']:
+        lines.append("最耗时的命令:")
+        for vendor, cmd, count, total, longest, pages in summary['commands'][:top]:
+            lines.append(f"  [{vendor}] {cmd}: {count} 次，合计 {total:.1f}秒，最长 {longest:.1f}秒，翻页 {pages} 次")
+    return lines
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python timing.py <耗时记录.jsonl>")
+        return 2
+    records = read_records(sys.argv[1])
+    print(f"耗时记录: {len(records)} 条（{sys.argv[1]}）")
+    for line in format_summary(summarize(records), top=20):
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表格增量更新模块 - tree_updater.py
+按设备IP为键维护 ttk.Treeview 的行：每次刷新只对新增、变化、删除的行调用 insert/item/delete，
+行顺序变化时只移动位置不对的行；同一帧内的多次刷新合并为一次，
+单帧操作数超过上限时分到后续帧执行，界面不会因大表刷新而卡顿，滚动位置与选中项保持不变。
+"""
+
+# 两次批量更新之间的间隔（毫秒），约一帧
+FRAME_MS = 16
+# 每帧最多执行的行操作数
+MAX_OPS_PER_FRAME = 500
+
+
+def row_key(row):
+    """行的键：设备IP，没有IP时使用设备名"""
+    return row.get('IP') or row.get('ip') or row.get('设备名') or ''
+
+
+class TreeDiffUpdater:
+    """
+    Treeview 增量更新器
+    用法:
+        updater = TreeDiffUpdater(tree, columns)
+        updater.set_rows(rows)       # 整表刷新（只更新有变化的行）
+        updater.update_rows(rows)    # 只更新/追加这些行
+    默认以 key(行) 为行的键（同一次调用内重复时加序号）；同一设备需要在多次调用间对应同一行时
+    （如逐台追加后再整表排序），传入 keys 指定每行的稳定键（如设备序号）
+    """
+
+    def __init__(self, tree, columns, key=row_key, frame_ms=FRAME_MS, max_ops_per_frame=MAX_OPS_PER_FRAME):
+        self.tree = tree
+        self.columns = tuple(columns)
+        self.key = key
+        self.frame_ms = frame_ms
+        self.max_ops_per_frame = max_ops_per_frame
+        self._order = []  # 期望的行顺序（键）
+        self._desired = {}  # 键 -> 期望的单元格值
+        self._shown = {}  # 键 -> (iid, 已显示的单元格值)
+        self._dirty = {}  # 待处理的键（dict 作为有序集合）
+        self._reorder = False
+        self._scheduled = None
+
+    def row_values(self, row):
+        return tuple('' if row.get(col) is None else row.get(col) for col in self.columns)
+
+    def _keyed(self, rows, keys=None):
+        """[(键, 单元格值), ...]，未指定 keys 时键重复加序号区分"""
+        if keys is not None:
+            keys = list(keys)
+            if len(keys) != len(rows):
+                raise ValueError(f'keys 数量 ({len(keys)}) 与行数 ({len(rows)}) 不一致')
+            return [(key, self.row_values(row)) for key, row in zip(keys, rows)]
+        seen = {}
+        result = []
+        for row in rows:
+            key = self.key(row)
+            count = seen.get(key, 0) + 1
+            seen[key] = count
+            result.append((key if count == 1 else f'{key}#{count}', self.row_values(row)))
+        return result
+
+    def set_rows(self, rows, keys=None):
+        """以 rows 为表格的完整内容"""
+        keyed = self._keyed(rows, keys)
+        desired = dict(keyed)
+        for key in self._desired:
+            if key not in desired:
+                self._dirty[key] = True
+        for key, values in keyed:
+            if self._desired.get(key) != values:
+                self._dirty[key] = True
+        order = [key for key, values in keyed]
+        if order != self._order:
+            self._reorder = True
+        self._order = order
+        self._desired = desired
+        self._schedule()
+
+    def update_rows(self, rows, keys=None):
+        """更新已有的行，新的行追加到末尾"""
+        for key, values in self._keyed(rows, keys):
+            if key not in self._desired:
+                self._order.append(key)
+            if self._desired.get(key) != values:
+                self._desired[key] = values
+                self._dirty[key] = True
+        self._schedule()
+
+    def pending(self):
+        """尚未应用到表格的行数"""
+        return len(self._dirty)
+
+    def _schedule(self):
+        if self._scheduled is None and (self._dirty or self._reorder):
+            self._scheduled = self.tree.after(self.frame_ms, self._run_frame)
+
+    def _run_frame(self):
+        self._scheduled = None
+        if not self.tree.winfo_exists():
+            # 表格已随模块切换销毁
+            return
+        self.flush(self.max_ops_per_frame)
+        self._schedule()
+
+    def flush(self, limit=None):
+        """立即应用待处理的更新（最多 limit 个行操作），全部完成返回 True"""
+        ops = 0
+        while self._dirty and (limit is None or ops < limit):
+            key = next(iter(self._dirty))
+            del self._dirty[key]
+            values = self._desired.get(key)
+            shown = self._shown.get(key)
+            if values is None:
+                if shown is not None:
+                    self.tree.delete(shown[0])
+                    del self._shown[key]
+            elif shown is None:
+                self._shown[key] = (self.tree.insert('', 'end', values=values), values)
+            elif shown[1] != values:
+                self.tree.item(shown[0], values=values)
+                self._shown[key] = (shown[0], values)
+            else:
+                continue
+            ops += 1
+        if self._dirty:
+            return False
+        if self._reorder:
+            self._reorder = False
+            self._apply_order()
+        return True
+
+    def _apply_order(self):
+        """只移动位置不对的行"""
+        current = list(self.tree.get_children(''))
+        for index, key in enumerate(self._order):
+            iid = self._shown[key][0]
+            if index < len(current) and current[index] == iid:
+                continue
+            self.tree.move(iid, '', index)
+            current.remove(iid)
+            current.insert(index, iid)